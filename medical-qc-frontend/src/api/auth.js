@@ -1,7 +1,7 @@
 // src/api/auth.js
 // ----------------------------------------------------------------------------------
 // 认证模块前端 API (Auth API)
-// 作用：提供前端登录、注册的接口调用方法。
+// 作用：提供前端登录、注册、退出登录的接口调用方法。
 // 对接后端：/api/v1/auth
 // ----------------------------------------------------------------------------------
 
@@ -18,3 +18,8 @@ export const login = (data) => {
 export const register = (data) => {
   return request.post('/auth/register', data)
 }
+
+// 退出登录 (吊销当前用户的全部令牌)
+export const logout = () => {
+  return request.post('/auth/logout')
+}
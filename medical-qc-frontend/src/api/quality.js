@@ -155,19 +155,18 @@ export const predictHemorrhage = async (file, metadata = {}) => {
 
 /**
  * @function getHemorrhageHistory
- * @description 获取脑出血质控历史记录
- * @param {number} limit - 获取记录的数量限制
- * @returns {Promise<Object>} 历史记录列表
+ * @description 获取脑出血质控历史记录 (按时间倒序，键集分页)
+ * @param {number} limit - 每页条数 (1-100)
+ * @param {Object} params - 可选参数：cursor (上一页返回的 next_cursor)、prediction、confidence、date_from、date_to
+ * @returns {Promise<Object>} { items: 记录列表, next_cursor: 下一页游标 (为空表示没有更多) }
  *
- * @backend-api (Planned) GET /api/v1/quality/hemorrhage/history
+ * @backend-api GET /api/v1/quality/hemorrhage/history
  */
-export const getHemorrhageHistory = async (limit = 20) => {
+export const getHemorrhageHistory = async (limit = 20, params = {}) => {
   try {
-    // TODO: 后端暂未实现此接口，预留位置
-    // const response = await request.get('/quality/hemorrhage/history', { params: { limit } })
-    return { data: [] } // 临时返回空数据
+    return await request.get('/quality/hemorrhage/history', { params: { limit, ...params } })
   } catch (error) {
     console.error('获取历史记录失败', error)
-    return { data: [] }
+    return { items: [], next_cursor: null }
   }
 }
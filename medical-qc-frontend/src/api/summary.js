@@ -34,7 +34,8 @@ export const getIssueDistribution = () => {
 }
 
 // 获取最近异常记录列表 (分页、搜索、筛选)
-// 参数：{ page, limit, query, status }
+// 参数：{ page, limit, query, status, cursor }
+// 返回：{ total, totalApproximate, items, nextCursor }；顺序翻页时传入上一页的 nextCursor
 export const getRecentIssues = (params) => {
   return request({
     url: '/summary/recent',
@@ -11,11 +11,11 @@ from typing import AsyncGenerator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
 from app.core.config import settings
 from app.utils.database import AsyncSessionLocal
 from app.models.user import User
+from app.services.token_cache import get_user_by_token
 
 # OAuth2 方案定义
 # 对接前端：前端请求头中的 Authorization: Bearer <token>
@@ -47,8 +47,8 @@ async def get_current_user(
     
     作用：
         验证请求中的 Token 有效性。
-        从数据库中查询并返回对应的用户对象。
-        如果验证失败，抛出 401 未授权异常。
+        优先从进程内令牌缓存读取，未命中时查询数据库 (见 app.services.token_cache)。
+        如果验证失败 (令牌无效或账号已禁用)，抛出 401 未授权异常。
     
     参数：
         db: 数据库会话
@@ -64,9 +64,8 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    # 直接通过 Token 查询用户 (匹配 auth_service 中的实现)
-    result = await db.execute(select(User).where(User.access_token == token))
-    user = result.scalars().first()
+    # 通过 Token 查询用户 (匹配 auth_service 中的实现，带缓存)
+    user = await get_user_by_token(db, token)
     
     if not user:
         raise credentials_exception
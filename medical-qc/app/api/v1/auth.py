@@ -5,7 +5,7 @@
 #       作为系统的入口门禁，验证用户凭证并发放 Access Token。
 # 对接模块：
 #   - 后端服务: app.services.auth_service
-#   - 前端调用: src/api/auth.js (login, register)
+#   - 前端调用: src/api/auth.js (login, register, logout)
 #   - 前端视图: src/views/Login.vue, src/views/Register.vue
 # ----------------------------------------------------------------------------------
 
@@ -13,8 +13,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi import status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.request import RegisterReq, LoginReq
+from app.api.deps import get_current_user
+from app.models.user import User
 from app.schemas.response import LoginResponse
-from app.services.auth_service import register_user, login_user
+from app.services.auth_service import register_user, login_user, revoke_user_tokens
+from app.services.inference_executor import ExecutorSaturatedError
 from app.utils.database import get_db
 
 router = APIRouter()
@@ -37,15 +40,18 @@ async def register(req: RegisterReq, db: AsyncSession = Depends(get_db)):
     4. 返回成功消息
     """
     # 调用 auth_service 中的 register_user 逻辑
-    success, msg = await register_user(
-        db,
-        req.username,
-        req.email,
-        req.password,
-        req.full_name,
-        req.hospital,
-        req.department
-    )
+    try:
+        success, msg = await register_user(
+            db,
+            req.username,
+            req.email,
+            req.password,
+            req.full_name,
+            req.hospital,
+            req.department
+        )
+    except ExecutorSaturatedError:
+        raise HTTPException(status_code=503, detail="请求过多，请稍后重试", headers={"Retry-After": "1"})
     if not success:
         raise HTTPException(status_code=400, detail=msg)
     return {"message": msg}
@@ -69,7 +75,11 @@ async def login(req: LoginReq, db: AsyncSession = Depends(get_db)):
     4. 如果验证失败，抛出 400 异常 (模糊错误信息以提高安全性)
     """
     # 调用 auth_service 中的 login_user 进行验证并生成 Token
-    token, error = await login_user(db, req.username, req.password)
+    try:
+        token, error = await login_user(db, req.username, req.password)
+    except ExecutorSaturatedError:
+        # 密码哈希队列已满 (集中登录)：快速拒绝，提示客户端稍后重试
+        raise HTTPException(status_code=503, detail="登录请求过多，请稍后重试", headers={"Retry-After": "1"})
 
     if error is None and token:
         # 登录成功，构造返回数据
@@ -88,3 +98,15 @@ async def login(req: LoginReq, db: AsyncSession = Depends(get_db)):
         status_code=status.HTTP_400_BAD_REQUEST,
         detail="用户名或密码错误"
     )
+
+
+# ----------------------------------------------------------------------------------
+# 接口：退出登录
+# URL: POST /api/v1/auth/logout
+# 作用：吊销当前用户的全部令牌 (JWT 递增 token_version，不透明令牌轮换)，其他设备需重新登录。
+# 对接前端: src/views/layout/Layout.vue (handleCommand: logout)
+# ----------------------------------------------------------------------------------
+@router.post("/logout")
+async def logout(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    await revoke_user_tokens(db, current_user.id)
+    return {"message": "已退出登录"}
@@ -0,0 +1,101 @@
+# app/api/v1/jobs.py
+# ----------------------------------------------------------------------------------
+# 异步任务 API (Jobs API)
+# 作用：查询后台任务 (如序列级脑出血检测) 的状态与结果，并以流的方式推送进度：
+#       - GET  /api/v1/jobs/{id}          轮询状态 (include_partial=true 时附带已完成的切片结果)
+#       - GET  /api/v1/jobs/{id}/events   SSE 进度流
+#       - WS   /ws/quality/head/progress?job_id=&token=   WebSocket 进度流
+# 对接模块：
+#   - 任务提交: app.api.v1.quality (POST /hemorrhage/series/jobs)
+#   - 后端服务: app.services.job_manager
+#   - 前端视图: src/views/quality/Head.vue (/ws/quality/head/progress)
+# ----------------------------------------------------------------------------------
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.quality import get_current_user, oauth2_scheme
+from app.schemas.response import JobStatusResponse
+from app.services.job_manager import Job, get_job_manager
+from app.utils.database import AsyncSessionLocal, get_db
+from app.utils.responses import NegotiatedResponse, NegotiatedRoute
+
+router = APIRouter(route_class=NegotiatedRoute, default_response_class=NegotiatedResponse)
+
+# WebSocket 路由不带 /api/v1 前缀 (与前端约定的路径保持一致)
+ws_router = APIRouter()
+
+# ----------------------------------------------------------------------------------
+# 辅助函数：按 ID 获取当前用户的任务
+# 作用：任务不存在、已过期或不属于当前用户时均返回 404 (不暴露其他用户的任务是否存在)
+# ----------------------------------------------------------------------------------
+def _get_owned_job(job_id: str, username: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None or job.owner != username:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return job
+
+# ----------------------------------------------------------------------------------
+# 接口：查询任务状态
+# URL: GET /api/v1/jobs/{job_id}
+# ----------------------------------------------------------------------------------
+@router.get("/{job_id}", response_model=JobStatusResponse, response_model_exclude_none=True)
+async def get_job(
+    job_id: str,
+    include_partial: bool = Query(False, description="执行中时附带已完成的切片结果"),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    current_user = await get_current_user(token, db)
+    return _get_owned_job(job_id, current_user.username).snapshot(include_partial=include_partial)
+
+# ----------------------------------------------------------------------------------
+# 接口：任务进度流 (Server-Sent Events)
+# URL: GET /api/v1/jobs/{job_id}/events
+# 作用：首个事件为当前快照，之后推送 progress 事件 (含本批完成的切片结果)，结束时推送 done 事件。
+# ----------------------------------------------------------------------------------
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    current_user = await get_current_user(token, db)
+    job = _get_owned_job(job_id, current_user.username)
+
+    async def event_stream():
+        async for event in get_job_manager().subscribe(job):
+            yield b"event: " + event["event"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# ----------------------------------------------------------------------------------
+# 接口：任务进度流 (WebSocket)
+# URL: WS /ws/quality/head/progress?job_id=...&token=...
+# 作用：浏览器 WebSocket 无法设置 Authorization 头，Token 通过查询参数传递；
+#       事件结构与 SSE 相同，任务结束后服务端主动关闭连接。
+# ----------------------------------------------------------------------------------
+@ws_router.websocket("/ws/quality/head/progress")
+async def job_progress_ws(websocket: WebSocket, job_id: str = Query(...), token: str = Query(...)):
+    # 仅在握手时访问数据库，不在整个推送期间占用连接
+    try:
+        async with AsyncSessionLocal() as db:
+            current_user = await get_current_user(token, db)
+        job = _get_owned_job(job_id, current_user.username)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    try:
+        async for event in get_job_manager().subscribe(job):
+            await websocket.send_text(orjson.dumps(event).decode())
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
@@ -4,25 +4,43 @@
 # 作用：处理影像上传和 AI 质控检测请求，特别是脑出血检测功能。
 #       作为前后端交互的桥梁，接收前端图片，调用 AI 服务，返回 JSON 结果。
 # 对接模块：
-#   - 后端服务: app.services.hemorrhage_ai.run_hemorrhage_detection
+#   - 后端服务: app.services.hemorrhage_ai.run_hemorrhage_detection_async
 #   - 前端调用: src/api/quality.js (predictHemorrhage)
 #   - 前端视图: src/views/quality/Hemorrhage.vue
 # ----------------------------------------------------------------------------------
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form, Query
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.utils.database import get_db
 from app.models.user import User
-from sqlalchemy import select
-import tempfile
-import os
+import asyncio
 import base64
+import contextlib
+import orjson
 from io import BytesIO
 from PIL import Image
 from pydantic import BaseModel
-from typing import Optional
-from app.services.hemorrhage_ai import run_hemorrhage_detection
+from datetime import date
+from typing import List, Optional
+from app.core.config import settings
+from app.services.hemorrhage_ai import (
+    cached_detection, content_sha256, detection_cache_key, run_hemorrhage_detection_async, run_hemorrhage_series_async,
+)
+from app.services.archive_ingest import ArchiveFormatError, check_archive_format, ingest_archive
+from app.services.history_service import MAX_PAGE_SIZE, fetch_hemorrhage_history
+from app.services.inference_executor import ExecutorSaturatedError, get_inference_executor
+from app.services.job_manager import get_job_manager
+from app.services.preview import PREVIEW_MODES, PreviewOptions, parse_preview_options
+from app.services.record_writer import build_hemorrhage_row, get_record_buffer
+from app.services.token_cache import get_user_by_token
+from app.schemas.response import (
+    HemorrhageDetectionResponse, HemorrhageHistoryPage, HemorrhageSeriesResponse, JobSubmitResponse,
+)
+from app.utils.responses import NegotiatedResponse, NegotiatedRoute
+from app.utils.upload_limits import UploadTooLargeError, read_upload_digest, spool_upload
 
 # ----------------------------------------------------------------------------------
 # OAuth2 认证方案定义
@@ -32,29 +50,29 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 # ----------------------------------------------------------------------------------
 # 依赖函数：获取当前用户
-# 作用：通过 Access Token 从数据库中验证并获取当前用户信息。
+# 作用：通过 Access Token 验证并获取当前用户信息 (与 app.api.deps 共用令牌缓存，命中时不访问数据库)。
 # ----------------------------------------------------------------------------------
 async def get_current_user(token: str, db: AsyncSession = Depends(get_db)):
     """
-    验证 access_token 是否存在于数据库中
+    验证 access_token 是否有效 (令牌缓存 -> 数据库)
     
     Args:
         token: OAuth2 access token
         db: 数据库会话
         
     Returns:
-        str: 用户名 (如果验证通过)
+        User: 当前用户 (检测记录需要 user.id，任务归属使用 user.username)
         
     Raises:
-        HTTPException(401): 如果 token 无效或用户不存在
+        HTTPException(401): 如果 token 无效、用户不存在或账号已禁用
     """
-    result = await db.execute(select(User).where(User.access_token == token))
-    user = result.scalars().first()
+    user = await get_user_by_token(db, token)
     if not user:
         raise HTTPException(status_code=401, detail="无效凭证")
-    return user.username
+    return user
 
-router = APIRouter()
+# orjson 序列化，Accept: application/msgpack 时返回 MessagePack (见 app.utils.responses)
+router = APIRouter(route_class=NegotiatedRoute, default_response_class=NegotiatedResponse)
 
 # ----------------------------------------------------------------------------------
 # 数据模型：Base64 图片上传请求体
@@ -64,18 +82,107 @@ router = APIRouter()
 class HemorrhageBase64Request(BaseModel):
     image_base64: str
     filename: Optional[str] = "unknown.png"
+    patient_name: Optional[str] = None
+    exam_id: Optional[str] = None
+
+# ----------------------------------------------------------------------------------
+# 辅助函数：保存检测记录
+# 作用：将检测结果放入写后缓冲区 (见 app.services.record_writer)，由后台批量写入 hemorrhage_records，
+#       接口不等待数据库写入。
+# 落库范围：单张检测 (文件 / Base64) 每次一条；序列检测 (同步接口与异步任务) 每个检查一条，
+#       概率取关键切片。归档批量检测用于回顾性审计，不写入检测记录，
+#       以免历史切片以当前时间计入今日异常、趋势与待处理数。
+# ----------------------------------------------------------------------------------
+def _save_record(user: User, result: dict, image_path: str,
+                 patient_name: Optional[str] = None, exam_id: Optional[str] = None):
+    if not settings.RECORD_PERSIST_ENABLED:
+        return
+    get_record_buffer().submit(build_hemorrhage_row(user.id, result, image_path, patient_name, exam_id))
+
+def _save_series_record(user: User, result: dict, patient_name: Optional[str] = None, exam_id: Optional[str] = None):
+    key_slice = result["slices"][result["key_slice"]]
+    study = {**result, "probability": key_slice["probability"]}
+    _save_record(user, study, key_slice.get("image_url") or key_slice["source"], patient_name, exam_id)
+
+# ----------------------------------------------------------------------------------
+# 辅助函数：带缓存的检测
+# 作用：以上传内容哈希为键查询结果缓存；未命中时直接解码上传内容 (字节或上传文件对象)
+#       并执行检测。相同内容的并发上传只执行一次检测 (见 app.services.result_cache)。
+# ----------------------------------------------------------------------------------
+async def _detect_upload(source, content_hash: str, preview: PreviewOptions):
+    return await cached_detection(
+        detection_cache_key(content_hash, preview),
+        lambda: run_hemorrhage_detection_async(source, preview),
+    )
+
+# ----------------------------------------------------------------------------------
+# 依赖函数：预览图选项
+# 作用：解析查询参数 preview / preview_size / preview_quality (两个检测接口共用)。
+#       默认 png 与原有行为一致 (Hemorrhage.vue 直接展示 Base64 PNG)；
+#       不展示图像的 API 客户端可选择 none，或 jpeg/webp 缩略图、url 异步产物以减小响应体积。
+# ----------------------------------------------------------------------------------
+def get_preview_options(
+    preview: str = Query("png", description=f"预览图模式: {' / '.join(PREVIEW_MODES)}"),
+    preview_size: Optional[int] = Query(None, description="jpeg/webp/url 模式下预览图最长边 (32-512)"),
+    preview_quality: Optional[int] = Query(None, description="jpeg/webp 压缩质量 (1-100)"),
+) -> PreviewOptions:
+    try:
+        return parse_preview_options(preview, preview_size, preview_quality)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def get_series_preview_options(
+    preview: str = Query("none", description=f"各切片的预览图模式: {' / '.join(PREVIEW_MODES)}"),
+    preview_size: Optional[int] = Query(None, description="jpeg/webp/url 模式下预览图最长边 (32-512)"),
+    preview_quality: Optional[int] = Query(None, description="jpeg/webp 压缩质量 (1-100)"),
+) -> PreviewOptions:
+    """序列接口默认不生成预览图 (数十张 PNG 会使响应达到数 MB)"""
+    return get_preview_options(preview, preview_size, preview_quality)
+
+# ----------------------------------------------------------------------------------
+# 辅助函数：校验上传文件类型
+# 允许 image/* (PNG/JPG) 和 application/dicom (DICOM) 以及部分浏览器默认的 octet-stream
+# ----------------------------------------------------------------------------------
+def _check_upload_type(file: UploadFile):
+    valid_types = ["image/", "application/dicom", "application/octet-stream"]
+    if file.content_type:
+        is_valid = any(file.content_type.startswith(t) for t in valid_types)
+        if not is_valid:
+             # 为了更好的兼容性，如果是未知类型但扩展名正确也允许 (虽不仅严谨但实用)
+             filename_lower = file.filename.lower() if file.filename else ""
+             if not (filename_lower.endswith(".dcm") or filename_lower.endswith(".dicom")):
+                raise HTTPException(status_code=400, detail=f"不支持的文件类型: {file.content_type}，仅支持 PNG/JPG/DICOM")
+
+# ----------------------------------------------------------------------------------
+# 辅助函数：检查归档上传类型
+# 作用：归档批量检测只接受 zip / tar (含 gz / bz2 / xz 压缩) 归档，实际格式由 check_archive_format 校验。
+# ----------------------------------------------------------------------------------
+ARCHIVE_CONTENT_TYPES = (
+    "application/zip", "application/x-zip-compressed", "application/x-tar", "application/gzip",
+    "application/x-gzip", "application/x-bzip2", "application/x-xz", "application/octet-stream",
+)
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+def _check_archive_type(file: UploadFile):
+    if file.content_type and file.content_type not in ARCHIVE_CONTENT_TYPES:
+        filename_lower = file.filename.lower() if file.filename else ""
+        if not filename_lower.endswith(ARCHIVE_EXTENSIONS):
+            raise HTTPException(status_code=400, detail=f"不支持的文件类型: {file.content_type}，仅支持 zip / tar 归档")
 
 # ----------------------------------------------------------------------------------
 # 接口：脑出血检测 (文件流)
 # URL: POST /api/v1/quality/hemorrhage
-# 作用：接收 multipart/form-data 格式的图片文件，保存为临时文件后调用 AI 模型检测。
+# 作用：接收 multipart/form-data 格式的图片文件，在内存中解码后调用 AI 模型检测。
 # 对接前端: 
 #   - src/api/quality.js (predictHemorrhage - 备用模式)
 #   - src/views/quality/Hemorrhage.vue
 # ----------------------------------------------------------------------------------
-@router.post("/hemorrhage")
+@router.post("/hemorrhage", response_model=HemorrhageDetectionResponse, response_model_exclude_none=True)
 async def hemorrhage_quality_file(
     file: UploadFile = File(...),
+    patient_name: Optional[str] = Form(None),
+    exam_id: Optional[str] = Form(None),
+    preview: PreviewOptions = Depends(get_preview_options),
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
 ):
@@ -84,64 +191,54 @@ async def hemorrhage_quality_file(
     
     Process:
     1. 验证文件类型 (必须为 image/*)
-    2. 保存上传文件到临时目录
-    3. 验证用户身份
-    4. 调用 run_hemorrhage_detection 执行 AI 检测
-    5. 返回检测结果 (JSON)
-    6. 清理临时文件
+    2. 验证用户身份
+    3. 查询结果缓存 (按文件内容哈希)，命中则直接返回
+    4. 未命中：按块校验大小并计算哈希后直接解码上传文件，调用 run_hemorrhage_detection_async 执行 AI 检测 (合批推理)
+    5. 保存检测记录 (患者姓名/检查号来自表单，后台批量写入) 并返回检测结果 (JSON)
     """
     # 1. 验证文件类型
-    # 允许 image/* (PNG/JPG) 和 application/dicom (DICOM) 以及部分浏览器默认的 octet-stream
-    valid_types = ["image/", "application/dicom", "application/octet-stream"]
-    if file.content_type:
-        is_valid = any(file.content_type.startswith(t) for t in valid_types)
-        if not is_valid:
-             # 为了更好的兼容性，如果是未知类型但扩展名正确也允许 (虽不仅严谨但实用)
-             filename_lower = file.filename.lower() if file.filename else ""
-             if not (filename_lower.endswith(".dcm") or filename_lower.endswith(".dicom")):
-                raise HTTPException(status_code=400, detail=f"不支持的文件类型: {file.content_type}，仅支持 PNG/JPG/DICOM")
+    _check_upload_type(file)
 
-    # 2. 保存到临时文件
-    # 尽量保留原始扩展名以帮助库识别文件格式
-    suffix = ".png"
-    if file.filename:
-        ext = os.path.splitext(file.filename)[1].lower()
-        if ext in ['.dcm', '.dicom', '.png', '.jpg', '.jpeg']:
-            suffix = ext
-            
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = tmp.name
+    # 2. 验证用户身份
+    current_user = await get_current_user(token, db)
 
+    # 按块读取上传文件 (计算内容哈希并校验大小)，不将整个文件读入内存
     try:
-        # 3. 验证用户身份
-        username = await get_current_user(token, db)
-        
-        # 4. 调用 AI 服务进行检测
-        # 直接返回 run_hemorrhage_detection 的结果 (包含检测结果和 Base64 标注图)
-        result = run_hemorrhage_detection(tmp_path)
-        return result
+        upload, content_hash, _ = await read_upload_digest(
+            file,
+            max_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024,
+            chunk_size=settings.UPLOAD_CHUNK_SIZE_KB * 1024,
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        # 3-4. 查询缓存 / 调用 AI 服务进行检测 (经动态微批处理器与其他并发请求合批推理)
+        result = await _detect_upload(upload, content_hash, preview)
     except HTTPException as he:
         raise he
+    except ExecutorSaturatedError as e:
+        # 推理队列已满：快速拒绝，提示客户端稍后重试 (不占用 worker 排队)
+        raise HTTPException(status_code=503, detail=f"服务繁忙，请稍后重试: {str(e)}", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI检测失败: {str(e)}")
-    finally:
-        # 5. 清理临时文件
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+
+    # 5. 保存检测记录并返回检测结果 (包含检测结果和 Base64 标注图)
+    _save_record(current_user, result, result.get("image_url") or file.filename or "upload", patient_name, exam_id)
+    return result
 
 # ----------------------------------------------------------------------------------
 # 接口：脑出血检测 (Base64)
 # URL: POST /api/v1/quality/hemorrhage/base64
-# 作用：接收 Base64 编码的图片数据，解码后保存为临时文件并调用 AI 模型检测。
+# 作用：接收 Base64 编码的图片数据，解码为字节后直接调用 AI 模型检测。
 # 对接前端: 
 #   - src/api/quality.js (predictHemorrhage - 默认模式)
 #   - src/views/quality/Hemorrhage.vue (startAnalysisProcess)
 # ----------------------------------------------------------------------------------
-@router.post("/hemorrhage/base64")
+@router.post("/hemorrhage/base64", response_model=HemorrhageDetectionResponse, response_model_exclude_none=True)
 async def hemorrhage_quality_base64(
     request: HemorrhageBase64Request,
+    preview: PreviewOptions = Depends(get_preview_options),
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
 ):
@@ -149,37 +246,241 @@ async def hemorrhage_quality_base64(
     脑出血检测接口（Base64 方式）
     
     Process:
-    1. 解码 Base64 字符串为图像对象
-    2. 保存图像到临时目录
-    3. 验证用户身份
-    4. 调用 run_hemorrhage_detection 执行 AI 检测
-    5. 返回检测结果
-    6. 清理临时文件
+    1. 解码 Base64 字符串并校验为可识别的图像
+    2. 验证用户身份
+    3. 查询结果缓存 (按解码后的内容哈希)，命中则直接返回
+    4. 未命中：在内存中解码图像字节，调用 run_hemorrhage_detection_async 执行 AI 检测 (合批推理)
+    5. 保存检测记录 (后台批量写入) 并返回检测结果
     """
     try:
-        # 1. 解码 Base64 字符串为图像对象
+        # 1. 解码 Base64 字符串，并确认 PIL 可识别 (仅读取文件头，不解码像素)
         image_data = base64.b64decode(request.image_base64)
-        image = Image.open(BytesIO(image_data)).convert("L") # 转为灰度图处理
+        Image.open(BytesIO(image_data))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"图像解码失败: {str(e)}")
 
-    # 2. 保存到临时文件
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
-        image.save(tmp.name)
-        tmp_path = tmp.name
+    # 2. 验证用户身份
+    current_user = await get_current_user(token, db)
 
     try:
-        # 3. 验证用户身份
-        username = await get_current_user(token, db)
-        
-        # 4. 调用 AI 服务进行检测
-        result = run_hemorrhage_detection(tmp_path)
-        return result
+        # 3-4. 查询缓存 / 调用 AI 服务进行检测 (合批推理)
+        result = await _detect_upload(image_data, content_sha256(image_data), preview)
     except HTTPException as he:
         raise he
+    except ExecutorSaturatedError as e:
+        # 推理队列已满：快速拒绝，提示客户端稍后重试 (不占用 worker 排队)
+        raise HTTPException(status_code=503, detail=f"服务繁忙，请稍后重试: {str(e)}", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI检测失败: {str(e)}")
+
+    # 5. 保存检测记录
+    _save_record(current_user, result, result.get("image_url") or request.filename or "upload",
+                 request.patient_name, request.exam_id)
+    return result
+
+# ----------------------------------------------------------------------------------
+# 接口：序列级脑出血检测
+# URL: POST /api/v1/quality/hemorrhage/series
+# 作用：一次请求分析整个头颅 CT 序列 (多个切片文件，或单个多帧 DICOM)，
+#       替代逐张调用 /hemorrhage 的数十次往返；返回逐切片结果与检查级结论。
+# 对接模块：app.services.hemorrhage_ai.run_hemorrhage_series_async
+# ----------------------------------------------------------------------------------
+@router.post("/hemorrhage/series", response_model=HemorrhageSeriesResponse, response_model_exclude_none=True)
+async def hemorrhage_quality_series(
+    files: List[UploadFile] = File(..., description="按切片顺序上传的 PNG/JPG/DICOM 文件，或单个多帧 DICOM"),
+    patient_name: Optional[str] = Form(None),
+    exam_id: Optional[str] = Form(None),
+    preview: PreviewOptions = Depends(get_series_preview_options),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    序列级脑出血检测接口
+
+    Process:
+    1. 验证各文件类型与用户身份
+    2. 按块校验各文件大小 (不将文件读入内存)
+    3. 并行解码、合批推理、逐切片分析，汇总检查级结论
+    4. 保存一条检查级记录 (概率取关键切片)
+    """
+    for file in files:
+        _check_upload_type(file)
+
+    current_user = await get_current_user(token, db)
+
+    sources = []
+    try:
+        for file in files:
+            upload, _, _ = await read_upload_digest(
+                file,
+                max_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024,
+                chunk_size=settings.UPLOAD_CHUNK_SIZE_KB * 1024,
+            )
+            sources.append((file.filename or f"slice_{len(sources)}", upload))
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        result = await run_hemorrhage_series_async(sources, preview)
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=f"服务繁忙，请稍后重试: {str(e)}", headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI检测失败: {str(e)}")
-    finally:
-        # 5. 清理临时文件
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+
+    _save_series_record(current_user, result, patient_name, exam_id)
+    return result
+
+# ----------------------------------------------------------------------------------
+# 接口：提交序列级检测任务 (异步)
+# URL: POST /api/v1/quality/hemorrhage/series/jobs
+# 作用：长序列处理时间可能超过单个 HTTP 请求的超时，改为提交后台任务：
+#       立即返回任务 ID (202)，客户端轮询 GET /api/v1/jobs/{id}，
+#       或通过 SSE (/api/v1/jobs/{id}/events) / WebSocket (/ws/quality/head/progress?job_id=)
+#       订阅逐切片进度与部分结果。
+# 对接模块：app.services.job_manager, app.api.v1.jobs
+# ----------------------------------------------------------------------------------
+@router.post("/hemorrhage/series/jobs", status_code=202, response_model=JobSubmitResponse)
+async def hemorrhage_quality_series_job(
+    files: List[UploadFile] = File(..., description="按切片顺序上传的 PNG/JPG/DICOM 文件，或单个多帧 DICOM"),
+    patient_name: Optional[str] = Form(None),
+    exam_id: Optional[str] = Form(None),
+    preview: PreviewOptions = Depends(get_series_preview_options),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    for file in files:
+        _check_upload_type(file)
+
+    current_user = await get_current_user(token, db)
+
+    # 请求结束后框架会关闭上传文件，后台任务使用自行持有的副本
+    sources = []
+    try:
+        for file in files:
+            spooled = await spool_upload(
+                file,
+                max_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024,
+                chunk_size=settings.UPLOAD_CHUNK_SIZE_KB * 1024,
+                spool_max_size=settings.JOB_UPLOAD_SPOOL_MB * 1024 * 1024,
+            )
+            sources.append((file.filename or f"slice_{len(sources)}", spooled))
+    except UploadTooLargeError as e:
+        for _, spooled in sources:
+            spooled.close()
+        raise HTTPException(status_code=413, detail=str(e))
+
+    def release():
+        for _, spooled in sources:
+            spooled.close()
+
+    async def run_series(progress):
+        result = await run_hemorrhage_series_async(sources, preview, progress=progress)
+        # 与同步序列接口一致：任务成功后保存一条检查级记录
+        _save_series_record(current_user, result, patient_name, exam_id)
+        return result
+
+    job = get_job_manager().submit("hemorrhage_series", current_user.username, run_series, on_finish=release)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"{settings.API_V1_STR}/jobs/{job.id}",
+        "events_url": f"{settings.API_V1_STR}/jobs/{job.id}/events",
+        "ws_url": f"/ws/quality/head/progress?job_id={job.id}",
+    }
+
+# ----------------------------------------------------------------------------------
+# 接口：归档批量检测 (NDJSON 流式返回)
+# URL: POST /api/v1/quality/hemorrhage/archive
+# 作用：回顾性质控审计时上传包含 PNG/DICOM 的 zip / tar 归档 (可为 tar.gz 等压缩格式)，
+#       服务端逐个读取成员并合批推理，每个文件完成后立即返回一行 JSON (application/x-ndjson)，
+#       最后一行为 {"summary": {...}}。请求体上限为 ARCHIVE_MAX_UPLOAD_MB (见 app.main)。
+#       审计结果只随响应返回，不写入检测记录 (不计入检测历史与异常汇总)。
+# 对接模块：app.services.archive_ingest.ingest_archive
+# ----------------------------------------------------------------------------------
+@router.post("/hemorrhage/archive", response_class=StreamingResponse)
+async def hemorrhage_quality_archive(
+    file: UploadFile = File(..., description="包含 PNG/JPG/DICOM 文件的 zip / tar 归档"),
+    preview: PreviewOptions = Depends(get_series_preview_options),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    _check_archive_type(file)
+
+    await get_current_user(token, db)
+
+    # 请求处理函数返回后框架会关闭上传文件，流式响应读取自行持有的副本
+    try:
+        spooled = await spool_upload(
+            file,
+            max_bytes=settings.ARCHIVE_MAX_UPLOAD_MB * 1024 * 1024,
+            chunk_size=settings.UPLOAD_CHUNK_SIZE_KB * 1024,
+            spool_max_size=settings.JOB_UPLOAD_SPOOL_MB * 1024 * 1024,
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    # 开始流式返回之前完成格式校验并占用在途名额，以便返回正确的状态码；
+    # 名额与副本在生成器结束 (或响应未开始即中止) 时释放
+    resources = contextlib.AsyncExitStack()
+    resources.callback(spooled.close)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, check_archive_format, spooled)
+        await resources.enter_async_context(get_inference_executor().slot())
+    except ArchiveFormatError as e:
+        await resources.aclose()
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturatedError as e:
+        await resources.aclose()
+        raise HTTPException(status_code=503, detail=f"服务繁忙，请稍后重试: {str(e)}", headers={"Retry-After": "1"})
+    except BaseException:
+        await resources.aclose()
+        raise
+
+    async def ndjson_lines():
+        try:
+            async for line in ingest_archive(
+                spooled,
+                preview,
+                max_member_bytes=settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024,
+                concurrency=settings.ARCHIVE_CONCURRENCY,
+                use_slot=False,
+            ):
+                yield orjson.dumps(line, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+        finally:
+            await resources.aclose()
+
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"},
+        background=BackgroundTask(resources.aclose),
+    )
+
+# ----------------------------------------------------------------------------------
+# 接口：脑出血检测历史
+# URL: GET /api/v1/quality/hemorrhage/history
+# 作用：按时间倒序分页返回当前用户的检测记录。使用键集分页：首次请求不带 cursor，
+#       之后将响应中的 next_cursor 原样传回获取下一页 (next_cursor 为空表示已到末页)。
+# 对接前端：src/api/quality.js (getHemorrhageHistory)
+# ----------------------------------------------------------------------------------
+@router.get("/hemorrhage/history", response_model=HemorrhageHistoryPage)
+async def hemorrhage_history(
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="每页条数"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    prediction: Optional[str] = Query(None, description="按结论过滤：出血 / 未出血"),
+    confidence: Optional[str] = Query(None, description="按置信度过滤：高 / 中 / 低"),
+    date_from: Optional[date] = Query(None, description="起始日期 (含)"),
+    date_to: Optional[date] = Query(None, description="结束日期 (含)"),
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    current_user = await get_current_user(token, db)
+    try:
+        items, next_cursor = await fetch_hemorrhage_history(
+            db, current_user.id, limit, cursor, prediction, confidence, date_from, date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
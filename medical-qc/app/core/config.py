@@ -26,12 +26,206 @@ class Settings(BaseSettings):
     # 加密算法 (HS256: HMAC with SHA-256)
     ALGORITHM: str = "HS256"
     
-    # Access Token 过期时间 (分钟)
+    # Access Token 过期时间 (分钟，AUTH_MODE=jwt 时生效)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # 认证模式：
+    #   opaque - 登录返回 users.access_token 中的随机令牌，每次请求按令牌查询用户 (经令牌缓存)
+    #   jwt    - 登录签发带过期时间与 token_version 声明的 JWT，请求在进程内验签，
+    #            仅按 AUTH_REVOCATION_CHECK_SECONDS 的间隔查询数据库确认未被吊销 (不透明令牌仍可使用)
+    AUTH_MODE: str = "opaque"
+
+    # JWT 吊销检查间隔 (秒)：同一用户在该间隔内只查询一次 token_version / is_active
+    AUTH_REVOCATION_CHECK_SECONDS: float = 30.0
+
+    # ------------------------------------------------------------------
+    # 密码哈希：哈希计算在独立线程池中执行，登录高峰不阻塞事件循环
+    # ------------------------------------------------------------------
+    # 哈希算法："pbkdf2_sha256" (默认) 或 "bcrypt"；另一种算法的已有哈希仍可验证，并在下次登录时重新哈希
+    PASSWORD_HASH_SCHEME: str = "pbkdf2_sha256"
+
+    # 计算成本 (pbkdf2_sha256 为迭代次数，bcrypt 为 log2 轮数；0 表示使用 passlib 默认值)
+    # 修改后，成本不同的已有哈希在下次登录成功时按新参数重新哈希
+    PASSWORD_HASH_ROUNDS: int = 0
+
+    # 哈希线程池线程数
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # 排队与执行中的哈希任务上限，超过后登录 / 注册立即返回 503
+    PASSWORD_HASH_MAX_PENDING: int = 64
     
     # 跨域资源共享 (CORS) 配置
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:8080"]
 
+    # ------------------------------------------------------------------
+    # 上传大小限制 (超限返回 413，单请求内存占用不随文件大小增长)
+    # ------------------------------------------------------------------
+    # 请求体最大尺寸 (MB)，由中间件在读取请求体前/过程中校验 (Base64 上传约为原文件的 4/3)
+    MAX_REQUEST_BODY_MB: int = 96
+
+    # 单个上传文件最大尺寸 (MB)
+    MAX_UPLOAD_SIZE_MB: int = 64
+
+    # 流式读取上传文件的块大小 (KB)
+    UPLOAD_CHUNK_SIZE_KB: int = 1024
+
+    # ------------------------------------------------------------------
+    # DICOM 窗宽窗位："brain" (40/80 HU) / "subdural" (75/215 HU) /
+    # "dicom" (使用文件自带窗口) / "minmax" (按最大值线性缩放，不做 HU 换算)
+    # ------------------------------------------------------------------
+    DICOM_WINDOW: str = "brain"
+
+    # ------------------------------------------------------------------
+    # 脑出血推理：动态微批处理
+    # ------------------------------------------------------------------
+    # 单次前向推理的最大批大小
+    HEMORRHAGE_BATCH_MAX_SIZE: int = 8
+
+    # 收集批次的最长等待时间 (毫秒)，越大吞吐越高但单请求延迟越大
+    HEMORRHAGE_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # 序列级检测 (/hemorrhage/series) 单次请求的最大切片数
+    HEMORRHAGE_SERIES_MAX_SLICES: int = 256
+
+    # ------------------------------------------------------------------
+    # 归档批量检测 (/hemorrhage/archive)：zip / tar 流式读取，逐文件返回 NDJSON
+    # ------------------------------------------------------------------
+    # 归档上传的请求体上限 (MB)，单独放宽 (其余接口仍受 MAX_REQUEST_BODY_MB 限制)
+    ARCHIVE_MAX_UPLOAD_MB: int = 4096
+
+    # 同时在途的文件数 (建议为 HEMORRHAGE_BATCH_MAX_SIZE 的 1~2 倍)
+    ARCHIVE_CONCURRENCY: int = 16
+
+    # ------------------------------------------------------------------
+    # 异步任务 (序列检测等耗时任务)：提交后返回任务 ID，结果在内存中保留 TTL 秒
+    # ------------------------------------------------------------------
+    JOB_RESULT_TTL_SECONDS: int = 3600
+
+    # 最多保留的任务数 (超出时清理最早结束的任务)
+    JOB_MAX_RETAINED: int = 256
+
+    # 同时执行的任务数，其余任务排队
+    JOB_MAX_ACTIVE: int = 2
+
+    # 任务上传文件的内存缓冲上限 (MB)，超出部分写入临时文件
+    JOB_UPLOAD_SPOOL_MB: int = 8
+
+    # ------------------------------------------------------------------
+    # 检测记录持久化 (写后缓冲)：接口不等待数据库，后台按批量/时间阈值多行写入
+    # ------------------------------------------------------------------
+    RECORD_PERSIST_ENABLED: bool = True
+
+    # 单次写入的最大行数 (缓冲区达到该数量时立即写入)
+    RECORD_FLUSH_BATCH_SIZE: int = 200
+
+    # 最长写入间隔 (毫秒)
+    RECORD_FLUSH_INTERVAL_MS: int = 1000
+
+    # 缓冲区上限 (数据库长时间不可用时丢弃最旧的记录，防止内存无限增长)
+    RECORD_BUFFER_MAX_BACKLOG: int = 10000
+
+    # 服务关闭时排空缓冲区的最长时间 (秒)
+    RECORD_SHUTDOWN_DRAIN_SECONDS: float = 10.0
+
+    # ------------------------------------------------------------------
+    # 访问令牌缓存：令牌 -> 用户，受保护接口不必每次查询数据库
+    # ------------------------------------------------------------------
+    TOKEN_CACHE_ENABLED: bool = True
+
+    # 最大条目数 (LRU 淘汰)
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+
+    # 有效期 (秒)：本进程内的令牌轮换 / 账号禁用立即生效，其他 worker 的变更最迟 TTL 秒后生效
+    TOKEN_CACHE_TTL_SECONDS: float = 60.0
+
+    # ------------------------------------------------------------------
+    # 异常汇总缓存：看板被各工作站轮询，结果在进程内缓存
+    # ------------------------------------------------------------------
+    # 本进程写入新检测记录时立即失效；其他 worker 写入的记录最迟在 TTL 秒后可见
+    SUMMARY_CACHE_TTL_SECONDS: float = 30.0
+
+    # 缓存条目上限 (按接口 + 查询参数区分)
+    SUMMARY_CACHE_MAX_ENTRIES: int = 256
+
+    # ------------------------------------------------------------------
+    # 检测结果缓存：按上传内容哈希 + 模型版本 + 预处理配置缓存结果
+    # ------------------------------------------------------------------
+    HEMORRHAGE_CACHE_ENABLED: bool = True
+
+    # 内存层 LRU 最大条目数 (每条含 Base64 预览图，约数百 KB)
+    HEMORRHAGE_CACHE_MAX_ENTRIES: int = 128
+
+    # 磁盘层目录 (为空则不启用)、总大小上限 (MB) 与有效期 (秒，0 表示不过期)
+    HEMORRHAGE_CACHE_DIR: str = ""
+    HEMORRHAGE_CACHE_DISK_MAX_MB: int = 512
+    HEMORRHAGE_CACHE_DISK_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # ------------------------------------------------------------------
+    # 推理执行器：将解码/预处理/后处理移出事件循环
+    # ------------------------------------------------------------------
+    # 执行器类型："thread" (线程池) 或 "process" (进程池)
+    INFERENCE_EXECUTOR_KIND: str = "thread"
+
+    # 执行器工作线程/进程数
+    INFERENCE_EXECUTOR_WORKERS: int = 2
+
+    # 同时在途的检测请求上限，超过后立即返回 503
+    INFERENCE_MAX_INFLIGHT: int = 16
+
+    # 本进程 torch 推理线程数 (0 表示使用 torch 默认值)
+    INFERENCE_TORCH_THREADS: int = 0
+
+    # ------------------------------------------------------------------
+    # 加载期图优化：BN 折叠 + 移除 Dropout + channels_last
+    # ------------------------------------------------------------------
+    MODEL_OPTIMIZE: bool = True
+
+    # 优化前后 Softmax 概率允许的最大绝对误差，超过则不启用优化
+    MODEL_OPTIMIZE_ATOL: float = 1e-4
+
+    # ------------------------------------------------------------------
+    # 启动预热：服务启动时加载模型并以合成输入预热各批大小，完成前 /health/ready 返回 503
+    # ------------------------------------------------------------------
+    MODEL_WARMUP_ON_STARTUP: bool = True
+
+    # 每个批大小的预热前向次数
+    MODEL_WARMUP_ROUNDS: int = 2
+
+    # ------------------------------------------------------------------
+    # 推理后端："eager" / "torchscript" / "compile" / "onnx"
+    # (可用 scripts/export_hemorrhage_model.py --benchmark 对比各后端延迟)
+    # ------------------------------------------------------------------
+    INFERENCE_BACKEND: str = "eager"
+
+    # ------------------------------------------------------------------
+    # 推理精度："fp32" (默认) 或 "int8" (CPU 量化，需通过 AUC 精度校验才会启用)
+    # ------------------------------------------------------------------
+    INFERENCE_PRECISION: str = "fp32"
+
+    # INT8 静态量化的校准样本数 (取自 data/head_ct)
+    QUANT_CALIBRATION_SAMPLES: int = 32
+
+    # 允许的最大 AUC 下降 (FP32 AUC - INT8 AUC)，超过则拒绝启用量化模型
+    QUANT_MAX_AUC_DROP: float = 0.01
+
+    # 精度校验集的最少样本数 (与校准集不重叠，正负样本各至少 QUANT_MIN_VALIDATION_PER_CLASS 个)，不足则拒绝启用量化模型
+    QUANT_MIN_VALIDATION_SAMPLES: int = 40
+    QUANT_MIN_VALIDATION_PER_CLASS: int = 10
+
+    # ------------------------------------------------------------------
+    # 模型服务模式："local" (每个 API 进程各自加载模型) 或 "pool" (连接多进程模型服务池)
+    # ------------------------------------------------------------------
+    INFERENCE_SERVING_MODE: str = "local"
+
+    # 模型服务池监听地址与认证密钥 (python -m app.services.model_pool)
+    MODEL_POOL_HOST: str = "127.0.0.1"
+    MODEL_POOL_PORT: int = 8765
+    MODEL_POOL_AUTHKEY: str = "medical-qc-model-pool"
+
+    # 推理 worker 进程数与每个 worker 的 torch 线程数 (两者乘积建议 ≈ 物理核数)
+    MODEL_POOL_WORKERS: int = 4
+    MODEL_POOL_THREADS_PER_WORKER: int = 2
+
     class Config:
         case_sensitive = True
 
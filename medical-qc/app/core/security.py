@@ -2,19 +2,43 @@
 # ----------------------------------------------------------------------------------
 # 安全模块 (Security)
 # 作用：提供密码哈希、验证以及 JWT 令牌生成的核心功能。
+#       哈希算法与计算成本取自 Settings (PASSWORD_HASH_SCHEME / PASSWORD_HASH_ROUNDS)，
+#       异步接口中应通过 app.services.password_hasher 调用，避免阻塞事件循环。
 # 对接前端：
 #   - Login.vue (登录): 验证密码
 #   - Register.vue (注册): 哈希密码存储
 # ----------------------------------------------------------------------------------
 
 from passlib.context import CryptContext
-import jwt
-from datetime import datetime, timedelta
+
 from app.core.config import settings
+# JWT 生成与校验统一由 app.utils.jwt_utils 实现 (密钥、算法与有效期取自 Settings)，此处保留原导入路径
+from app.utils.jwt_utils import create_access_token
+
+# 支持验证的哈希算法 (非当前配置的算法视为过时，验证成功后重新哈希)
+SUPPORTED_SCHEMES = ("pbkdf2_sha256", "bcrypt")
 
-# 配置密码哈希上下文 (使用 bcrypt 算法)
+
+# ----------------------------------------------------------------------------------
+# 函数：构造密码哈希上下文
+# 作用：以 scheme 为默认算法；rounds > 0 时固定计算成本，成本不同的已有哈希标记为需要更新。
+# 参数：scheme - 哈希算法, rounds - 计算成本 (0 表示 passlib 默认值)
+# ----------------------------------------------------------------------------------
+def build_password_context(scheme: str, rounds: int = 0) -> CryptContext:
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f"不支持的密码哈希算法: {scheme} (可选: {' / '.join(SUPPORTED_SCHEMES)})")
+    options = {}
+    if rounds > 0:
+        options = {f"{scheme}__default_rounds": rounds,
+                   f"{scheme}__min_rounds": rounds,
+                   f"{scheme}__max_rounds": rounds}
+    schemes = [scheme] + [s for s in SUPPORTED_SCHEMES if s != scheme]
+    return CryptContext(schemes=schemes, default=scheme, deprecated="auto", **options)
+
+
+# 配置密码哈希上下文
 # 作用：自动处理加盐和哈希迭代，保证密码存储安全
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_password_context(settings.PASSWORD_HASH_SCHEME, settings.PASSWORD_HASH_ROUNDS)
 
 # ----------------------------------------------------------------------------------
 # 函数：获取密码哈希值
@@ -32,28 +56,3 @@ def get_password_hash(password: str) -> str:
 # ----------------------------------------------------------------------------------
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
-
-# JWT 配置 (引用 config.py)
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
-
-# ----------------------------------------------------------------------------------
-# 函数：生成 Access Token
-# 作用：根据用户信息和过期时间生成 JWT 字符串。
-# 参数：
-#   - data: 包含用户标识的字典 (如 {"sub": "username"})
-#   - expires_delta: 过期时间增量
-# 对接前端：登录成功后返回此 Token
-# ----------------------------------------------------------------------------------
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    # 添加过期时间字段
-    to_encode.update({"exp": expire})
-    
-    # 编码生成 Token
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
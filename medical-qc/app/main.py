@@ -4,29 +4,44 @@
 # 作用：FastAPI 应用的启动入口，负责挂载路由、中间件、静态资源和事件处理。
 #       作为后端服务的核心调度器，将请求分发至各个 API 模块。
 # 对接模块：
-#   - 路由模块: app.api.v1.* (auth, quality, summary)
+#   - 路由模块: app.api.v1.* (auth, quality, summary, jobs)
 #   - 数据库: app.utils.database (初始化连接)
 #   - 前端入口: src/main.js (API Base URL 配置)
 # ----------------------------------------------------------------------------------
 
+import asyncio
+import logging
 from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import traceback
 
 # 导入路由模块
 from app.api.v1.auth import router as auth_router
 from app.api.v1.quality import router as quality_router
 from app.api.v1.summary import router as summary_router
+from app.api.v1.jobs import router as jobs_router, ws_router as jobs_ws_router
 
 # 导入所有模型以确保 create_all 能找到它们 (SQLAlchemy)
 from app.models.user import User
 from app.models.user_role import UserRole
 from app.models.hemorrhage_record import HemorrhageRecord
+from app.models.qc_daily_stat import QCDailyStat
 from app.utils.database import engine, Base
+from app.utils.metrics import REGISTRY
+from app.core.config import settings
+from app.services.hemorrhage_ai import get_batcher, get_warmup_error, is_model_ready, warmup_model
+from app.services.inference_executor import get_inference_executor
+from app.services.password_hasher import get_password_hasher
+from app.services.job_manager import get_job_manager
+from app.services.record_writer import get_record_buffer
+from app.services.summary_service import invalidate_summary_cache
+from app.utils.upload_limits import BodySizeLimitMiddleware
+
+logger = logging.getLogger(__name__)
 
 # ----------------------------------------------------------------------------------
 # FastAPI 实例初始化
@@ -53,6 +68,8 @@ async def startup_event():
     应用启动时的初始化操作
     1. 创建数据库表 (仅用于开发环境，生产环境应使用 Alembic)
     2. 创建必要的存储目录 (data, temp)
+    3. 启动检测记录的后台批量写入协程
+    4. 后台加载、优化并预热脑出血检测模型 (完成后 /health/ready 才返回就绪)
     """
     # 自动创建表结构
     async with engine.begin() as conn:
@@ -62,6 +79,41 @@ async def startup_event():
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
+    # 检测记录写后缓冲 (接口不等待数据库写入)；写入成功后使异常汇总缓存失效
+    record_buffer = get_record_buffer()
+    record_buffer.add_flush_listener(invalidate_summary_cache)
+    record_buffer.start()
+
+    # 模型预热在线程中执行，不阻塞事件循环 (存活探针在预热期间仍可响应)
+    if settings.MODEL_WARMUP_ON_STARTUP:
+        app.state.warmup_task = asyncio.create_task(_warmup_in_background())
+
+async def _warmup_in_background():
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, warmup_model)
+    except Exception:
+        # 失败原因已记录，/health/ready 持续返回 503 并附带错误信息
+        logger.exception("模型预热失败，服务保持未就绪状态")
+
+# ----------------------------------------------------------------------------------
+# 生命周期事件：关闭时
+# 作用：取消后台任务、排空检测记录缓冲区，停止推理调度协程、推理执行器与密码哈希线程池，避免进程退出时遗留挂起的请求或丢失记录。
+# ----------------------------------------------------------------------------------
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    应用关闭时的清理操作
+    1. 取消仍在执行的后台任务
+    2. 排空检测记录缓冲区 (写入尚未落库的记录)
+    3. 停止脑出血推理的动态微批处理器
+    4. 关闭推理执行器 (线程池/进程池) 与密码哈希线程池
+    """
+    await get_job_manager().shutdown()
+    await get_record_buffer().stop(drain_timeout=settings.RECORD_SHUTDOWN_DRAIN_SECONDS)
+    await get_batcher().stop()
+    get_inference_executor().shutdown()
+    get_password_hasher().shutdown()
+
 # ----------------------------------------------------------------------------------
 # 静态资源挂载
 # ----------------------------------------------------------------------------------
@@ -73,6 +125,18 @@ app.mount("/static/hemorrhage", StaticFiles(directory=str(UPLOAD_DIR)), name="he
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
+# ----------------------------------------------------------------------------------
+# 中间件配置：请求体大小限制
+# 作用：超大请求在读取请求体之前 (Content-Length) 或接收过程中 (chunked) 即返回 413。
+#       先于 CORS 注册 (位于 CORS 内层)，保证 413 响应同样带有跨域头，前端可读取错误信息。
+# ----------------------------------------------------------------------------------
+# 归档批量检测接口单独放宽上限 (上传内容由框架落盘，按成员流式读取，不随归档大小占用内存)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=settings.MAX_REQUEST_BODY_MB * 1024 * 1024,
+    path_limits={f"{settings.API_V1_STR}/quality/hemorrhage/archive": settings.ARCHIVE_MAX_UPLOAD_MB * 1024 * 1024},
+)
+
 # ----------------------------------------------------------------------------------
 # 中间件配置：CORS
 # 作用：允许前端跨域访问 API。
@@ -92,10 +156,41 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/api/v1/auth")
 app.include_router(quality_router, prefix="/api/v1/quality")
 app.include_router(summary_router, prefix="/api/v1/summary")
+app.include_router(jobs_router, prefix="/api/v1/jobs")
+app.include_router(jobs_ws_router)
 
 # 挂载临时目录 (用于调试或临时文件访问)
 app.mount("/api/v1/temp", StaticFiles(directory=str(TEMP_DIR)), name="temp")
 
+# ----------------------------------------------------------------------------------
+# 接口：运行指标导出
+# URL: GET /metrics
+# 作用：以 Prometheus 文本格式导出进程内指标 (如推理批大小、排队等待直方图)。
+# ----------------------------------------------------------------------------------
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+# ----------------------------------------------------------------------------------
+# 接口：健康检查
+# URL: GET /health/live  - 存活探针：进程可响应即返回 200
+#      GET /health/ready - 就绪探针：模型加载并预热完成前返回 503，负载均衡器据此摘除冷实例
+# ----------------------------------------------------------------------------------
+@app.get("/health/live", include_in_schema=False)
+async def health_live():
+    return {"status": "alive"}
+
+@app.get("/health/ready", include_in_schema=False)
+async def health_ready():
+    # 关闭启动预热时不做就绪门控 (模型在首个请求时加载)
+    if is_model_ready() or not settings.MODEL_WARMUP_ON_STARTUP:
+        return {"status": "ready"}
+    content = {"status": "warming_up"}
+    error = get_warmup_error()
+    if error:
+        content = {"status": "failed", "detail": error}
+    return JSONResponse(status_code=503, content=content)
+
 # ----------------------------------------------------------------------------------
 # 全局异常处理
 # ----------------------------------------------------------------------------------
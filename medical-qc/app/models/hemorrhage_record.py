@@ -4,10 +4,11 @@
 # 作用：定义 hemorrhage_records 表结构，存储 AI 脑出血检测的历史记录。
 # 对接前端：
 #   - views/quality/Hemorrhage.vue (用于展示检测结果和历史记录)
-#   - 对应 API: /api/v1/quality/predict_hemorrhage (写入记录)
+#   - 对应 API: /api/v1/quality/hemorrhage(/base64, /series, /series/jobs) (经 app.services.record_writer 批量写入)；
+#     归档批量检测 (/hemorrhage/archive) 为回顾性审计，不写入本表
 # ----------------------------------------------------------------------------------
 
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, BigInteger, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.utils.database import Base
@@ -53,6 +54,14 @@ class HemorrhageRecord(Base):
     hemorrhage_probability = Column(Float, nullable=False)    # 出血概率
     no_hemorrhage_probability = Column(Float, nullable=False) # 未出血概率
     
+    # 异常处理状态："待处理", "处理中", "已解决", "忽略"；未检出异常的记录为空
+    # 对接前端：summary/IssueList.vue 的状态标签与筛选
+    status = Column(String(20), nullable=True)
+
+    # 异常描述，如 "脑出血、中线偏移" (由检测结果生成，参与全文检索)；未检出异常的记录为空
+    # 对接前端：summary/IssueList.vue 的异常描述列
+    issue_description = Column(String(200), nullable=True)
+
     # 分析耗时 (毫秒)
     analysis_duration = Column(Float, nullable=True)
     
@@ -64,3 +73,20 @@ class HemorrhageRecord(Base):
     # -------------------
     # 关联执行该检测的用户
     user = relationship("User", back_populates="hemorrhage_records")
+
+    # -------------------
+    # 索引
+    # -------------------
+    # 历史记录按用户倒序分页 (键集分页 (created_at, id))：WHERE user_id = ? ORDER BY created_at DESC, id DESC
+    # 直接沿索引顺序读取，不需要 filesort，翻页耗时与记录总数无关
+    # (已有数据库执行 python scripts/upgrade_schema.py 补建)
+    #
+    # 异常列表 (/summary/recent)：按时间倒序 (全部异常 / 按状态筛选) 与按患者姓名、检查号、异常描述检索
+    # 全文索引使用 ngram 分词 (中文姓名无空格分隔)，最短检索词为 ngram_token_size (默认 2)
+    __table_args__ = (
+        Index("ix_hemorrhage_records_user_created", user_id, created_at.desc(), id.desc()),
+        Index("ix_hemorrhage_records_created", created_at.desc(), id.desc()),
+        Index("ix_hemorrhage_records_status_created", status, created_at.desc(), id.desc()),
+        Index("ft_hemorrhage_records_search", patient_name, exam_id, issue_description,
+              mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
@@ -0,0 +1,53 @@
+# app/models/qc_daily_stat.py
+# ----------------------------------------------------------------------------------
+# 数据库模型：质控日汇总 (QCDailyStat)
+# 作用：定义 qc_daily_stats 表结构，按 (日期, 检查类型, 医院, 科室, 异常类型, 处理状态)
+#       预聚合检测记录数。检测记录批量写入、异常状态变更 (change_issue_status) 时在同一事务内增量更新
+#       (见 app.services.stats_rollup)，
+#       异常汇总接口只读取本表，查询量与历史记录总数无关。
+# 对接前端：
+#   - views/summary/index.vue (统计卡片、趋势图、分布图)
+#   - 对应 API: /api/v1/summary/stats, /trend, /distribution
+# ----------------------------------------------------------------------------------
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.utils.database import Base
+
+class QCDailyStat(Base):
+    """
+    质控日汇总模型类
+    映射表名: qc_daily_stats
+
+    作用：
+        每个维度组合每天一行，record_count 为该组合的检测记录数。
+        维度列不使用 NULL (空字符串表示"无")，保证唯一键能够去重。
+    """
+    __tablename__ = "qc_daily_stats"
+
+    # 主键 ID
+    id = Column(Integer, primary_key=True)
+
+    # -------------------
+    # 汇总维度
+    # -------------------
+    stat_date = Column(Date, nullable=False)                            # 检测日期
+    exam_type = Column(String(50), nullable=False)                      # 检查类型，如 "脑出血检测"
+    hospital = Column(String(100), nullable=False, server_default="")   # 所属医院 (检测用户)
+    department = Column(String(50), nullable=False, server_default="")  # 所属科室 (检测用户)
+    issue_type = Column(String(50), nullable=False, server_default="")  # 异常类型，空字符串表示无异常
+    status = Column(String(20), nullable=False, server_default="")      # 处理状态，空字符串表示无异常
+
+    # -------------------
+    # 汇总值
+    # -------------------
+    record_count = Column(Integer, nullable=False, default=0)
+
+    # 最后更新时间
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # 唯一键同时作为按日期范围查询的索引 (stat_date 为最左列)
+    __table_args__ = (
+        UniqueConstraint("stat_date", "exam_type", "hospital", "department", "issue_type", "status",
+                         name="uq_qc_daily_stats_key"),
+    )
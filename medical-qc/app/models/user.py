@@ -57,6 +57,10 @@ class User(Base):
     # 作用：用于实现简单的服务端 Token 状态管理（如单点登录，或强制登出）
     access_token = Column(String(255), unique=True)
 
+    # 令牌版本 (AUTH_MODE=jwt 时写入 JWT 的 ver 声明)
+    # 作用：递增后该用户此前签发的全部 JWT 失效 (强制登出、修改密码)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+
     # -------------------
     # 关联关系
     # -------------------
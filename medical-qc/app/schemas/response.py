@@ -48,3 +48,140 @@ class LoginResponse(BaseModel):
     access_token: str # JWT 令牌字符串
     token_type: str   # 令牌类型 (通常为 "bearer")
     user: Dict[str, Any] # 用户信息摘要 (用于前端显示用户昵称等)
+
+# ----------------------------------------------------------------------------------
+# 脑出血检测结果 (HemorrhageDetectionResponse)
+# 作用：描述 /api/v1/quality/hemorrhage(/base64) 的返回结构
+# 对接前端：Hemorrhage.vue 中的 finalizeAnalysis 方法
+# 说明：预览图相关字段随 preview 参数变化，未生成的字段不出现在响应中
+# ----------------------------------------------------------------------------------
+class HemorrhageProbability(BaseModel):
+    hemorrhage: float     # 出血概率
+    no_hemorrhage: float  # 未出血概率
+
+class HemorrhageDetectionResponse(BaseModel):
+    prediction: str                  # "出血" / "未出血"
+    confidence: str                  # 置信度等级："高" / "中" / "低"
+    probability: HemorrhageProbability
+    duration_ms: float               # 推理与分析耗时 (毫秒)
+    device: str                      # 推理设备 (cpu / cuda)
+    image_width: int                 # 分析图像尺寸 (BBox 坐标系)
+    image_height: int
+    bboxes: List[List[int]]          # 出血区域 [x, y, w, h]
+    midline_shift: bool              # 是否存在中线偏移
+    midline_detail: str
+    ventricle_issue: bool            # 是否存在脑室异常
+    ventricle_detail: str
+    # 预览图 (preview=png/jpeg/webp 内嵌 Base64；preview=url 返回 image_url)
+    image_base64: Optional[str] = None
+    image_format: Optional[str] = None
+    preview_width: Optional[int] = None
+    preview_height: Optional[int] = None
+    image_url: Optional[str] = None
+    # 结果是否来自结果缓存 (命中时 duration_ms 为首次检测的耗时)；序列检测不经缓存，为空
+    cached: Optional[bool] = None
+
+# ----------------------------------------------------------------------------------
+# 序列级脑出血检测结果 (HemorrhageSeriesResponse)
+# 作用：描述 /api/v1/quality/hemorrhage/series 的返回结构 (检查级结论 + 逐切片结果)
+# ----------------------------------------------------------------------------------
+class HemorrhageSeriesSlice(HemorrhageDetectionResponse):
+    index: int                   # 切片序号 (按上传顺序展开多帧后的位置)
+    source: str                  # 来源文件名
+    frame: Optional[int] = None  # 多帧 DICOM 中的帧号
+
+class HemorrhageSeriesResponse(BaseModel):
+    prediction: str                    # 检查级结论："出血" / "未出血"
+    confidence: str
+    slice_count: int
+    positive_slices: List[int]         # 判定出血的切片序号
+    key_slice: int                     # 出血概率最高的切片序号
+    max_hemorrhage_probability: float
+    midline_shift: bool                # 任一切片存在中线偏移
+    ventricle_issue: bool              # 任一切片存在脑室异常
+    duration_ms: float                 # 整个序列的处理耗时 (毫秒)
+    slices: List[HemorrhageSeriesSlice]
+
+# ----------------------------------------------------------------------------------
+# 脑出血检测历史 (HemorrhageHistory*)
+# 作用：描述 /api/v1/quality/hemorrhage/history 的返回结构 (键集分页)
+# 对接前端：src/api/quality.js (getHemorrhageHistory)
+# ----------------------------------------------------------------------------------
+class HemorrhageHistoryItem(BaseModel):
+    id: int
+    created_at: Optional[str] = None          # ISO 8601
+    patient_name: Optional[str] = None
+    exam_id: Optional[str] = None
+    image_path: str
+    prediction: str
+    confidence_level: Optional[str] = None
+    hemorrhage_probability: float
+    no_hemorrhage_probability: float
+    analysis_duration: Optional[float] = None  # 毫秒
+
+class HemorrhageHistoryPage(BaseModel):
+    items: List[HemorrhageHistoryItem]
+    next_cursor: Optional[str] = None  # 下一页游标 (为空表示没有更多记录)
+
+# ----------------------------------------------------------------------------------
+# 异步任务 (Job*)
+# 作用：描述 /api/v1/jobs/{id} 与任务提交接口的返回结构
+# 对接前端：Head.vue (WebSocket /ws/quality/head/progress 推送同样结构的进度事件)
+# ----------------------------------------------------------------------------------
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str        # queued / running / succeeded / failed
+    status_url: str    # 轮询地址 (GET)
+    events_url: str    # SSE 进度流
+    ws_url: str        # WebSocket 进度流
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str                      # 任务类型 (如 hemorrhage_series)
+    status: str
+    stage: Optional[str] = None    # 当前阶段：decode / analyze
+    completed: int                 # 当前阶段已完成的数量
+    total: int
+    created_at: float
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None  # 成功后的最终结果 (结构同 HemorrhageSeriesResponse)
+    partial_results: Optional[List[Dict[str, Any]]] = None  # 执行中已完成的切片结果
+
+# ----------------------------------------------------------------------------------
+# 异常汇总 (Summary*)
+# 作用：描述 /api/v1/summary/* 各接口的返回结构
+# 对接前端：views/summary/index.vue (统计卡片、趋势图、分布图、异常列表)
+# ----------------------------------------------------------------------------------
+class SummaryStats(BaseModel):
+    totalIssues: int          # 累计异常总数
+    todayIssues: int          # 今日新增异常
+    pendingIssues: int        # 待处理异常
+    resolutionRate: float     # 解决率 (%)
+    avgResolutionTime: Optional[float] = None  # 平均处理时间 (小时)，未记录处理完成时间时为空
+
+class IssueTrend(BaseModel):
+    dates: List[str]   # 日期标签 (M/D)
+    counts: List[int]  # 每日异常数
+    solved: List[int]  # 每日解决数
+
+class IssueDistributionItem(BaseModel):
+    value: int  # 数量
+    name: str   # 异常类型
+
+class RecentIssue(BaseModel):
+    id: str
+    date: str
+    patientName: str
+    examId: str
+    type: str
+    description: str
+    status: str
+    priority: str
+    imageUrl: Optional[str] = None
+
+class RecentIssuePage(BaseModel):
+    total: int
+    items: List[RecentIssue]
+    totalApproximate: bool = False      # 有检索词时总数计数到上限为止，为 True 表示实际数量不少于 total
+    nextCursor: Optional[str] = None    # 下一页游标 (为空表示没有更多记录)
@@ -0,0 +1,213 @@
+# app/services/archive_ingest.py
+# ----------------------------------------------------------------------------------
+# 归档批量检测 (Archive Ingestion)
+# 作用：回顾性质控审计需要一次处理数千张切片，按 zip / tar 归档整体上传：
+#       1. 逐个读取归档成员 (zip 按目录随机读取，tar 以流模式顺序读取)，不解压到磁盘；
+#       2. 有界窗口内并发检测，切片经动态微批处理器合批推理，吞吐接近模型批处理上限；
+#       3. 每个文件完成后立即产出一行结果 (NDJSON)，最后一行为汇总。
+#       内存占用只与窗口大小有关，与归档大小无关。
+# 对接模块：
+#   - 上游调用: app.api.v1.quality (POST /hemorrhage/archive)
+#   - 后端服务: app.services.hemorrhage_ai (run_hemorrhage_detection_async / 结果缓存)
+#   - 配置项:   app.core.config.Settings (ARCHIVE_*)
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import contextlib
+import logging
+import os
+import tarfile
+import time
+import zipfile
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from app.services.hemorrhage_ai import (
+    cached_detection, content_sha256, detection_cache_key, run_hemorrhage_detection_async,
+)
+from app.services.inference_executor import get_inference_executor
+from app.services.preview import PreviewOptions
+from app.utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+_archive_files = Counter("archive_files_total", "归档批量检测处理的文件数")
+_archive_failures = Counter("archive_file_failures_total", "归档中检测失败或被跳过的文件数")
+
+
+class ArchiveFormatError(ValueError):
+    """上传内容不是可识别的 zip / tar 归档"""
+
+
+class _Skipped:
+    """归档成员未被检测的原因 (过大等)，作为一行错误结果输出"""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+def _is_hidden(name: str) -> bool:
+    """忽略 macOS 资源分支与隐藏文件 (__MACOSX/、._xxx、.DS_Store)"""
+    parts = name.replace("\\", "/").split("/")
+    return "__MACOSX" in parts or os.path.basename(name).startswith(".")
+
+
+def check_archive_format(fileobj: BinaryIO) -> str:
+    """
+    识别归档格式 (在开始流式返回之前调用，格式错误时接口可直接返回 400)
+
+    返回：
+        "zip" 或 "tar"
+    异常：
+        ArchiveFormatError - 既不是 zip 也不是 tar
+    """
+    try:
+        fileobj.seek(0)
+        if zipfile.is_zipfile(fileobj):
+            return "zip"
+        fileobj.seek(0)
+        try:
+            with tarfile.open(fileobj=fileobj, mode="r|*"):
+                return "tar"
+        except tarfile.TarError as e:
+            raise ArchiveFormatError(f"不支持的归档格式 (仅支持 zip / tar): {e}")
+    finally:
+        fileobj.seek(0)
+
+
+def iter_archive_members(fileobj: BinaryIO, max_member_bytes: int) -> Iterator[Tuple[str, object]]:
+    """
+    逐个读取归档中的常规文件
+
+    返回：
+        迭代 (成员名, bytes | _Skipped)；每次只有一个成员的内容驻留内存
+    异常：
+        ArchiveFormatError - 既不是 zip 也不是 tar
+    说明：
+        超过 max_member_bytes 的成员不读取内容 (zip 按声明的解压大小判断，读取时同样限长，防止压缩炸弹)。
+    """
+    fileobj.seek(0)
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or _is_hidden(info.filename):
+                    continue
+                if info.file_size > max_member_bytes:
+                    yield info.filename, _Skipped(f"文件过大 ({info.file_size} 字节)")
+                    continue
+                with archive.open(info) as member:
+                    data = member.read(max_member_bytes + 1)
+                if len(data) > max_member_bytes:
+                    yield info.filename, _Skipped("文件过大")
+                    continue
+                yield info.filename, data
+        return
+
+    fileobj.seek(0)
+    try:
+        # 流模式 (r|*)：顺序读取，支持 gzip/bz2/xz 压缩，不需要随机访问
+        archive = tarfile.open(fileobj=fileobj, mode="r|*")
+    except tarfile.TarError as e:
+        raise ArchiveFormatError(f"不支持的归档格式 (仅支持 zip / tar): {e}")
+    with archive:
+        for member in archive:
+            if not member.isfile() or _is_hidden(member.name):
+                continue
+            if member.size > max_member_bytes:
+                yield member.name, _Skipped(f"文件过大 ({member.size} 字节)")
+                continue
+            yield member.name, archive.extractfile(member).read()
+
+
+async def _detect_member(name: str, data: bytes, preview: PreviewOptions) -> Dict:
+    """检测单个成员 (复用按内容哈希的结果缓存，审计重跑时直接命中)"""
+    return await cached_detection(
+        detection_cache_key(content_sha256(data), preview),
+        lambda: run_hemorrhage_detection_async(data, preview, use_slot=False),
+    )
+
+
+async def ingest_archive(fileobj: BinaryIO, preview: Optional[PreviewOptions] = None,
+                         max_member_bytes: int = 64 * 1024 * 1024,
+                         concurrency: int = 16, use_slot: bool = True) -> AsyncIterator[Dict]:
+    """
+    流式检测归档中的全部文件
+
+    参数：
+        fileobj          - 归档文件对象 (zip 需可 seek；上传文件已由框架落入临时文件)
+        preview          - 预览图模式，默认 none
+        max_member_bytes - 单个成员的大小上限
+        concurrency      - 同时在途的文件数 (建议为推理批大小的 1~2 倍，使每批都能凑满)
+        use_slot         - 是否在此占用推理执行器的在途名额；调用方已在开始流式返回前持有名额时设为 False
+    返回：
+        异步迭代每个文件的结果 (按完成顺序)：
+            {"index", "file", "status": "ok", ...检测结果} 或 {"index", "file", "status": "error", "detail"}
+        最后产出 {"summary": {...}}
+    异常：
+        ArchiveFormatError - 归档格式不支持 (在产出任何结果之前抛出)
+        ExecutorSaturatedError - 推理队列已满 (整个归档只占用一个在途名额)
+    """
+    preview = preview or PreviewOptions(mode="none")
+    loop = asyncio.get_running_loop()
+    members = iter_archive_members(fileobj, max_member_bytes)
+    started = time.time()
+    counts = {"files": 0, "succeeded": 0, "failed": 0, "hemorrhage": 0}
+
+    def next_member():
+        return next(members, None)
+
+    async def detect(index: int, name: str, data) -> Dict:
+        if isinstance(data, _Skipped):
+            return {"index": index, "file": name, "status": "error", "detail": data.reason}
+        try:
+            result = await _detect_member(name, data, preview)
+        except Exception as e:
+            logger.warning(f"⚠️ 归档文件检测失败 ({name}): {e}")
+            return {"index": index, "file": name, "status": "error", "detail": str(e)}
+        return {"index": index, "file": name, "status": "ok", **result}
+
+    def record(line: Dict):
+        _archive_files.inc()
+        counts["files"] += 1
+        if line["status"] == "ok":
+            counts["succeeded"] += 1
+            counts["hemorrhage"] += line["prediction"] == "出血"
+        else:
+            counts["failed"] += 1
+            _archive_failures.inc()
+
+    async with (get_inference_executor().slot() if use_slot else contextlib.nullcontext()):
+        pending = set()
+        index = 0
+        exhausted = False
+        try:
+            while not exhausted or pending:
+                # 补满窗口：成员读取 (解压) 在线程中执行，不阻塞事件循环
+                while not exhausted and len(pending) < concurrency:
+                    try:
+                        member = await loop.run_in_executor(None, next_member)
+                    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+                        # 归档中途损坏：已读取的文件照常完成，剩余部分无法继续读取
+                        logger.warning(f"⚠️ 归档读取中断: {e}")
+                        line = {"index": index, "file": None, "status": "error", "detail": f"归档读取中断: {e}"}
+                        record(line)
+                        yield line
+                        member = None
+                    if member is None:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(detect(index, *member)))
+                    index += 1
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    line = task.result()
+                    record(line)
+                    yield line
+        finally:
+            # 客户端断开 (生成器被关闭) 时取消窗口内尚未完成的检测
+            for task in pending:
+                task.cancel()
+
+    yield {"summary": {**counts, "duration_ms": round((time.time() - started) * 1000, 2)}}
@@ -2,7 +2,8 @@
 # ----------------------------------------------------------------------------------
 # 认证服务层 (Auth Service)
 # 作用：封装用户注册和登录的核心业务逻辑，包括密码加密、Token 生成和数据库操作。
-#       使用 Passlib 进行密码哈希处理，确保安全性。
+#       使用 Passlib 进行密码哈希处理，确保安全性 (哈希在独立线程池中执行，见 app.services.password_hasher)。
+#       AUTH_MODE=jwt 时登录签发带过期时间的 JWT (见 app.services.jwt_auth)，否则返回不透明令牌。
 # 对接前端：
 #   - views/auth/Login.vue (登录)
 #   - views/auth/Register.vue (注册)
@@ -10,17 +11,18 @@
 #   - app.api.v1.auth (调用本服务的路由)
 # ----------------------------------------------------------------------------------
 
+import logging
 import secrets
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import settings
 from app.models.user import User
 from app.models.user_role import UserRole
-from passlib.context import CryptContext
+from app.services.jwt_auth import issue_access_token
+from app.services.password_hasher import get_password_hasher
 
-# 全局密码加密上下文配置
-# 使用 pbkdf2_sha256 算法，deprecated="auto" 允许自动升级旧哈希
-# 注意：应确保与 app.core.security 中的配置一致 (当前可能存在差异)
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+logger = logging.getLogger(__name__)
 
 
 # ----------------------------------------------------------------------------------
@@ -64,7 +66,7 @@ async def register_user(
         await db.commit()
 
     # 3. 密码加密与用户创建
-    hashed_pw = pwd_context.hash(password)  # 加密密码
+    hashed_pw = await get_password_hasher().hash(password)  # 加密密码 (线程池中执行)
     token = secrets.token_urlsafe(32)       # 生成初始 Access Token
     
     new_user = User(
@@ -97,8 +99,8 @@ async def login_user(db: AsyncSession, username: str, password: str):
     Steps:
     1. 根据用户名查询用户。
     2. 如果用户不存在，返回错误。
-    3. 使用 pwd_context 验证密码是否匹配。
-    4. 验证通过则返回用户的 Access Token。
+    3. 在哈希线程池中验证密码；哈希的算法或成本与当前配置不一致时顺带重新哈希。
+    4. 验证通过则返回 Access Token (AUTH_MODE=jwt 时为新签发的 JWT)。
     """
     # 1. 查询用户
     result = await db.execute(select(User).where(User.username == username))
@@ -109,10 +111,37 @@ async def login_user(db: AsyncSession, username: str, password: str):
         return None, "用户名不存在"
 
     # 3. 验证密码
-    if not pwd_context.verify(password, user.password_hash):
+    ok, new_hash = await get_password_hasher().verify_and_update(password, user.password_hash)
+    if not ok:
         return None, "密码错误"
+    if new_hash is not None:
+        # 重新哈希失败不影响本次登录，下次登录时会再次尝试
+        user.password_hash = new_hash
+        try:
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.warning(f"⚠️ 密码重新哈希保存失败 (user_id={user.id}): {e}")
 
     # 4. 登录成功，返回 Token
-    # 注意：实际生产环境建议在此处更新 Token 或记录登录时间
-    print(f"✅ 登录成功，token: {user.access_token}")
+    if settings.AUTH_MODE == "jwt":
+        return issue_access_token(user), None
     return user.access_token, None
+
+
+# ----------------------------------------------------------------------------------
+# 函数：吊销用户令牌 (revoke_user_tokens)
+# 作用：递增 token_version 使已签发的 JWT 失效，并轮换不透明令牌 (退出登录时调用，所有设备上的令牌一并失效)。
+#       通过 ORM 修改，提交后本进程的令牌缓存与吊销检查结果随之清除 (见 app.services.token_cache)。
+# 参数：db (Session), user_id
+# 返回：是否找到该用户
+# 对接 API：POST /api/v1/auth/logout
+# ----------------------------------------------------------------------------------
+async def revoke_user_tokens(db: AsyncSession, user_id: int) -> bool:
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+    if user is None:
+        return False
+    user.token_version = (user.token_version or 0) + 1
+    user.access_token = secrets.token_urlsafe(32)
+    await db.commit()
+    return True
@@ -0,0 +1,211 @@
+# app/services/dicom_decode.py
+# ----------------------------------------------------------------------------------
+# DICOM 解码 (DICOM Decode Path)
+# 作用：为 CT 影像提供一等公民的 DICOM 解码路径，替代 "PIL 失败后再尝试 DICOM" 的兜底逻辑：
+#       1. 通过 128 字节前导码后的 "DICM" 标记识别 DICOM，无需先让 PIL 解析失败；
+#       2. 像素数据延迟读取 (defer_size)：先校验行列数、采样数等标签，通过后才读取并解码像素；
+#       3. 将 RescaleSlope/RescaleIntercept (换算为 HU) 与窗宽窗位合并为一次向量化运算：
+#          16 位以内的像素使用整数查找表 (LUT)，其余使用 float32 单次计算。
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai.load_image
+#   - 配置项:   app.core.config.Settings (DICOM_WINDOW)
+# ----------------------------------------------------------------------------------
+
+from functools import lru_cache
+from io import BytesIO
+from typing import BinaryIO, Optional, Tuple, Union
+
+import numpy as np
+import pydicom
+from pydicom.dataset import Dataset
+
+# 前导码 (128 字节) 之后的 DICOM 标记
+DICOM_MAGIC = b"DICM"
+DICOM_MAGIC_OFFSET = 128
+
+# 窗位/窗宽预设 (单位 HU)
+WINDOW_PRESETS = {
+    "brain": (40.0, 80.0),      # 脑窗：脑实质与急性出血
+    "subdural": (75.0, 215.0),  # 硬膜下窗：贴近颅骨的薄层出血
+}
+# 其他取值：
+#   "dicom"  - 使用文件自带的 WindowCenter / WindowWidth (缺失时回退到脑窗)
+#   "minmax" - 原始行为：按像素最大值线性缩放 (不做 HU 换算)
+WINDOW_MODES = tuple(WINDOW_PRESETS) + ("dicom", "minmax")
+
+Source = Union[str, bytes, BinaryIO]
+
+# 超过该大小的元素延迟读取 (像素数据)
+PIXEL_DEFER_SIZE = "64 KB"
+
+
+class DicomDecodeError(ValueError):
+    """DICOM 标签校验失败或像素数据无法解码"""
+
+
+def is_dicom(source: Source) -> bool:
+    """根据前导码后的 "DICM" 标记判断是否为 DICOM (文件对象从开头读取，之后恢复原指针位置)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[DICOM_MAGIC_OFFSET:DICOM_MAGIC_OFFSET + 4]) == DICOM_MAGIC
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            header = f.read(DICOM_MAGIC_OFFSET + 4)
+    else:
+        position = source.tell()
+        source.seek(0)
+        header = source.read(DICOM_MAGIC_OFFSET + 4)
+        source.seek(position)
+    return header[DICOM_MAGIC_OFFSET:] == DICOM_MAGIC
+
+
+def _rewind(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BytesIO(source)
+    if not isinstance(source, str):
+        source.seek(0)
+    return source
+
+
+def read_dataset(source: Source) -> Dataset:
+    """
+    读取 DICOM 并校验图像标签，像素数据延迟读取 (defer_size)
+
+    说明：
+        只解析一次文件；超过 PIXEL_DEFER_SIZE 的元素 (即像素数据) 在首次访问 pixel_array 时才读取，
+        标签校验失败时不会产生任何像素 I/O 与解码开销。
+    异常：
+        DicomDecodeError - 缺少图像标签、不是单通道灰度图或不含像素数据
+    """
+    ds = pydicom.dcmread(_rewind(source), defer_size=PIXEL_DEFER_SIZE)
+    rows, columns = ds.get("Rows"), ds.get("Columns")
+    if not rows or not columns:
+        raise DicomDecodeError("DICOM 文件不包含图像 (缺少 Rows/Columns)")
+    if int(ds.get("SamplesPerPixel", 1)) != 1:
+        raise DicomDecodeError("仅支持单通道灰度 DICOM 影像")
+    if "PixelData" not in ds:
+        raise DicomDecodeError("DICOM 文件不包含像素数据")
+    return ds
+
+
+def _window(ds: Dataset, mode: str) -> Optional[Tuple[float, float]]:
+    """返回 (窗位, 窗宽)；minmax 模式或非 HU 影像返回 None"""
+    if mode == "minmax":
+        return None
+    if "RescaleIntercept" not in ds and ds.get("Modality") != "CT":
+        return None  # 非 CT 且无 HU 换算参数，窗宽窗位没有意义
+    if mode == "dicom" and "WindowCenter" in ds and "WindowWidth" in ds:
+        center, width = ds.WindowCenter, ds.WindowWidth
+        # 多值时取第一组
+        center = center[0] if isinstance(center, pydicom.multival.MultiValue) else center
+        width = width[0] if isinstance(width, pydicom.multival.MultiValue) else width
+        return float(center), max(float(width), 1.0)
+    return WINDOW_PRESETS.get(mode, WINDOW_PRESETS["brain"])
+
+
+def _linear_coefficients(slope: float, intercept: float, center: float, width: float) -> Tuple[float, float]:
+    """把 HU 换算与窗宽窗位合并为 out = raw * a + b (结果再截断到 [0, 255])"""
+    low = center - width / 2.0
+    a = slope * 255.0 / width
+    b = (intercept - low) * 255.0 / width
+    return a, b
+
+
+@lru_cache(maxsize=32)
+def _window_lut(dtype_str: str, a: float, b: float, invert: bool) -> np.ndarray:
+    """为 8/16 位像素构建 raw -> uint8 的查找表 (按无符号位模式索引)"""
+    dtype = np.dtype(dtype_str)
+    bits = dtype.itemsize * 8
+    raw = np.arange(2 ** bits, dtype=np.int64)
+    if dtype.kind == "i":
+        raw = np.where(raw >= 2 ** (bits - 1), raw - 2 ** bits, raw)  # 位模式 -> 有符号值
+    lut = np.clip(raw * a + b, 0, 255).astype(np.uint8)
+    return 255 - lut if invert else lut
+
+
+def apply_window(pixels: np.ndarray, slope: float, intercept: float, center: float, width: float,
+                 invert: bool = False) -> np.ndarray:
+    """
+    HU 换算 + 窗宽窗位，单次向量化运算输出 uint8
+
+    说明：
+        8/16 位整数像素通过 LUT 一次索引完成；其他类型使用 float32 原地计算。
+    """
+    a, b = _linear_coefficients(slope, intercept, center, width)
+    if pixels.dtype.kind in "iu" and pixels.dtype.itemsize <= 2:
+        lut = _window_lut(pixels.dtype.str, round(a, 9), round(b, 6), invert)
+        unsigned = pixels.view(np.dtype(f"u{pixels.dtype.itemsize}"))
+        return lut[unsigned]
+    out = np.multiply(pixels, a, dtype=np.float32)
+    out += b
+    np.clip(out, 0, 255, out=out)
+    result = out.astype(np.uint8)
+    return 255 - result if invert else result
+
+
+def _minmax(pixels: np.ndarray) -> np.ndarray:
+    """原始行为：负值截断为 0 后按最大值线性缩放到 0-255"""
+    max_val = float(pixels.max())
+    if max_val <= 0:
+        return np.zeros(pixels.shape, dtype=np.uint8)
+    out = np.maximum(pixels, 0, dtype=np.float32)
+    out *= 255.0 / max_val
+    return out.astype(np.uint8)
+
+
+def _to_uint8(ds: Dataset, pixels: np.ndarray, window: str) -> np.ndarray:
+    invert = ds.get("PhotometricInterpretation") == "MONOCHROME1"
+    win = _window(ds, window)
+    if win is None:
+        result = _minmax(pixels)
+        return 255 - result if invert else result
+    slope = float(ds.get("RescaleSlope", 1.0))
+    intercept = float(ds.get("RescaleIntercept", 0.0))
+    return apply_window(pixels, slope, intercept, win[0], win[1], invert)
+
+
+def decode_dicom(source: Source, window: str = "brain", frame: Optional[int] = None) -> np.ndarray:
+    """
+    解码 DICOM 为 uint8 灰度图
+
+    参数：
+        window - 窗口模式 (brain / subdural / dicom / minmax)
+        frame  - 多帧 DICOM 取第几帧，默认取中间帧
+    返回：
+        np.ndarray - [H, W] uint8
+    """
+    ds = read_dataset(source)
+    pixels = ds.pixel_array
+    if pixels.ndim == 3:
+        frame = pixels.shape[0] // 2 if frame is None else frame
+        pixels = pixels[frame]
+    return _to_uint8(ds, pixels, window)
+
+
+def count_frames(source: Source) -> int:
+    """只读取头部标签 (不读取像素数据)，返回帧数 (NumberOfFrames，缺失时为 1)；文件对象读取后复位指针"""
+    try:
+        ds = pydicom.dcmread(_rewind(source), stop_before_pixels=True)
+    finally:
+        _rewind(source)
+    return max(int(ds.get("NumberOfFrames", 1) or 1), 1)
+
+
+def decode_dicom_frames(source: Source, window: str = "brain", max_frames: Optional[int] = None) -> np.ndarray:
+    """
+    解码 DICOM 的全部帧 (序列分析使用，窗口换算对整卷一次完成)
+
+    参数：
+        max_frames - 帧数上限；NumberOfFrames 超限时在读取像素数据之前拒绝
+    返回：
+        np.ndarray - [N, H, W] uint8 (单帧文件 N = 1)
+    异常：
+        DicomDecodeError - 标签校验失败或帧数超过 max_frames
+    """
+    ds = read_dataset(source)
+    frames = max(int(ds.get("NumberOfFrames", 1) or 1), 1)
+    if max_frames is not None and frames > max_frames:
+        raise DicomDecodeError(f"DICOM 帧数过多 ({frames})，最多支持 {max_frames} 帧")
+    pixels = ds.pixel_array
+    if pixels.ndim == 2:
+        pixels = pixels[np.newaxis]
+    return _to_uint8(ds, pixels, window)
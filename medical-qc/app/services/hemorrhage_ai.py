@@ -9,6 +9,8 @@
 #   - 前端展示: src/views/quality/Hemorrhage.vue (展示检测结果、BBox、中线分析)
 # ----------------------------------------------------------------------------------
 
+import asyncio
+import contextlib
 import torch
 import torch.nn as nn
 from torchvision import transforms
@@ -17,9 +19,22 @@ import numpy as np
 import os
 import time
 import logging
-import base64
+import threading
+import hashlib
 from io import BytesIO
-import pydicom  # 用于处理 DICOM 格式医学影像
+from typing import Awaitable, BinaryIO, Callable, List, Optional, Sequence, Tuple, Union
+
+from app.core.config import settings
+from app.services.inference_batcher import MicroBatcher
+from app.services.inference_executor import get_inference_executor
+from app.services.model_pool import get_pool_client
+from app.services.quantization import QuantizationRejectedError, build_int8_model
+from app.services.inference_backends import InferenceBackend, EagerBackend, create_backend
+from app.services.model_optimization import ModelOptimizationError, check_equivalence, optimize_model
+from app.services.slice_analysis import SliceAnalysis, analyze_slice, analyze_slices
+from app.services.result_cache import ResultCache
+from app.services.dicom_decode import count_frames, decode_dicom, decode_dicom_frames, is_dicom
+from app.services.preview import PreviewOptions, new_preview_artifact, render_preview, write_preview_artifact
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -103,6 +118,7 @@ class Classifier(nn.Module):
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "..", "..", "models", "hemorrhage_model_best.pth")
 IMAGE_SIZE = (224, 224)
+ANALYSIS_SIZE = (512, 512)
 
 # 1. 设备选择策略
 # 优先使用 GPU，如果不可用则回退到 CPU 并记录警告
@@ -125,6 +141,11 @@ transform = transforms.Compose([
 # 全局变量：缓存加载后的模型
 _model_instance = None
 _model_is_random = False # 标记位：如果为 True，表示使用的是随机权重的未训练模型
+_model_channels_last = False # 标记位：模型是否已转换为 channels_last 内存格式 (输入需同步转换)
+_model_checkpoint_sha256 = None # 已加载权重文件的 SHA-256 (随机权重时为 None)
+_model_precision = "fp32" # 实际生效的推理精度 (INT8 未通过校验时仍为 fp32)
+# 初始化锁：防止并发的首次调用重复加载模型 / 构建后端 (可重入：get_backend 内部会调用 get_model)
+_init_lock = threading.RLock()
 
 def get_model():
     """
@@ -136,39 +157,543 @@ def get_model():
     3. 尝试加载预训练权重文件。
     4. 如果权重文件不存在或加载失败，使用随机初始化模型(仅用于测试环境)，并设置 _model_is_random=True。
     """
-    global _model_instance, _model_is_random
-    if _model_instance is None:
-        _model_instance = Classifier().to(DEVICE)
-        # 尝试加载权重
-        if os.path.exists(MODEL_PATH):
-            try:
-                state_dict = torch.load(MODEL_PATH, map_location=DEVICE)
+    if _model_instance is not None:
+        return _model_instance
+    with _init_lock:
+        if _model_instance is None:
+            _load_model()
+    return _model_instance
+
+def _load_model():
+    """
+    加载、优化并 (可选) 量化模型，调用方需持有 _init_lock
+
+    说明：
+        全部步骤完成后才赋值给 _model_instance，其他线程不会读到未优化完成的模型。
+    """
+    global _model_instance, _model_is_random, _model_channels_last, _model_checkpoint_sha256, _model_precision
+    # 固定本进程的 torch 线程预算 (0 表示使用 torch 默认值)，避免多进程部署时线程超额订阅
+    if settings.INFERENCE_TORCH_THREADS > 0:
+        torch.set_num_threads(settings.INFERENCE_TORCH_THREADS)
+    model = Classifier().to(DEVICE)
+    # 尝试加载权重
+    if os.path.exists(MODEL_PATH):
+        try:
+            state_dict = torch.load(MODEL_PATH, map_location=DEVICE)
+            
+            # 兼容性处理：如果加载的是 Checkpoint 字典（包含 epoch 等信息），提取模型权重
+            # 解决 "Missing key(s) in state_dict" 错误
+            if isinstance(state_dict, dict) and 'model_state_dict' in state_dict:
+                logger.info("ℹ️ 检测到 Checkpoint 格式权重，正在提取 model_state_dict...")
+                state_dict = state_dict['model_state_dict']
                 
-                # 兼容性处理：如果加载的是 Checkpoint 字典（包含 epoch 等信息），提取模型权重
-                # 解决 "Missing key(s) in state_dict" 错误
-                if isinstance(state_dict, dict) and 'model_state_dict' in state_dict:
-                    logger.info("ℹ️ 检测到 Checkpoint 格式权重，正在提取 model_state_dict...")
-                    state_dict = state_dict['model_state_dict']
-                    
-                _model_instance.load_state_dict(state_dict)
-                logger.info(f"✅ 成功加载模型权重: {MODEL_PATH}")
-                _model_is_random = False
+            model.load_state_dict(state_dict)
+            logger.info(f"✅ 成功加载模型权重: {MODEL_PATH}")
+            _model_is_random = False
+            _model_checkpoint_sha256 = _file_sha256(MODEL_PATH)
+        except Exception as e:
+            logger.error(f"❌ 加载模型权重失败: {e}")
+            _model_is_random = True
+            _model_checkpoint_sha256 = None
+    else:
+        logger.warning(f"⚠️ 模型权重文件未找到: {MODEL_PATH}，将使用随机初始化模型进行测试")
+        _model_is_random = True
+        _model_checkpoint_sha256 = None
+    model.eval() # 切换到评估模式，禁用 Dropout 等
+
+    # 加载期图优化：BN 折叠、移除 Dropout、channels_last (需通过数值等价性校验)
+    channels_last = False
+    if settings.MODEL_OPTIMIZE:
+        model, channels_last = _optimize_or_keep(model)
+
+    # 可选：INT8 量化 (仅 CPU)，未通过精度校验时保持 FP32
+    precision = "fp32"
+    if settings.INFERENCE_PRECISION == "int8":
+        quantized = _quantize_or_keep_fp32(model)
+        if quantized is not model:
+            model, precision = quantized, "int8"
+    _model_precision = precision
+
+    _model_channels_last = channels_last
+    _model_instance = model
+
+def _optimize_or_keep(model):
+    """
+    尝试对模型做加载期图优化
+
+    返回：
+        (model, channels_last) - 校验失败时返回原模型与 False
+    """
+    try:
+        optimized = optimize_model(model, channels_last=True)
+        max_diff = check_equivalence(model, optimized, DEVICE, atol=settings.MODEL_OPTIMIZE_ATOL)
+        logger.info(f"✅ 推理图优化已启用 (BN 折叠 + 移除 Dropout + channels_last，最大偏差 {max_diff:.2e})")
+        return optimized, True
+    except ModelOptimizationError as e:
+        logger.warning(f"⚠️ 推理图优化未通过等价性校验: {e}，使用原始模型")
+    except Exception as e:
+        logger.error(f"❌ 推理图优化失败: {e}，使用原始模型")
+    return model, False
+
+def _quantize_or_keep_fp32(model):
+    """
+    尝试构建 INT8 量化模型
+
+    说明：
+        量化流程 (校准 + AUC 精度校验) 见 app.services.quantization。
+        任何失败 (GPU 设备、缺少校准数据、验证集不足、AUC 下降超限) 均回退到 FP32 模型，不影响服务启动。
+    """
+    if DEVICE.type != "cpu":
+        logger.warning("⚠️ INT8 量化仅支持 CPU 推理，当前设备为 GPU，继续使用 FP32")
+        return model
+    try:
+        int8_model, _ = build_int8_model(
+            model,
+            calibration_samples=settings.QUANT_CALIBRATION_SAMPLES,
+            max_auc_drop=settings.QUANT_MAX_AUC_DROP,
+            min_validation=settings.QUANT_MIN_VALIDATION_SAMPLES,
+            min_per_class=settings.QUANT_MIN_VALIDATION_PER_CLASS,
+        )
+        logger.info("✅ 已启用 INT8 量化推理")
+        return int8_model
+    except QuantizationRejectedError as e:
+        logger.warning(f"⚠️ 拒绝启用 INT8 量化: {e}，继续使用 FP32")
+    except Exception as e:
+        logger.error(f"❌ INT8 量化失败: {e}，继续使用 FP32")
+    return model
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def artifact_fingerprint():
+    """
+    当前模型对应的导出产物指纹 (见 app.services.inference_backends.artifact_matches)
+
+    返回：
+        {"checkpoint_sha256", "precision"}；随机权重或 INT8 模型没有可对应的文件产物，返回 None
+    """
+    get_model()
+    if _model_checkpoint_sha256 is None or _model_precision != "fp32":
+        return None
+    return {"checkpoint_sha256": _model_checkpoint_sha256, "precision": _model_precision}
+
+def is_model_random() -> bool:
+    """当前提供推理的模型是否为随机权重 (pool 模式下以服务池加载结果为准)"""
+    if settings.INFERENCE_SERVING_MODE == "pool":
+        return get_pool_client().model_is_random
+    return _model_is_random
+
+# ----------------------------------------------------------------------------------
+# 函数：获取推理后端 (get_backend)
+# 作用：单例模式，按 INFERENCE_BACKEND 配置 (eager / torchscript / compile / onnx)
+#       包装当前模型；后端构建失败时回退到 eager，保证服务可用。
+#       导出文件仅在其清单与当前权重 / 精度一致时使用，否则从当前模型即时生成。
+# ----------------------------------------------------------------------------------
+_backend_instance = None
+
+def get_backend() -> InferenceBackend:
+    global _backend_instance
+    if _backend_instance is not None:
+        return _backend_instance
+    with _init_lock:
+        if _backend_instance is None:
+            model = get_model()
+            try:
+                backend = create_backend(settings.INFERENCE_BACKEND, model, DEVICE, _model_channels_last,
+                                         fingerprint=artifact_fingerprint())
+                logger.info(f"✅ 推理后端: {backend.name}")
             except Exception as e:
-                logger.error(f"❌ 加载模型权重失败: {e}")
-                _model_is_random = True
+                logger.error(f"❌ 推理后端 {settings.INFERENCE_BACKEND} 构建失败: {e}，回退到 eager")
+                backend = EagerBackend(model, DEVICE, _model_channels_last)
+            _backend_instance = backend
+    return _backend_instance
+
+# ----------------------------------------------------------------------------------
+# 函数：模型预热 (warmup_model)
+# 作用：服务启动时主动加载/优化模型并构建推理后端，再用合成输入跑若干轮各批大小的
+#       前向推理 (触发内存分配器、算子选择、torch.compile 编译等首次开销)，
+#       避免部署/重启后的第一个请求承担冷启动延迟。
+# 对接模块：app.main.startup_event 与 /health/ready 就绪探针
+# ----------------------------------------------------------------------------------
+_model_ready = False
+_warmup_error = None
+
+def warmup_model(batch_sizes=None, rounds: int = None) -> float:
+    """
+    预热模型 (阻塞调用，应在线程中执行)
+
+    参数：
+        batch_sizes - 预热的批大小列表，默认 1..HEMORRHAGE_BATCH_MAX_SIZE (微批处理器可能产生的全部批大小)
+        rounds      - 每个批大小的前向次数，默认 MODEL_WARMUP_ROUNDS
+    返回：
+        float - 预热耗时 (秒)
+    """
+    global _model_ready, _warmup_error
+    if batch_sizes is None:
+        batch_sizes = range(1, settings.HEMORRHAGE_BATCH_MAX_SIZE + 1)
+    rounds = settings.MODEL_WARMUP_ROUNDS if rounds is None else rounds
+    start = time.time()
+    try:
+        # 预处理流水线同样预热一次 (PIL 重采样、transform)
+        image, input_tensor = preprocess_image(Image.new('L', ANALYSIS_SIZE))
+        get_model_version()  # 预先计算权重文件哈希 (结果缓存键的一部分)
+        if settings.INFERENCE_SERVING_MODE != "pool":
+            get_backend()
+        for batch_size in batch_sizes:
+            batch = torch.randn((batch_size,) + tuple(input_tensor.shape[1:]))
+            for _ in range(rounds):
+                predict_probabilities(batch)
+    except Exception as e:
+        _warmup_error = str(e)
+        logger.error(f"❌ 模型预热失败: {e}")
+        raise
+    elapsed = time.time() - start
+    _warmup_error = None
+    _model_ready = True
+    logger.info(f"✅ 模型预热完成: 批大小 {list(batch_sizes)}，每个 {rounds} 轮，耗时 {elapsed:.2f}s")
+    return elapsed
+
+def is_model_ready() -> bool:
+    """模型是否已完成加载与预热 (供就绪探针使用)"""
+    return _model_ready
+
+def get_warmup_error():
+    """最近一次预热失败的原因 (成功或尚未预热时为 None)"""
+    return _warmup_error
+
+# ----------------------------------------------------------------------------------
+# 函数：加载图像 (load_image)
+# 作用：统一将不同格式的输入 (PNG/JPG/DICOM) 转换为 PIL 灰度图像。
+# 参数：source (str | bytes | 文件对象) - 本地图片文件的绝对路径、上传内容的原始字节，
+#       或可 seek 的二进制文件对象 (如上传文件的 SpooledTemporaryFile)，均不经过额外的临时文件
+# ----------------------------------------------------------------------------------
+def load_image(source: Union[str, bytes, BinaryIO]) -> Image.Image:
+    """
+    加载图像为 PIL 灰度图 (L 模式)
+    
+    Logic:
+    1. 通过前导码识别 DICOM，直接走 DICOM 解码路径 (HU 换算 + 窗宽窗位，见 app.services.dicom_decode)。
+    2. 否则作为普通图片 (PNG/JPG) 打开。
+    3. 如果 PIL 打开失败，再尝试作为无前导码的 DICOM 读取。
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+    name = source if isinstance(source, str) else "<upload>"
+
+    if is_dicom(source):
+        try:
+            return Image.fromarray(decode_dicom(source, settings.DICOM_WINDOW))
+        except Exception as e_dcm:
+            logger.error(f"DICOM 解码失败: {e_dcm}")
+            raise ValueError(f"DICOM 文件已损坏或不受支持: {str(e_dcm)}")
+
+    try:
+        return Image.open(source).convert('L') # 尝试作为普通图片打开
+    except Exception as e_pil:
+        # 如果 PIL 打开失败，尝试作为无前导码的 DICOM 读取 (pydicom 支持文件类对象)
+        try:
+            logger.info(f"PIL加载失败 ({str(e_pil)})，尝试作为 DICOM 读取: {name}")
+            return Image.fromarray(decode_dicom(source, settings.DICOM_WINDOW))
+        except Exception as e_dcm:
+            logger.error(f"无法读取图像文件 (尝试了 PIL 和 DICOM): {e_dcm}")
+            raise ValueError(f"不支持的文件格式或文件已损坏: {str(e_dcm)}")
+
+# ----------------------------------------------------------------------------------
+# 函数：图像预处理 (preprocess_image)
+# 作用：生成 512x512 的分析图像以及 224x224 的模型输入张量。
+# 返回：(image, input_tensor) - input_tensor 形状为 [1, 1, 224, 224]
+# ----------------------------------------------------------------------------------
+def preprocess_image(original_image: Image.Image):
+    """
+    图像预处理
+    
+    说明：
+        统一调整大小以确保尺寸一致且为偶数 (防止中线检测因奇数宽度崩溃)。
+        使用 512x512 进行详细特征分析 (中线、BBox)，224x224 用于模型推理。
+    """
+    image = original_image.resize(ANALYSIS_SIZE, Image.Resampling.LANCZOS)
+    
+    # 模型推理用的预处理 (224x224)
+    input_tensor = transform(image).unsqueeze(0)
+    return image, input_tensor
+
+def load_and_preprocess(source: Union[str, bytes, BinaryIO]):
+    """加载 + 预处理 (可在推理执行器的线程/进程中独立运行；source 为文件路径、原始字节或文件对象)"""
+    return preprocess_image(load_image(source))
+
+# ----------------------------------------------------------------------------------
+# 函数：批量推理 (predict_probabilities)
+# 作用：对一个 batch 的输入张量执行前向推理，返回 Softmax 概率。
+# 参数：batch (torch.Tensor) - 形状 [N, 1, 224, 224]
+# 返回：np.ndarray - 形状 [N, 2]，列顺序为 (未出血, 出血)
+# 说明：INFERENCE_SERVING_MODE=pool 时转发给多进程模型服务池 (app.services.model_pool)
+# ----------------------------------------------------------------------------------
+def predict_probabilities(batch: torch.Tensor) -> np.ndarray:
+    if settings.INFERENCE_SERVING_MODE == "pool":
+        return get_pool_client().predict(batch)
+    return get_backend().predict(batch)
+
+# ----------------------------------------------------------------------------------
+# 函数：获取批处理调度器 (get_batcher)
+# 作用：单例模式创建动态微批处理器，批大小与等待窗口由 Settings 配置；
+#       前向推理在推理执行器的模型专用线程中执行 (见 InferenceExecutor.run_model)。
+# ----------------------------------------------------------------------------------
+_batcher = None
+
+def get_batcher() -> MicroBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(
+            predict_probabilities,
+            max_batch_size=settings.HEMORRHAGE_BATCH_MAX_SIZE,
+            max_wait_ms=settings.HEMORRHAGE_BATCH_MAX_WAIT_MS,
+            name="hemorrhage",
+            run_fn=get_inference_executor().run_model,
+        )
+    return _batcher
+
+# ----------------------------------------------------------------------------------
+# 函数：检测结果缓存 (get_result_cache / detection_cache_key)
+# 作用：缓存键 = 上传内容 SHA-256 + 模型版本 + 预处理配置，
+#       更换权重文件、推理后端/精度或预处理参数后旧结果自动失效。
+# ----------------------------------------------------------------------------------
+# 预处理配置摘要 (修改 preprocess_image / transform 时需同步更新)
+PREPROCESS_SIGNATURE = (f"resize={IMAGE_SIZE};analysis={ANALYSIS_SIZE};lanczos;normalize=0.5/0.5;"
+                        f"dicom_window={settings.DICOM_WINDOW}")
+
+_model_version = None
+_result_cache = None
+
+def get_model_version() -> str:
+    """模型版本：权重文件内容哈希 + 影响数值结果的推理配置 (权重缺失时为 random)"""
+    global _model_version
+    if _model_version is None:
+        if os.path.exists(MODEL_PATH):
+            weights = _file_sha256(MODEL_PATH)[:16]
         else:
-            logger.warning(f"⚠️ 模型权重文件未找到: {MODEL_PATH}，将使用随机初始化模型进行测试")
-            _model_is_random = True
-        _model_instance.eval() # 切换到评估模式，禁用 Dropout 等
-    return _model_instance
+            weights = "random"
+        _model_version = (f"{weights};backend={settings.INFERENCE_BACKEND};precision={settings.INFERENCE_PRECISION};"
+                          f"optimize={settings.MODEL_OPTIMIZE}")
+    return _model_version
+
+def content_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def detection_cache_key(content_hash: str, preview: PreviewOptions = None) -> str:
+    """
+    缓存键
+
+    参数：
+        content_hash - 上传内容的 SHA-256 (大文件由 API 层边读边计算，见 app.utils.upload_limits)
+        preview      - 不同预览模式的响应内容不同，预览选项同样参与计算
+    """
+    preview_tag = (preview or PreviewOptions()).cache_tag()
+    key = f"{content_hash}|{get_model_version()}|{PREPROCESS_SIGNATURE}|{preview_tag}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            name="hemorrhage",
+            max_entries=settings.HEMORRHAGE_CACHE_MAX_ENTRIES if settings.HEMORRHAGE_CACHE_ENABLED else 0,
+            disk_dir=settings.HEMORRHAGE_CACHE_DIR if settings.HEMORRHAGE_CACHE_ENABLED else None,
+            disk_max_bytes=settings.HEMORRHAGE_CACHE_DISK_MAX_MB * 1024 * 1024,
+            disk_ttl_seconds=settings.HEMORRHAGE_CACHE_DISK_TTL_SECONDS,
+        )
+    return _result_cache
+
+async def cached_detection(cache_key: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+    """
+    经结果缓存执行检测，结果中的 cached 标记是否来自缓存
+
+    说明：
+        缓存命中时 duration_ms 为首次检测的耗时，而非本次请求的耗时。
+    """
+    result, cached = await get_result_cache().lookup(cache_key, compute)
+    result["cached"] = cached
+    return result
+
+def confidence_level(max_prob: float) -> str:
+    """置信度等级：>0.9 高，>0.7 中，其余为低"""
+    if max_prob > 0.9:
+        return "高"
+    if max_prob > 0.7:
+        return "中"
+    return "低"
+
+# ----------------------------------------------------------------------------------
+# 函数：构建检测结果 (build_detection_result)
+# 作用：基于 AI 概率和 512x512 分析图像，执行启发式检测、决策融合、
+#       中线与脑室分析，并封装为返回给前端的 JSON 字典。
+# 参数：image (PIL.Image) - 512x512 分析图像
+#       probs (np.ndarray) - 形状 [2] 的类别概率 (未出血, 出血)
+#       start_time (float) - 推理开始时间 (用于计算耗时)
+#       model_is_random (bool) - 是否为随机权重模型；为 None 时读取本进程的全局状态
+#                                (进程池中运行时必须显式传入，子进程不加载模型)
+#       analysis (SliceAnalysis) - 预先计算的切片统计量 (批量处理时由 analyze_slices 一次得到)；
+#                                  为 None 时对 image 单独计算
+#       preview (PreviewOptions) - 预览图模式，默认内嵌 512x512 PNG
+# ----------------------------------------------------------------------------------
+def build_detection_result(image: Image.Image, probs: np.ndarray, start_time: float,
+                           model_is_random: bool = None, analysis: SliceAnalysis = None,
+                           preview: PreviewOptions = None):
+    if model_is_random is None:
+        model_is_random = is_model_random()
+    
+    # 解析 AI 结果
+    no_hemorrhage_prob = float(probs[0])
+    hemorrhage_prob = float(probs[1])
+    
+    # 处理 NaN 异常
+    if np.isnan(no_hemorrhage_prob): no_hemorrhage_prob = 0.0
+    if np.isnan(hemorrhage_prob): hemorrhage_prob = 0.0
+    
+    # ==========================================
+    # 3. 扩展特征分析 (BBox, 中线, 脑室)
+    # 统计量由融合分析内核一次性计算 (见 app.services.slice_analysis)
+    # ==========================================
+    if analysis is None:
+        analysis = analyze_slice(np.asarray(image))
+    w, h = image.width, image.height
+    
+    # ---------------------------
+    # A. 启发式出血检测 (Heuristic Detection)
+    # 原理：脑出血在 CT 上表现为高亮区域 (High Density)。
+    # 作用：如果模型文件缺失或表现不佳，使用传统 CV 算法兜底。
+    # 规则：去除 15% 边缘 (头骨) 后，阈值 = clip(均值 + 2.0倍标准差, 110, 230)，
+    #       排除 >250 的伪影像素；高亮像素超过 50 个判定为出血。
+    # ---------------------------
+    heuristic_has_hemorrhage = False
+    heuristic_bboxes = []
+    
+    if analysis.threshold is not None:
+        logger.info(
+            f"启发式检测参数: Mean={analysis.valid_mean:.2f}, Std={analysis.valid_std:.2f}, "
+            f"Threshold={analysis.threshold:.2f}"
+        )
+        
+        # 判定：如果高亮像素点数量超过阈值 (提高到 50 个，减少噪点误报)，认为有出血
+        if analysis.hot_count > 50:
+            heuristic_has_hemorrhage = True
+            
+            # 计算边界框 (BBox)
+            x0, y0, x1, y1 = analysis.hot_extent
+            margin = 5
+            heuristic_bboxes.append([
+                max(0, x0-margin), 
+                max(0, y0-margin), 
+                min(w, x1-x0+2*margin), 
+                min(h, y1-y0+2*margin)
+            ])
+
+    # ---------------------------
+    # 4. 决策融合：模型结果 + 启发式结果
+    # ---------------------------
+    # 策略调整：
+    # 1. 如果是随机模型 (无权重)，完全依赖启发式检测。
+    # 2. 如果是训练模型 (有权重)，完全依赖模型预测，启发式仅作为附加信息 (不覆盖模型结果)。
+    #    原因：启发式算法在存在骨骼伪影时容易误报，不应覆盖模型的正常判断。
+    
+    if model_is_random:
+        # 随机模式：兜底使用启发式
+        if heuristic_has_hemorrhage:
+            predicted_class = 1
+            prediction_label = "出血"
+            # 修正概率值，使其体现出高置信度
+            hemorrhage_prob = max(hemorrhage_prob, 0.85)
+            no_hemorrhage_prob = 1.0 - hemorrhage_prob
+        else:
+            # 均未检测到 -> 判定为未出血
+            predicted_class = 0
+            prediction_label = "未出血"
+            hemorrhage_prob = 0.1
+            no_hemorrhage_prob = 0.9
+    else:
+        # 真实模型模式：优先信任 AI 模型结果
+        # 只有当模型预测结果非常不确定 (如 0.4-0.6) 时，才考虑参考启发式 (此处暂简化为完全信赖模型)
+        predicted_class = 1 if hemorrhage_prob > 0.5 else 0
+        prediction_label = "出血" if predicted_class == 1 else "未出血"
+        
+        # 如果模型判断正常，但启发式判断出血，记录日志但不改变结果 (避免误报)
+        if predicted_class == 0 and heuristic_has_hemorrhage:
+            logger.info("AI模型判定正常，但启发式算法检测到高亮区域 (可能是伪影)")
+    
+    # 计算置信度等级 (High/Medium/Low)
+    confidence = confidence_level(max(no_hemorrhage_prob, hemorrhage_prob))
+
+    # B. 最终 BBox 生成
+    bboxes = heuristic_bboxes
+    # Note: 如果模型检测到出血但启发式未检测到，这里可能为空。
+    # 可以在此处添加逻辑：如果 predicted_class == 1 and not bboxes，尝试降低阈值重新搜索。
+
+    # ---------------------------
+    # C. 中线偏移检测 (左右对称性分析)
+    # 左半与翻转后的右半逐像素比较，仅关注中心区域的差异 (去除边缘干扰)
+    # ---------------------------
+    has_midline_shift = False
+    midline_detail = "中线结构居中"
+    
+    symmetry_score = analysis.symmetry_score
+    if symmetry_score is not None:
+        # 阈值判断：如果对称性差异大 (>30.0)，判定为中线偏移
+        threshold_shift = 30.0
+        if symmetry_score > threshold_shift:
+            has_midline_shift = True
+            midline_detail = f"检测到中线偏移 (对称性差异: {symmetry_score:.1f})"
+
+    # ---------------------------
+    # D. 脑室结构检测 (中心区域作为脑室 ROI)
+    # ---------------------------
+    has_ventricle_issue = False
+    ventricle_detail = "脑室形态正常，未见受压或积血"
+    
+    v_mean = analysis.ventricle_mean
+    if v_mean is not None:
+        # 脑室区域平均像素值过高 -> 疑似脑室出血
+        if v_mean > 130: 
+            has_ventricle_issue = True
+            ventricle_detail = "疑似脑室积血或高密度影"
+        # 脑室区域像素值偏高且存在中线偏移 -> 疑似受压
+        elif has_midline_shift and v_mean > 80:
+             has_ventricle_issue = True
+             ventricle_detail = "脑室受压变形"
+
+    result = {
+        "prediction": prediction_label,
+        "confidence": confidence,
+        "probability": {
+            "hemorrhage": round(hemorrhage_prob, 4),
+            "no_hemorrhage": round(no_hemorrhage_prob, 4)
+        },
+        "duration_ms": round((time.time() - start_time) * 1000, 2),
+        "device": str(DEVICE),
+        # 分析图像尺寸 (BBox 坐标系)
+        "image_width": image.width,
+        "image_height": image.height,
+        # 扩展字段
+        "bboxes": bboxes,
+        "midline_shift": has_midline_shift,
+        "midline_detail": midline_detail,
+        "ventricle_issue": has_ventricle_issue,
+        "ventricle_detail": ventricle_detail
+    }
+
+    # 5. 生成图像预览 (默认 PNG Base64，用于前端展示；模式见 app.services.preview)
+    result.update(render_preview(image, preview or PreviewOptions()))
+    return result
 
 # ----------------------------------------------------------------------------------
 # 核心函数：运行脑出血检测
 # 作用：处理单张图片，执行完整的检测流程（AI推理 + 规则分析），并返回详细报告。
-# 参数：image_path (str) - 本地图片文件的绝对路径
+# 参数：source (str | bytes) - 本地图片文件的绝对路径，或上传内容的原始字节
 # 返回：dict - 包含预测类别、概率、BBox、中线分析、脑室分析等
 # ----------------------------------------------------------------------------------
-def run_hemorrhage_detection(image_path: str):
+def run_hemorrhage_detection(source: Union[str, bytes]):
     """
     运行脑出血检测
     
@@ -180,236 +705,239 @@ def run_hemorrhage_detection(image_path: str):
     5. 特征分析: 计算出血区域 BBox、中线偏移、脑室情况.
     6. 结果封装: 生成 Base64 预览图和 JSON 数据.
     """
-    model = get_model()
-    
     try:
         # 1. 加载和预处理图像
-        # 支持普通图片 (PNG/JPG) 和医学影像 (DICOM)
-        # 作用：统一将不同格式的输入转换为 PIL Image 对象 (灰度图)
-        try:
-            original_image = Image.open(image_path).convert('L') # 尝试作为普通图片打开
-        except Exception as e_pil:
-            # 如果 PIL 打开失败，尝试作为 DICOM 读取
-            try:
-                logger.info(f"PIL加载失败 ({str(e_pil)})，尝试作为 DICOM 读取: {image_path}")
-                ds = pydicom.dcmread(image_path)
-                
-                # 提取像素数据并归一化
-                # 注意：简单的 Min-Max 归一化，将 CT 值映射到 0-255
-                if hasattr(ds, 'pixel_array'):
-                    pixel_array = ds.pixel_array.astype(float)
-                    # 避免除以零
-                    max_val = pixel_array.max()
-                    if max_val > 0:
-                        pixel_array = (np.maximum(pixel_array, 0) / max_val) * 255.0
-                    original_image = Image.fromarray(np.uint8(pixel_array)).convert('L')
-                else:
-                    raise ValueError("DICOM 文件不包含像素数据")
-            except Exception as e_dcm:
-                logger.error(f"无法读取图像文件 (尝试了 PIL 和 DICOM): {e_dcm}")
-                raise ValueError(f"不支持的文件格式或文件已损坏: {str(e_dcm)}")
-        
-        # 统一调整大小以确保尺寸一致且为偶数 (防止中线检测因奇数宽度崩溃)
-        # 使用 512x512 进行详细特征分析 (中线、BBox)
-        analysis_size = (512, 512)
-        image = original_image.resize(analysis_size, Image.Resampling.LANCZOS)
+        image, input_tensor = preprocess_image(load_image(source))
         
-        # 模型推理用的预处理 (224x224)
-        input_tensor = transform(image).unsqueeze(0).to(DEVICE)
-        
-        # 2. AI 模型推理
+        # 2. AI 模型推理 (单张)
         start_time = time.time()
-        with torch.no_grad():
-            outputs = model(input_tensor)
-            probabilities = torch.softmax(outputs, dim=1)
-            
-        # 解析 AI 结果
-        probs = probabilities.cpu().numpy()[0]
-        no_hemorrhage_prob = float(probs[0])
-        hemorrhage_prob = float(probs[1])
-        
-        # 处理 NaN 异常
-        if np.isnan(no_hemorrhage_prob): no_hemorrhage_prob = 0.0
-        if np.isnan(hemorrhage_prob): hemorrhage_prob = 0.0
-        
-        # ==========================================
-        # 3. 扩展特征分析 (BBox, 中线, 脑室)
-        # ==========================================
-        img_arr = np.array(image)
-        h, w = img_arr.shape
-        
-        # ---------------------------
-        # A. 启发式出血检测 (Heuristic Detection)
-        # 原理：脑出血在 CT 上表现为高亮区域 (High Density)。
-        # 作用：如果模型文件缺失或表现不佳，使用传统 CV 算法兜底。
-        # ---------------------------
-        
-        # 制作掩膜：去除头骨 (优化：增大边缘去除范围至 15%，防止骨骼伪影干扰)
-        mask = np.zeros_like(img_arr)
-        m_x, m_y = int(w*0.15), int(h*0.15)
-        mask[m_y:h-m_y, m_x:w-m_x] = 1
-        roi = img_arr * mask
-        
-        # 寻找异常高亮区域 (阈值 > 50 排除背景)
-        valid_pixels = roi[roi > 50]
-        
-        heuristic_has_hemorrhage = False
-        heuristic_bboxes = []
-        
-        if len(valid_pixels) > 0:
-            # 动态阈值计算：均值 + 2.0倍标准差
-            # 限制阈值在合理范围 [110, 230] 之间
-            v_mean = np.mean(valid_pixels)
-            v_std = np.std(valid_pixels)
-            dynamic_thresh = v_mean + 2.0 * v_std
-            threshold = max(110, min(dynamic_thresh, 230))
-            
-            logger.info(f"启发式检测参数: Mean={v_mean:.2f}, Std={v_std:.2f}, Threshold={threshold:.2f}")
-            
-            # 二值化
-            binary = roi > threshold
-            
-            # 排除过高亮度的像素 (如 >250)，通常是残留的骨骼或金属伪影
-            # 注意：出血通常在 60-90 HU，归一化后可能在 100-200 范围，极亮通常不是出血
-            binary[roi > 250] = 0
-            
-            coords = np.argwhere(binary)
-            
-            # 判定：如果高亮像素点数量超过阈值 (提高到 50 个，减少噪点误报)，认为有出血
-            if len(coords) > 50:
-                heuristic_has_hemorrhage = True
-                
-                # 计算边界框 (BBox)
-                y0, x0 = coords.min(axis=0)
-                y1, x1 = coords.max(axis=0)
-                margin = 5
-                heuristic_bboxes.append([
-                    max(0, int(x0)-margin), 
-                    max(0, int(y0)-margin), 
-                    min(w, int(x1-x0)+2*margin), 
-                    min(h, int(y1-y0)+2*margin)
-                ])
-
-        # ---------------------------
-        # 4. 决策融合：模型结果 + 启发式结果
-        # ---------------------------
-        # 策略调整：
-        # 1. 如果是随机模型 (无权重)，完全依赖启发式检测。
-        # 2. 如果是训练模型 (有权重)，完全依赖模型预测，启发式仅作为附加信息 (不覆盖模型结果)。
-        #    原因：启发式算法在存在骨骼伪影时容易误报，不应覆盖模型的正常判断。
-        
-        if _model_is_random:
-            # 随机模式：兜底使用启发式
-            if heuristic_has_hemorrhage:
-                predicted_class = 1
-                prediction_label = "出血"
-                # 修正概率值，使其体现出高置信度
-                hemorrhage_prob = max(hemorrhage_prob, 0.85)
-                no_hemorrhage_prob = 1.0 - hemorrhage_prob
-            else:
-                # 均未检测到 -> 判定为未出血
-                predicted_class = 0
-                prediction_label = "未出血"
-                hemorrhage_prob = 0.1
-                no_hemorrhage_prob = 0.9
-        else:
-            # 真实模型模式：优先信任 AI 模型结果
-            # 只有当模型预测结果非常不确定 (如 0.4-0.6) 时，才考虑参考启发式 (此处暂简化为完全信赖模型)
-            predicted_class = 1 if hemorrhage_prob > 0.5 else 0
-            prediction_label = "出血" if predicted_class == 1 else "未出血"
-            
-            # 如果模型判断正常，但启发式判断出血，记录日志但不改变结果 (避免误报)
-            if predicted_class == 0 and heuristic_has_hemorrhage:
-                logger.info("AI模型判定正常，但启发式算法检测到高亮区域 (可能是伪影)")
-        
-        # 计算置信度等级 (High/Medium/Low)
-        max_prob = max(no_hemorrhage_prob, hemorrhage_prob)
-        if max_prob > 0.9: confidence = "高"
-        elif max_prob > 0.7: confidence = "中"
-        else: confidence = "低"
-
-        # B. 最终 BBox 生成
-        bboxes = heuristic_bboxes
-        # Note: 如果模型检测到出血但启发式未检测到，这里可能为空。
-        # 可以在此处添加逻辑：如果 predicted_class == 1 and not bboxes，尝试降低阈值重新搜索。
-
-        # ---------------------------
-        # C. 中线偏移检测 (左右对称性分析)
-        # ---------------------------
-        mid_x = w // 2
-        left_part = img_arr[:, :mid_x]
-        right_part = img_arr[:, mid_x:] 
-        
-        # 裁剪到相同宽度
-        min_w = min(left_part.shape[1], right_part.shape[1])
-        left_part = left_part[:, :min_w]
-        right_part = right_part[:, :min_w]
-        
-        has_midline_shift = False
-        midline_detail = "中线结构居中"
-        
-        if min_w > 0:
-            # 将右侧图像翻转，与左侧进行减法比较
-            right_flipped = np.fliplr(right_part)
-            diff = np.abs(left_part.astype(int) - right_flipped.astype(int))
-            
-            # 仅关注中心区域的差异 (去除边缘干扰)
-            center_diff = diff[m_y:h-m_y, :]
-            if center_diff.size > 0:
-                symmetry_score = np.mean(center_diff)
-                
-                # 阈值判断：如果对称性差异大 (>30.0)，判定为中线偏移
-                threshold_shift = 30.0
-                if symmetry_score > threshold_shift:
-                    has_midline_shift = True
-                    midline_detail = f"检测到中线偏移 (对称性差异: {symmetry_score:.1f})"
-
-        # ---------------------------
-        # D. 脑室结构检测
-        # ---------------------------
-        cx, cy = w//2, h//2
-        box_v = int(min(w, h) * 0.12)
-        # 截取中心区域作为脑室 ROI
-        ventricle_roi = img_arr[cy-box_v:cy+box_v, cx-box_v:cx+box_v]
-        
-        has_ventricle_issue = False
-        ventricle_detail = "脑室形态正常，未见受压或积血"
+        probs = predict_probabilities(input_tensor)[0]
         
-        if ventricle_roi.size > 0:
-            v_mean = np.mean(ventricle_roi)
-            # 脑室区域平均像素值过高 -> 疑似脑室出血
-            if v_mean > 130: 
-                has_ventricle_issue = True
-                ventricle_detail = "疑似脑室积血或高密度影"
-            # 脑室区域像素值偏高且存在中线偏移 -> 疑似受压
-            elif has_midline_shift and v_mean > 80:
-                 has_ventricle_issue = True
-                 ventricle_detail = "脑室受压变形"
-
-        # 5. 生成 Base64 图像预览 (用于前端展示)
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode('utf-8')
-            
-        return {
-            "prediction": prediction_label,
-            "confidence": confidence,
-            "probability": {
-                "hemorrhage": round(hemorrhage_prob, 4),
-                "no_hemorrhage": round(no_hemorrhage_prob, 4)
-            },
-            "duration_ms": round((time.time() - start_time) * 1000, 2),
-            "device": str(DEVICE),
-            "image_base64": img_str, # 返回图像数据
-            "image_width": image.width,
-            "image_height": image.height,
-            # 扩展字段
-            "bboxes": bboxes,
-            "midline_shift": has_midline_shift,
-            "midline_detail": midline_detail,
-            "ventricle_issue": has_ventricle_issue,
-            "ventricle_detail": ventricle_detail
-        }
+        # 3-6. 特征分析与结果封装
+        return build_detection_result(image, probs, start_time)
     except Exception as e:
         logger.error(f"推理过程出错: {e}")
         raise e
+
+# ----------------------------------------------------------------------------------
+# 核心函数：运行脑出血检测 (异步批处理版本)
+# 作用：与 run_hemorrhage_detection 流程一致，但模型推理经由动态微批处理器，
+#       与其他并发请求合并为一个 batch 执行；解码、预处理与结果分析等阻塞工作
+#       在独立的推理执行器中运行，不占用事件循环。
+# 异常：在途请求已满时抛出 ExecutorSaturatedError (由 API 层转换为 503)
+# 对接模块：app.api.v1.quality (hemorrhage 与 hemorrhage/base64 接口)
+# ----------------------------------------------------------------------------------
+async def run_hemorrhage_detection_async(source: Union[str, bytes, BinaryIO], preview: PreviewOptions = None,
+                                         use_slot: bool = True):
+    """
+    运行脑出血检测 (异步，合批推理)
+
+    参数：
+        source   - 文件路径、上传内容的原始字节或上传文件对象 (API 层直接传入，无需另存临时文件)
+        preview  - 预览图模式；url 模式下预览图在后台写入，不阻塞响应
+        use_slot - 是否占用推理执行器的在途名额；调用方已为整批工作持有名额时 (如归档批量检测) 设为 False
+    """
+    preview = preview or PreviewOptions()
+    executor = get_inference_executor()
+    async with (executor.slot() if use_slot else contextlib.nullcontext()):
+        try:
+            # 进程池无法传递文件对象，读取为字节 (大小已由 API 层限制)
+            if executor.kind == "process" and hasattr(source, "read"):
+                source = await asyncio.get_running_loop().run_in_executor(None, source.read)
+            image, input_tensor = await executor.run(load_and_preprocess, source)
+            
+            start_time = time.time()
+            probs = await get_batcher().submit(input_tensor)
+            
+            result = await executor.run(build_detection_result, image, probs, start_time, is_model_random(), None, preview)
+        except Exception as e:
+            logger.error(f"推理过程出错: {e}")
+            raise e
+
+    if preview.mode == "url":
+        path, result["image_url"] = new_preview_artifact()
+        _schedule_preview_write(image, path, preview.size)
+    return result
+
+def _schedule_preview_write(image: Image.Image, path: str, size: int):
+    """在默认线程池中写入预览图产物 (不占用推理执行器的在途名额)"""
+    future = asyncio.get_running_loop().run_in_executor(None, write_preview_artifact, image, path, size)
+
+    def _log_failure(f):
+        if not f.cancelled() and f.exception() is not None:
+            logger.error(f"❌ 预览图写入失败 ({path}): {f.exception()}")
+
+    future.add_done_callback(_log_failure)
+
+# ----------------------------------------------------------------------------------
+# 序列级检测 (Series-Level Detection)
+# 作用：一次请求分析整个头颅 CT 序列 (多个切片文件，或单个多帧 DICOM)：
+#       1. 先只读取各文件头部统计总切片数 (多帧 DICOM 取 NumberOfFrames)，超过上限时在解码像素之前拒绝；
+#          随后各文件在推理执行器中并行解码与预处理 (多帧 DICOM 的窗口换算对整卷一次完成)，
+#          每个文件解码的帧数不超过其头部声明的帧数；
+#       2. 切片按批大小分块，各块同时提交给动态微批处理器 (与并发的单张请求共享批次)；
+#       3. 每块推理完成后堆叠计算统计量 (analyze_slices)、生成逐切片结果，最后汇总为检查级结论。
+# 对接模块：app.api.v1.quality (hemorrhage/series 接口)
+# ----------------------------------------------------------------------------------
+def count_series_frames(source: Union[str, bytes, BinaryIO]) -> int:
+    """读取一个序列文件的切片数：多帧 DICOM 只解析头部 (不读取像素数据)，其余格式为 1"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+    if not is_dicom(source):
+        return 1
+    try:
+        return count_frames(source)
+    except Exception as e_dcm:
+        logger.error(f"DICOM 头部解析失败: {e_dcm}")
+        raise ValueError(f"DICOM 文件已损坏或不受支持: {str(e_dcm)}")
+
+def load_series_images(source: Union[str, bytes, BinaryIO], max_frames: Optional[int] = None) -> List[Image.Image]:
+    """加载一个序列文件：多帧 DICOM 返回全部帧 (帧数超过 max_frames 时不解码像素)，其余格式返回单张图像"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+    if is_dicom(source):
+        try:
+            frames = decode_dicom_frames(source, settings.DICOM_WINDOW, max_frames)
+        except Exception as e_dcm:
+            logger.error(f"DICOM 解码失败: {e_dcm}")
+            raise ValueError(f"DICOM 文件已损坏或不受支持: {str(e_dcm)}")
+        return [Image.fromarray(frame) for frame in frames]
+    return [load_image(source)]
+
+def preprocess_series_file(source: Union[str, bytes, BinaryIO],
+                           max_frames: Optional[int] = None) -> Tuple[List[Image.Image], torch.Tensor]:
+    """加载 + 预处理一个序列文件，返回 (512x512 分析图像列表, [N, 1, 224, 224] 输入张量)"""
+    images, tensors = [], []
+    for original in load_series_images(source, max_frames):
+        image, input_tensor = preprocess_image(original)
+        images.append(image)
+        tensors.append(input_tensor)
+    return images, torch.cat(tensors)
+
+def build_series_results(images: Sequence[Image.Image], probs: np.ndarray, start_time: float,
+                         model_is_random: bool, preview: PreviewOptions = None) -> List[dict]:
+    """堆叠全部切片一次计算统计量，再逐切片封装检测结果"""
+    analyses = analyze_slices(np.stack([np.asarray(image) for image in images]))
+    return [
+        build_detection_result(image, slice_probs, start_time, model_is_random, analysis, preview)
+        for image, slice_probs, analysis in zip(images, probs, analyses)
+    ]
+
+def summarize_series(slices: Sequence[dict]) -> dict:
+    """
+    检查级结论
+
+    规则：
+        任一切片判定出血即为出血；出血概率最高的切片为关键切片，
+        检查级置信度取关键切片 (出血) 或最不确定切片 (未出血) 的置信度。
+    """
+    hemorrhage_probs = [s["probability"]["hemorrhage"] for s in slices]
+    positive = [i for i, s in enumerate(slices) if s["prediction"] == "出血"]
+    key_slice = int(np.argmax(hemorrhage_probs))
+    if positive:
+        study_prob = max(slices[i]["probability"]["hemorrhage"] for i in positive)
+    else:
+        study_prob = min(s["probability"]["no_hemorrhage"] for s in slices)
+    return {
+        "prediction": "出血" if positive else "未出血",
+        "confidence": confidence_level(study_prob),
+        "slice_count": len(slices),
+        "positive_slices": positive,
+        "key_slice": key_slice,
+        "max_hemorrhage_probability": round(max(hemorrhage_probs), 4),
+        "midline_shift": any(s["midline_shift"] for s in slices),
+        "ventricle_issue": any(s["ventricle_issue"] for s in slices),
+    }
+
+# 进度回调：progress(stage, completed, total, slices)
+#   stage = "decode" (completed/total 为文件数，slices 为空) 或 "analyze" (为切片数，slices 为本批完成的切片结果)
+SeriesProgress = Callable[[str, int, int, List[dict]], None]
+
+async def run_hemorrhage_series_async(sources: Sequence[Tuple[str, Union[str, bytes, BinaryIO]]],
+                                      preview: PreviewOptions = None,
+                                      max_slices: Optional[int] = None,
+                                      progress: Optional[SeriesProgress] = None):
+    """
+    运行序列级脑出血检测 (异步，合批推理)
+
+    参数：
+        sources    - [(文件名, 文件路径/原始字节/文件对象)]，按切片顺序排列
+        preview    - 各切片的预览图模式 (整个序列内嵌 PNG 体积较大，接口默认 none)
+        max_slices - 切片总数上限，默认取 Settings.HEMORRHAGE_SERIES_MAX_SLICES
+        progress   - 进度回调 (异步任务接口用于推送逐切片进度与部分结果)
+    返回：
+        dict - 检查级结论 (见 summarize_series) + duration_ms + slices (逐切片结果，含 index / source / frame)
+    异常：
+        ValueError - 切片数超过上限或文件无法解码
+        ExecutorSaturatedError - 在途请求已满
+    """
+    preview = preview or PreviewOptions(mode="none")
+    max_slices = max_slices or settings.HEMORRHAGE_SERIES_MAX_SLICES
+    if len(sources) > max_slices:
+        raise ValueError(f"序列文件数过多 ({len(sources)})，最多支持 {max_slices} 张切片")
+    notify = progress or (lambda *args: None)
+    series_start = time.time()
+    executor = get_inference_executor()
+    async with executor.slot():
+        loop = asyncio.get_running_loop()
+        payloads = []
+        for _, source in sources:
+            # 进程池无法传递文件对象，读取为字节 (大小已由 API 层限制)
+            if executor.kind == "process" and hasattr(source, "read"):
+                source = await loop.run_in_executor(None, source.read)
+            payloads.append(source)
+
+        # 1. 先只读取各文件头部统计总切片数，超限时不解码任何像素数据
+        frame_counts = await asyncio.gather(*(executor.run(count_series_frames, p) for p in payloads))
+        if sum(frame_counts) > max_slices:
+            raise ValueError(f"序列切片数过多 ({sum(frame_counts)})，最多支持 {max_slices} 张")
+
+        # 各文件并行解码与预处理；每个文件最多解码其头部声明的帧数，累计切片数不会超过上限
+        decoded_count = 0
+
+        async def decode(payload, frame_count):
+            nonlocal decoded_count
+            file_result = await executor.run(preprocess_series_file, payload, frame_count)
+            decoded_count += 1
+            notify("decode", decoded_count, len(payloads), [])
+            return file_result
+
+        decoded = await asyncio.gather(*(decode(p, n) for p, n in zip(payloads, frame_counts)))
+        images, tensors, origins = [], [], []
+        for (name, _), (file_images, file_tensor) in zip(sources, decoded):
+            multi_frame = len(file_images) > 1
+            for frame, image in enumerate(file_images):
+                origins.append((name, frame if multi_frame else None))
+                images.append(image)
+            tensors.append(file_tensor)
+
+        # 2-3. 按批大小分块流水线：各块同时入队推理，某块推理完成后立即计算其统计量与结果
+        inputs = torch.cat(tensors)
+        model_is_random = is_model_random()
+        chunk = settings.HEMORRHAGE_BATCH_MAX_SIZE
+        slices: List[Optional[dict]] = [None] * len(images)
+        analyzed_count = 0
+
+        async def analyze(offset):
+            nonlocal analyzed_count
+            start_time = time.time()
+            probs = await get_batcher().submit_many(inputs[offset:offset + chunk])
+            chunk_results = await executor.run(
+                build_series_results, images[offset:offset + chunk], probs, start_time, model_is_random, preview
+            )
+            for index, result in enumerate(chunk_results, start=offset):
+                name, frame = origins[index]
+                result.update({"index": index, "source": name, "frame": frame})
+                if preview.mode == "url":
+                    path, result["image_url"] = new_preview_artifact()
+                    _schedule_preview_write(images[index], path, preview.size)
+                slices[index] = result
+            analyzed_count += len(chunk_results)
+            notify("analyze", analyzed_count, len(images), chunk_results)
+
+        await asyncio.gather(*(analyze(offset) for offset in range(0, len(images), chunk)))
+
+    summary = summarize_series(slices)
+    summary["duration_ms"] = round((time.time() - series_start) * 1000, 2)
+    summary["slices"] = slices
+    return summary
@@ -0,0 +1,116 @@
+# app/services/history_service.py
+# ----------------------------------------------------------------------------------
+# 检测历史查询服务 (Hemorrhage History Service)
+# 作用：按用户分页查询 hemorrhage_records，供 Hemorrhage.vue 的历史记录列表使用：
+#       1. 键集分页 (Keyset Pagination)：以上一页最后一条的 (created_at, id) 作为游标，
+#          WHERE (created_at, id) < 游标，替代 OFFSET —— 翻到第 N 页不需要扫描并丢弃前 N 页；
+#       2. 命中复合索引 (user_id, created_at DESC, id DESC)，按索引顺序读取 limit + 1 行即可判断是否有下一页；
+#       3. 只查询列表展示所需的列 (不加载 ORM 实体与关联对象)。
+# 对接模块：
+#   - 上游调用: app.api.v1.quality (GET /hemorrhage/history)
+#   - 数据模型: app.models.hemorrhage_record.HemorrhageRecord
+# ----------------------------------------------------------------------------------
+
+import base64
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.hemorrhage_record import HemorrhageRecord
+
+# 列表展示所需的列
+HISTORY_COLUMNS = (
+    HemorrhageRecord.id,
+    HemorrhageRecord.created_at,
+    HemorrhageRecord.patient_name,
+    HemorrhageRecord.exam_id,
+    HemorrhageRecord.image_path,
+    HemorrhageRecord.prediction,
+    HemorrhageRecord.confidence_level,
+    HemorrhageRecord.hemorrhage_probability,
+    HemorrhageRecord.no_hemorrhage_probability,
+    HemorrhageRecord.analysis_duration,
+)
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    """将 (created_at, id) 编码为不透明的游标字符串"""
+    raw = f"{created_at.isoformat()}|{record_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    解析游标
+
+    异常：
+        ValueError - 游标格式无效
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, record_id = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(record_id)
+    except Exception:
+        raise ValueError("无效的分页游标")
+
+
+async def fetch_hemorrhage_history(db: AsyncSession, user_id: int, limit: int = 20, cursor: Optional[str] = None,
+                                   prediction: Optional[str] = None, confidence: Optional[str] = None,
+                                   date_from: Optional[date] = None,
+                                   date_to: Optional[date] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    查询一页检测历史 (按时间倒序)
+
+    参数：
+        cursor     - 上一页返回的 next_cursor，为空时从最新记录开始
+        prediction - 按结论过滤 ("出血" / "未出血")
+        confidence - 按置信度等级过滤 ("高" / "中" / "低")
+        date_from / date_to - 按检测日期过滤 (闭区间)
+    返回：
+        (记录列表, next_cursor)；没有下一页时 next_cursor 为 None
+    异常：
+        ValueError - 游标格式无效
+    说明：
+        检测记录经写后缓冲批量写入 (见 app.services.record_writer)，刚完成的检测可能延迟约 1 秒出现。
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    conditions = [HemorrhageRecord.user_id == user_id]
+    if prediction:
+        conditions.append(HemorrhageRecord.prediction == prediction)
+    if confidence:
+        conditions.append(HemorrhageRecord.confidence_level == confidence)
+    if date_from:
+        conditions.append(HemorrhageRecord.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        conditions.append(HemorrhageRecord.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        # 展开为 OR 形式 (MySQL 对行构造器比较的索引范围优化有限)
+        conditions.append(or_(
+            HemorrhageRecord.created_at < cursor_created_at,
+            and_(HemorrhageRecord.created_at == cursor_created_at, HemorrhageRecord.id < cursor_id),
+        ))
+
+    stmt = (
+        select(*HISTORY_COLUMNS)
+        .where(*conditions)
+        .order_by(HemorrhageRecord.created_at.desc(), HemorrhageRecord.id.desc())
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(stmt)).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    items = [
+        {**row, "created_at": row["created_at"].isoformat() if row["created_at"] else None}
+        for row in rows
+    ]
+    return items, next_cursor
@@ -0,0 +1,304 @@
+# app/services/inference_backends.py
+# ----------------------------------------------------------------------------------
+# 推理后端抽象 (Pluggable Inference Backends)
+# 作用：为同一个 Classifier 权重提供多种执行方式，通过配置选择：
+#       - eager:       原生 PyTorch (默认)
+#       - torchscript: TorchScript (trace + freeze)
+#       - compile:     torch.compile 编译
+#       - onnx:        导出 ONNX 模型，由 ONNX Runtime (CPU) 执行
+#       并提供模型导出与延迟对比工具，便于针对不同机型选择最快的后端。
+#       导出产物旁写入清单 (<产物>.json，记录源权重 SHA-256 与精度)，只有清单与当前加载的权重一致时
+#       才使用文件产物；权重更新、随机权重或 INT8 模型一律从内存中的模型即时生成，避免旧产物继续提供服务。
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai (get_backend / predict_probabilities)
+#   - 导出脚本: scripts/export_hemorrhage_model.py
+#   - 配置项:   app.core.config.Settings (INFERENCE_BACKEND)
+# ----------------------------------------------------------------------------------
+
+import inspect
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+logger = logging.getLogger(__name__)
+
+# 导出产物路径 (与训练产出的 hemorrhage_model_best.pth 放在同一目录)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+MODELS_DIR = os.path.join(PROJECT_ROOT, "models")
+TORCHSCRIPT_PATH = os.path.join(MODELS_DIR, "hemorrhage_model.torchscript.pt")
+ONNX_PATH = os.path.join(MODELS_DIR, "hemorrhage_model.onnx")
+
+# 导出产物的精度 (INT8 量化模型不导出为文件产物)
+ARTIFACT_PRECISION = "fp32"
+
+# 模型输入形状 (不含 batch 维)
+INPUT_SHAPE = (1, 224, 224)
+
+SUPPORTED_BACKENDS = ("eager", "torchscript", "compile", "onnx")
+
+
+class InferenceBackend:
+    """
+    推理后端基类
+
+    约定：
+        predict() 接收 [N, 1, 224, 224] 的 float32 张量，返回 [N, 2] 的 Softmax 概率 (np.ndarray)。
+    """
+    name = "base"
+
+    def predict(self, batch: torch.Tensor) -> np.ndarray:
+        raise NotImplementedError
+
+
+class EagerBackend(InferenceBackend):
+    """
+    原生 PyTorch 前向推理
+
+    参数：
+        channels_last: 模型已转换为 channels_last 时，输入同步转换以避免逐层格式转换
+    """
+    name = "eager"
+
+    def __init__(self, model: nn.Module, device: torch.device = torch.device("cpu"), channels_last: bool = False):
+        self.model = model
+        self.device = device
+        self.channels_last = channels_last
+
+    def predict(self, batch: torch.Tensor) -> np.ndarray:
+        with torch.inference_mode():
+            batch = batch.to(self.device)
+            if self.channels_last:
+                batch = batch.contiguous(memory_format=torch.channels_last)
+            outputs = self.model(batch)
+            return torch.softmax(outputs, dim=1).cpu().numpy()
+
+
+class TorchScriptBackend(EagerBackend):
+    """
+    TorchScript 后端
+
+    说明：
+        导出文件的清单与 fingerprint 一致时加载文件；否则从当前模型即时 trace 并 freeze。
+    """
+    name = "torchscript"
+
+    def __init__(self, model: nn.Module, device: torch.device = torch.device("cpu"),
+                 channels_last: bool = False, path: str = TORCHSCRIPT_PATH, fingerprint: Optional[Dict] = None):
+        self.artifact_path = path if artifact_matches(path, fingerprint) else None
+        if self.artifact_path:
+            scripted = torch.jit.load(path, map_location=device)
+            logger.info(f"✅ 已加载 TorchScript 模型: {path}")
+        else:
+            scripted = trace_model(model, device)
+            logger.info("ℹ️ 未使用 TorchScript 导出文件，已从当前模型即时生成")
+        super().__init__(torch.jit.optimize_for_inference(scripted.eval()), device, channels_last)
+
+
+class CompileBackend(EagerBackend):
+    """torch.compile 后端 (首次调用各批大小时会触发编译，建议配合启动预热)"""
+    name = "compile"
+
+    def __init__(self, model: nn.Module, device: torch.device = torch.device("cpu"), channels_last: bool = False):
+        super().__init__(torch.compile(model, dynamic=True), device, channels_last)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    ONNX Runtime (CPU) 后端
+
+    说明：
+        导出文件的清单与 fingerprint 一致时加载文件；否则从当前模型即时导出到内存。
+        intra-op 线程数沿用 torch 当前线程预算，与多进程服务池的线程固定策略一致。
+    """
+    name = "onnx"
+
+    def __init__(self, model: nn.Module, path: str = ONNX_PATH, fingerprint: Optional[Dict] = None):
+        import onnxruntime as ort  # 可选依赖：仅 onnx 后端需要
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = torch.get_num_threads()
+
+        self.artifact_path = path if artifact_matches(path, fingerprint) else None
+        if self.artifact_path:
+            source = path
+            logger.info(f"✅ 已加载 ONNX 模型: {path}")
+        else:
+            import io
+            buffer = io.BytesIO()
+            export_onnx(model, buffer)
+            source = buffer.getvalue()
+            logger.info("ℹ️ 未使用 ONNX 导出文件，已从当前模型即时导出")
+
+        self.session = ort.InferenceSession(source, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: torch.Tensor) -> np.ndarray:
+        logits = self.session.run(None, {self.input_name: batch.cpu().numpy().astype(np.float32, copy=False)})[0]
+        # 数值稳定的 Softmax
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+# ----------------------------------------------------------------------------------
+# 产物清单
+# fingerprint = {"checkpoint_sha256": 源权重文件哈希, "precision": "fp32"}；
+# 为 None 表示当前模型没有可对应的文件产物 (随机权重、INT8 量化)，只能即时生成
+# ----------------------------------------------------------------------------------
+def manifest_path(path: str) -> str:
+    return path + ".json"
+
+
+def write_manifest(path: str, fingerprint: Dict):
+    with open(manifest_path(path), "w", encoding="utf-8") as f:
+        json.dump({"checkpoint_sha256": fingerprint["checkpoint_sha256"], "precision": fingerprint["precision"]}, f)
+
+
+def artifact_matches(path: str, fingerprint: Optional[Dict]) -> bool:
+    """导出产物是否可以代替当前模型 (文件与清单均存在，且源权重与精度一致)"""
+    if not os.path.exists(path):
+        return False
+    if fingerprint is None or fingerprint.get("precision") != ARTIFACT_PRECISION:
+        logger.warning(f"⚠️ 当前模型无对应的导出产物 (随机权重或 INT8)，忽略 {path}")
+        return False
+    try:
+        with open(manifest_path(path), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        logger.warning(f"⚠️ 导出产物缺少清单，忽略 {path} (请重新执行 scripts/export_hemorrhage_model.py)")
+        return False
+    if (manifest.get("checkpoint_sha256") != fingerprint["checkpoint_sha256"]
+            or manifest.get("precision") != fingerprint["precision"]):
+        logger.warning(f"⚠️ 导出产物与当前权重不一致，忽略 {path} (请重新执行 scripts/export_hemorrhage_model.py)")
+        return False
+    return True
+
+
+def _check_exportable(fingerprint: Optional[Dict]):
+    if fingerprint is None or fingerprint.get("precision") != ARTIFACT_PRECISION:
+        raise ValueError("只能从已加载训练权重的 FP32 模型导出产物 (随机权重或 INT8 模型不导出)")
+
+
+# ----------------------------------------------------------------------------------
+# 导出工具
+# ----------------------------------------------------------------------------------
+def trace_model(model: nn.Module, device: torch.device = torch.device("cpu")) -> torch.jit.ScriptModule:
+    """trace 并 freeze 模型 (常量折叠、去除训练专用分支)"""
+    example = torch.zeros((1,) + INPUT_SHAPE, device=device)
+    with torch.no_grad():
+        traced = torch.jit.trace(model.eval(), example)
+    return torch.jit.freeze(traced)
+
+
+def export_torchscript(model: nn.Module, fingerprint: Dict, path: str = TORCHSCRIPT_PATH) -> str:
+    """导出 TorchScript 文件，并写入记录源权重与精度的清单"""
+    _check_exportable(fingerprint)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(manifest_path(path)):
+        os.remove(manifest_path(path))
+    torch.jit.save(trace_model(model.cpu()), path)
+    write_manifest(path, fingerprint)
+    return path
+
+
+def export_onnx(model: nn.Module, path_or_buffer=ONNX_PATH, fingerprint: Optional[Dict] = None):
+    """导出 ONNX (batch 维为动态轴，支持任意批大小)；导出到文件时必须提供 fingerprint 以写入清单"""
+    to_file = isinstance(path_or_buffer, str)
+    if to_file:
+        _check_exportable(fingerprint)
+        os.makedirs(os.path.dirname(path_or_buffer), exist_ok=True)
+        if os.path.exists(manifest_path(path_or_buffer)):
+            os.remove(manifest_path(path_or_buffer))
+    kwargs = {}
+    # 新版 PyTorch 默认使用 dynamo 导出器，这里固定使用 TorchScript 导出器以兼容 torch 2.1
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False
+    example = torch.zeros((1,) + INPUT_SHAPE)
+    torch.onnx.export(
+        model.cpu().eval(),
+        example,
+        path_or_buffer,
+        input_names=["input"],
+        output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=17,
+        **kwargs,
+    )
+    if to_file:
+        write_manifest(path_or_buffer, fingerprint)
+    return path_or_buffer
+
+
+# ----------------------------------------------------------------------------------
+# 工厂函数
+# ----------------------------------------------------------------------------------
+def create_backend(name: str, model: nn.Module, device: torch.device = torch.device("cpu"),
+                   channels_last: bool = False, fingerprint: Optional[Dict] = None) -> InferenceBackend:
+    """
+    按名称创建推理后端；非 eager 后端不支持 GPU/ONNX Runtime CUDA 等情况时由调用方回退
+
+    参数：
+        fingerprint - 当前模型的源权重与精度 (见 artifact_matches)，为 None 时不使用导出文件
+    """
+    if name == "eager":
+        return EagerBackend(model, device, channels_last)
+    if name == "torchscript":
+        return TorchScriptBackend(model, device, channels_last, fingerprint=fingerprint)
+    if name == "compile":
+        return CompileBackend(model, device, channels_last)
+    if name == "onnx":
+        if device.type != "cpu":
+            raise ValueError("onnx 后端仅支持 CPU 推理")
+        return OnnxRuntimeBackend(model, fingerprint=fingerprint)
+    raise ValueError(f"不支持的推理后端: {name} (可选: {', '.join(SUPPORTED_BACKENDS)})")
+
+
+def benchmark_backend(backend: InferenceBackend, batch_sizes: Iterable[int] = (1, 4, 8),
+                      iterations: int = 20, warmup: int = 3) -> List[Dict]:
+    """
+    测量单个后端在不同批大小下的推理延迟
+
+    返回：
+        [{"backend", "batch_size", "p50_ms", "p95_ms", "per_sample_ms"}]
+    """
+    rows = []
+    for batch_size in batch_sizes:
+        batch = torch.randn((batch_size,) + INPUT_SHAPE)
+        for _ in range(warmup):
+            backend.predict(batch)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            backend.predict(batch)
+            timings.append((time.perf_counter() - start) * 1000)
+        p50 = float(np.percentile(timings, 50))
+        rows.append({
+            "backend": backend.name,
+            "batch_size": batch_size,
+            "p50_ms": round(p50, 3),
+            "p95_ms": round(float(np.percentile(timings, 95)), 3),
+            "per_sample_ms": round(p50 / batch_size, 3),
+        })
+    return rows
+
+
+def compare_backends(model: nn.Module, names: Optional[Iterable[str]] = None,
+                     batch_sizes: Iterable[int] = (1, 4, 8), iterations: int = 20,
+                     fingerprint: Optional[Dict] = None) -> List[Dict]:
+    """依次构建并测量各后端，构建失败的后端记录错误信息而不中断对比"""
+    rows = []
+    for name in names or SUPPORTED_BACKENDS:
+        try:
+            backend = create_backend(name, model, fingerprint=fingerprint)
+            rows.extend(benchmark_backend(backend, batch_sizes, iterations))
+        except Exception as e:
+            logger.warning(f"⚠️ 推理后端 {name} 不可用: {e}")
+            rows.append({"backend": name, "error": str(e)})
+    return rows
@@ -0,0 +1,193 @@
+# app/services/inference_batcher.py
+# ----------------------------------------------------------------------------------
+# 动态微批处理调度器 (Dynamic Micro-Batching Scheduler)
+# 作用：在模型前面增加一层批处理队列，将并发到达的单张推理请求收集成批，
+#       一次前向推理后再把结果分发回各个等待中的请求，摊薄单次推理的固定开销。
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai (run_hemorrhage_detection_async)
+#   - 指标导出: app.utils.metrics (批大小 / 排队等待时间直方图)
+# 对接前端：
+#   - 间接服务于 Hemorrhage.vue 的检测请求 (多个阅片室并发上传时收益明显)。
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from app.utils.metrics import Histogram, DEFAULT_LATENCY_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+# 批大小直方图分桶 (覆盖 1 ~ 64)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class MicroBatcher:
+    """
+    动态微批处理器
+
+    原理：
+        1. 请求调用 submit() 将单个输入张量放入队列，并等待一个 Future。
+        2. 后台协程取出首个请求后，最多再等待 max_wait_ms 毫秒，
+           期间继续收集请求，直到凑满 max_batch_size。
+        3. 将收集到的输入拼接为一个 batch，调用 predict_fn 做一次前向推理。
+        4. 按顺序把结果切片写回各请求的 Future。
+
+    说明：
+        前向推理经 run_fn 在线程中执行 (默认使用事件循环的默认线程池)，避免阻塞事件循环；
+        同一时刻只运行一个批次，推理期间新到达的请求自然累积为下一批。
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[torch.Tensor], np.ndarray],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        name: str = "inference",
+        run_fn: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size 必须 >= 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self.run_fn = run_fn
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 调优指标：批大小分布、排队等待时间、单批推理耗时
+        self.batch_size_histogram = Histogram(
+            f"{name}_batch_size", "每次前向推理的批大小", BATCH_SIZE_BUCKETS
+        )
+        self.queue_wait_histogram = Histogram(
+            f"{name}_batch_queue_wait_seconds", "请求从入队到开始推理的等待时间 (秒)", DEFAULT_LATENCY_BUCKETS
+        )
+        self.inference_histogram = Histogram(
+            f"{name}_batch_inference_seconds", "单个批次的前向推理耗时 (秒)", DEFAULT_LATENCY_BUCKETS
+        )
+
+    # ------------------------------------------------------------------
+    # 生命周期管理
+    # ------------------------------------------------------------------
+    def _ensure_started(self):
+        """在当前事件循环中启动后台批处理协程 (惰性启动，兼容测试中多次创建事件循环)"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def stop(self):
+        """停止后台协程，并让仍在排队的请求失败返回"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, fut, _ = self._queue.get_nowait()
+                if not fut.done():
+                    fut.set_exception(RuntimeError("推理调度器已停止"))
+        self._worker = None
+
+    # ------------------------------------------------------------------
+    # 请求入口
+    # ------------------------------------------------------------------
+    async def submit(self, item: torch.Tensor) -> np.ndarray:
+        """
+        提交单个样本并等待推理结果
+
+        参数：
+            item: 单样本输入张量，形状 [C, H, W] 或 [1, C, H, W]
+        返回：
+            np.ndarray: 该样本对应的一行输出 (如 [2] 的类别概率)
+        """
+        if item.dim() == 4:
+            item = item[0]
+        self._ensure_started()
+        fut = self._loop.create_future()
+        await self._queue.put((item, fut, time.perf_counter()))
+        return await fut
+
+    async def submit_many(self, items: torch.Tensor) -> np.ndarray:
+        """
+        一次提交多个样本 (如一个序列的全部切片) 并按顺序返回结果
+
+        参数：
+            items: 输入张量，形状 [N, C, H, W]
+        返回：
+            np.ndarray: 形状 [N, ...]，第 i 行对应第 i 个样本
+        说明：
+            样本一次性入队，由后台循环按 max_batch_size 切分为多个批次，
+            并与同时到达的单张请求共享批次。
+        """
+        self._ensure_started()
+        enqueued_at = time.perf_counter()
+        futures = []
+        for item in items:
+            fut = self._loop.create_future()
+            self._queue.put_nowait((item, fut, enqueued_at))
+            futures.append(fut)
+        return np.stack(await asyncio.gather(*futures))
+
+    # ------------------------------------------------------------------
+    # 后台批处理循环
+    # ------------------------------------------------------------------
+    async def _collect(self) -> List[Tuple[torch.Tensor, asyncio.Future, float]]:
+        """收集一个批次：阻塞等待首个请求，然后在时间窗口内尽量凑满批"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # 队列中已有的请求直接取走，无需等待
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # 丢弃已被取消的请求 (如客户端断开)
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                continue
+
+            dispatch_time = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                self.queue_wait_histogram.observe(dispatch_time - enqueued_at)
+            self.batch_size_histogram.observe(len(batch))
+
+            try:
+                inputs = torch.stack([entry[0] for entry in batch])
+                if self.run_fn is not None:
+                    outputs = await self.run_fn(self.predict_fn, inputs)
+                else:
+                    outputs = await self._loop.run_in_executor(None, self.predict_fn, inputs)
+                self.inference_histogram.observe(time.perf_counter() - dispatch_time)
+            except Exception as e:
+                logger.error(f"❌ 批量推理失败 (batch={len(batch)}): {e}")
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            # 按顺序分发结果
+            for i, (_, fut, _) in enumerate(batch):
+                if not fut.done():
+                    fut.set_result(outputs[i])
@@ -0,0 +1,128 @@
+# app/services/inference_executor.py
+# ----------------------------------------------------------------------------------
+# 推理专用执行器 (Bounded Inference Executor)
+# 作用：为检测流水线中的阻塞型 CPU 工作 (PIL 解码、LANCZOS 缩放、NumPy 启发式分析、
+#       PNG 编码等) 提供独立的线程池/进程池，使其不再占用 asyncio 事件循环。
+#       同时限制同时在途的检测请求数，队列已满时快速拒绝 (503)，
+#       保证同一 uvicorn worker 仍能及时响应登录、汇总等轻量接口。
+#       模型前向推理 (微批处理器的批次) 使用本执行器中独立的单线程通道 (run_model)：
+#       批次本就逐个执行，独立通道避免批次排在预处理任务之后，也不占用事件循环的默认线程池；
+#       模型只加载在本进程中，因此即使 kind=process，前向推理仍在线程中执行。
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai (run_hemorrhage_detection_async, get_batcher)
+#   - 异常处理: app.api.v1.quality (捕获 ExecutorSaturatedError 返回 503)
+#   - 配置项:   app.core.config.Settings (INFERENCE_EXECUTOR_*)
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.utils.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# 运行指标
+_inflight_gauge = Gauge("inference_executor_inflight", "当前在途的检测请求数")
+_rejected_counter = Counter("inference_executor_rejected_total", "因在途请求已满而被拒绝的检测请求数")
+
+
+class ExecutorSaturatedError(Exception):
+    """在途请求数已达上限，调用方应快速返回 503 并提示客户端稍后重试"""
+
+
+class InferenceExecutor:
+    """
+    有界推理执行器
+
+    参数：
+        kind: "thread" (线程池，默认) 或 "process" (进程池，适合 GIL 竞争严重的场景)
+        max_workers: 池中工作线程/进程数
+        max_inflight: 同时在途的检测请求上限，超过则立即拒绝
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 2, max_inflight: int = 16):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"不支持的执行器类型: {kind} (可选: thread / process)")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_inflight = max_inflight
+        self._inflight = 0
+        self._pool: Optional[Executor] = None
+        self._model_pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                # 使用 spawn 启动方式，避免在已加载 torch 线程池的进程中 fork
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference",
+                )
+            logger.info(f"✅ 推理执行器已启动: kind={self.kind}, workers={self.max_workers}, max_inflight={self.max_inflight}")
+        return self._pool
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        占用一个在途名额 (超过上限时立即抛出 ExecutorSaturatedError，不排队等待)
+        """
+        if self._inflight >= self.max_inflight:
+            _rejected_counter.inc()
+            raise ExecutorSaturatedError(f"推理队列已满 (在途 {self._inflight}/{self.max_inflight})")
+        self._inflight += 1
+        _inflight_gauge.inc()
+        try:
+            yield
+        finally:
+            self._inflight -= 1
+            _inflight_gauge.dec()
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """在执行器中运行阻塞函数并等待结果 (进程池模式下 fn 与参数必须可 pickle)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), fn, *args)
+
+    async def run_model(self, fn: Callable[..., Any], *args) -> Any:
+        """在模型推理专用线程中运行前向推理 (单线程，批次依次执行)"""
+        if self._model_pool is None:
+            self._model_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference-model")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._model_pool, fn, *args)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._model_pool is not None:
+            self._model_pool.shutdown(wait=False, cancel_futures=True)
+            self._model_pool = None
+
+
+# 全局单例
+_executor: Optional[InferenceExecutor] = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """获取全局推理执行器 (单例，参数取自 Settings)"""
+    global _executor
+    if _executor is None:
+        _executor = InferenceExecutor(
+            kind=settings.INFERENCE_EXECUTOR_KIND,
+            max_workers=settings.INFERENCE_EXECUTOR_WORKERS,
+            max_inflight=settings.INFERENCE_MAX_INFLIGHT,
+        )
+    return _executor
@@ -0,0 +1,143 @@
+# app/services/issue_service.py
+# ----------------------------------------------------------------------------------
+# 异常列表查询服务 (Recent Issues Service)
+# 作用：为异常汇总页面的异常列表提供检索与分页 (数据来自 hemorrhage_records 中检出异常的记录)：
+#       1. 检索：患者姓名、检查号、异常描述走 FULLTEXT (ngram) 索引；单字检索退化为前缀匹配；
+#       2. 状态筛选：命中 (status, created_at DESC, id DESC) 索引，按索引顺序读取；
+#       3. 分页：支持 cursor (键集分页，翻页耗时与页码无关) 与原有 page 参数 (OFFSET，用于跳页)；
+#       4. 总数：无检索词时取自日汇总表 (qc_daily_stats)，有检索词时计数到 RECENT_TOTAL_CAP 为止，
+#          不对明细表做完整 COUNT(*)。
+# 对接模块：
+#   - 上游调用: app.api.v1.summary (GET /recent)
+#   - 游标编码: app.services.history_service (encode_cursor / decode_cursor)
+# ----------------------------------------------------------------------------------
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.hemorrhage_record import HemorrhageRecord
+from app.models.qc_daily_stat import QCDailyStat
+from app.services.history_service import decode_cursor, encode_cursor
+from app.services.stats_rollup import EXAM_TYPE_HEMORRHAGE
+
+# 有检索词时总数的计数上限 (超过时返回上限并标记为近似值)
+RECENT_TOTAL_CAP = 1000
+
+# 全文检索的最短检索词长度 (与 MySQL ngram_token_size 一致)
+FULLTEXT_MIN_LENGTH = 2
+
+# 布尔模式下有特殊含义的字符 (检索词按短语匹配，去除这些字符)
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+RECENT_COLUMNS = (
+    HemorrhageRecord.id,
+    HemorrhageRecord.created_at,
+    HemorrhageRecord.patient_name,
+    HemorrhageRecord.exam_id,
+    HemorrhageRecord.image_path,
+    HemorrhageRecord.prediction,
+    HemorrhageRecord.confidence_level,
+    HemorrhageRecord.status,
+    HemorrhageRecord.issue_description,
+)
+
+
+def search_condition(query: str):
+    """
+    构造检索条件
+
+    说明：
+        检索词按短语匹配 (MATCH ... AGAINST ('"xxx"' IN BOOLEAN MODE))；
+        短于 ngram 分词长度的检索词无法命中全文索引，改为患者姓名 / 检查号前缀匹配。
+    """
+    term = _BOOLEAN_OPERATORS.sub(" ", query).strip()
+    if len(term) < FULLTEXT_MIN_LENGTH:
+        return or_(HemorrhageRecord.patient_name.startswith(term, autoescape=True),
+                   HemorrhageRecord.exam_id.startswith(term, autoescape=True))
+    return match(
+        HemorrhageRecord.patient_name, HemorrhageRecord.exam_id, HemorrhageRecord.issue_description,
+        against=f'"{term}"',
+    ).in_boolean_mode()
+
+
+def _to_item(row) -> Dict:
+    """转换为前端异常列表的行结构 (RecentIssue)"""
+    return {
+        "id": f"ISS-{row['id']}",
+        "date": row["created_at"].strftime("%Y/%m/%d %H:%M:%S") if row["created_at"] else "",
+        "patientName": row["patient_name"] or "",
+        "examId": row["exam_id"] or "",
+        "type": EXAM_TYPE_HEMORRHAGE,
+        "description": row["issue_description"] or row["prediction"],
+        "status": row["status"],
+        "priority": "High" if row["confidence_level"] == "高" else "Normal",
+        # url 预览模式下保存的是预览图地址；其余情况只保存了上传文件名，没有可访问的图像
+        "imageUrl": row["image_path"] if row["image_path"].startswith(("/", "http")) else None,
+    }
+
+
+async def _count_total(db: AsyncSession, conditions: List, query: Optional[str],
+                       status: Optional[str]) -> Tuple[int, bool]:
+    """返回 (总数, 是否为近似值)"""
+    if not query:
+        stmt = select(func.sum(QCDailyStat.record_count)).where(QCDailyStat.issue_type != "")
+        if status:
+            stmt = stmt.where(QCDailyStat.status == status)
+        return int((await db.execute(stmt)).scalar() or 0), False
+    capped = select(HemorrhageRecord.id).where(*conditions).limit(RECENT_TOTAL_CAP).subquery()
+    total = (await db.execute(select(func.count()).select_from(capped))).scalar() or 0
+    return total, total >= RECENT_TOTAL_CAP
+
+
+async def fetch_recent_issues(db: AsyncSession, page: int = 1, limit: int = 10, query: Optional[str] = None,
+                              status: Optional[str] = None, cursor: Optional[str] = None) -> Dict:
+    """
+    查询一页异常记录 (按时间倒序)
+
+    参数：
+        page   - 页码 (未提供 cursor 时按 OFFSET 跳页)
+        query  - 检索词 (患者姓名 / 检查号 / 异常描述)
+        status - 处理状态筛选
+        cursor - 上一页返回的 nextCursor (提供时忽略 page)
+    返回：
+        RecentIssuePage 结构 (total, totalApproximate, items, nextCursor)
+    异常：
+        ValueError - 游标格式无效
+    """
+    query = (query or "").strip()[:100]
+    conditions = [HemorrhageRecord.status == status] if status else [HemorrhageRecord.status.is_not(None)]
+    if query:
+        conditions.append(search_condition(query))
+
+    stmt = (
+        select(*RECENT_COLUMNS)
+        .where(*conditions)
+        .order_by(HemorrhageRecord.created_at.desc(), HemorrhageRecord.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            HemorrhageRecord.created_at < cursor_created_at,
+            and_(HemorrhageRecord.created_at == cursor_created_at, HemorrhageRecord.id < cursor_id),
+        ))
+    elif page > 1:
+        stmt = stmt.offset((page - 1) * limit)
+    rows = (await db.execute(stmt)).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+    total, approximate = await _count_total(db, conditions, query, status)
+    return {
+        "total": total,
+        "totalApproximate": approximate,
+        "items": [_to_item(row) for row in rows],
+        "nextCursor": next_cursor,
+    }
@@ -0,0 +1,241 @@
+# app/services/job_manager.py
+# ----------------------------------------------------------------------------------
+# 异步任务管理 (Background Job Manager)
+# 作用：将整个序列等耗时的检测从单个 HTTP 请求中解耦：
+#       1. 提交后立即返回任务 ID，检测在后台协程中执行 (阻塞工作仍由推理执行器承担)；
+#       2. 客户端轮询 GET /api/v1/jobs/{id}，或通过 SSE / WebSocket 订阅逐切片进度与部分结果；
+#       3. 已结束任务的结果保留 TTL 秒后清理，同时限制保留的任务总数。
+# 对接模块：
+#   - 上游调用: app.api.v1.quality (提交序列任务), app.api.v1.jobs (查询 / 订阅)
+#   - 配置项:   app.core.config.Settings (JOB_*)
+#   - 指标导出: app.utils.metrics
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.inference_executor import ExecutorSaturatedError
+from app.utils.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+# 运行指标
+_jobs_submitted = Counter("jobs_submitted_total", "已提交的后台任务数")
+_jobs_failed = Counter("jobs_failed_total", "执行失败的后台任务数")
+_jobs_active = Gauge("jobs_active", "排队中与执行中的后台任务数")
+_jobs_retained = Gauge("jobs_retained", "内存中保留的任务数 (含已结束)")
+
+# 推理队列已满时的重试间隔 (秒)：后台任务排队等待，而不是像同步接口那样返回 503
+_SATURATED_RETRY_SECONDS = 0.5
+
+
+@dataclass
+class Job:
+    """后台任务状态 (partial_results 为已完成切片的结果，按完成顺序追加)"""
+    id: str
+    kind: str
+    owner: str
+    status: str = QUEUED
+    stage: Optional[str] = None
+    completed: int = 0
+    total: int = 0
+    partial_results: List[dict] = field(default_factory=list)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    subscribers: Set[asyncio.Queue] = field(default_factory=set, repr=False)
+
+    def snapshot(self, include_partial: bool = False) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "completed": self.completed,
+            "total": self.total,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "result": self.result,
+        }
+        if include_partial:
+            data["partial_results"] = list(self.partial_results)
+        return data
+
+
+# 任务函数：接收进度回调 progress(stage, completed, total, partial_results)，返回最终结果
+JobProgress = Callable[[str, int, int, List[dict]], None]
+JobFunction = Callable[[JobProgress], Awaitable[dict]]
+
+
+class JobManager:
+    """
+    进程内后台任务管理器
+
+    参数：
+        ttl_seconds:  已结束任务的保留时间
+        max_retained: 最多保留的任务数 (超出时优先清理最早结束的任务)
+        max_active:   同时执行的任务数，其余任务排队 (状态 queued)
+    说明：
+        任务状态保存在当前 worker 进程内存中；多 worker 部署时需按任务 ID 做会话保持。
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_retained: int = 256, max_active: int = 2):
+        self.ttl_seconds = ttl_seconds
+        self.max_retained = max_retained
+        self.max_active = max_active
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ------------------------------------------------------------------
+    # 提交与查询
+    # ------------------------------------------------------------------
+    def submit(self, kind: str, owner: str, fn: JobFunction,
+               on_finish: Optional[Callable[[], None]] = None) -> Job:
+        """
+        创建任务并在后台执行
+
+        参数：
+            fn        - 任务协程函数，参数为进度回调
+            on_finish - 任务结束 (成功或失败) 后调用，用于释放上传文件等资源
+        """
+        self.purge_expired()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_active)
+        job = Job(id=uuid.uuid4().hex, kind=kind, owner=owner)
+        self._jobs[job.id] = job
+        self._tasks[job.id] = asyncio.create_task(self._run(job, fn, on_finish))
+        _jobs_submitted.inc()
+        _jobs_active.inc()
+        _jobs_retained.set(len(self._jobs))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.purge_expired()
+        return self._jobs.get(job_id)
+
+    async def subscribe(self, job: Job) -> AsyncIterator[Dict[str, Any]]:
+        """
+        订阅任务事件
+
+        说明：
+            首个事件为当前快照 (含已完成的部分结果)，之后依次推送 progress 事件，
+            任务结束时推送 done 事件并结束迭代。
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.add(queue)
+        try:
+            yield {"event": "snapshot", **job.snapshot(include_partial=True)}
+            if job.status in FINISHED_STATES:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if event["event"] == "done":
+                    return
+        finally:
+            job.subscribers.discard(queue)
+
+    def purge_expired(self):
+        """清理超过 TTL 的已结束任务，并将保留数量限制在 max_retained 以内"""
+        now = time.time()
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished_at is not None),
+            key=lambda job: job.finished_at,
+        )
+        overflow = len(self._jobs) - self.max_retained
+        for job in finished:
+            if now - job.finished_at > self.ttl_seconds or overflow > 0:
+                self._jobs.pop(job.id, None)
+                overflow -= 1
+        _jobs_retained.set(len(self._jobs))
+
+    async def shutdown(self):
+        """取消仍在执行的任务 (服务关闭时调用)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # 执行
+    # ------------------------------------------------------------------
+    def _publish(self, job: Job, event: Dict[str, Any]):
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    def _progress(self, job: Job, stage: str, completed: int, total: int, partial_results: List[dict]):
+        job.stage, job.completed, job.total = stage, completed, total
+        job.partial_results.extend(partial_results)
+        self._publish(job, {
+            "event": "progress",
+            "job_id": job.id,
+            "stage": stage,
+            "completed": completed,
+            "total": total,
+            "partial_results": partial_results,
+        })
+
+    async def _run(self, job: Job, fn: JobFunction, on_finish: Optional[Callable[[], None]]):
+        try:
+            async with self._semaphore:
+                job.status = RUNNING
+                self._publish(job, {"event": "status", "job_id": job.id, "status": RUNNING})
+                progress = lambda *args: self._progress(job, *args)
+                while True:
+                    try:
+                        job.result = await fn(progress)
+                        break
+                    except ExecutorSaturatedError:
+                        # 同步检测请求占满推理队列时等待重试，任务不失败
+                        job.partial_results.clear()
+                        await asyncio.sleep(_SATURATED_RETRY_SECONDS)
+                job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            job.status, job.error = FAILED, "任务已取消 (服务关闭)"
+            raise
+        except Exception as e:
+            logger.error(f"❌ 后台任务失败 ({job.kind} {job.id}): {e}")
+            job.status, job.error = FAILED, str(e)
+            _jobs_failed.inc()
+        finally:
+            job.finished_at = time.time()
+            job.partial_results = []  # 结果已汇总在 result 中，释放部分结果
+            self._tasks.pop(job.id, None)
+            _jobs_active.dec()
+            self._publish(job, {"event": "done", **job.snapshot()})
+            if on_finish is not None:
+                try:
+                    on_finish()
+                except Exception as e:
+                    logger.warning(f"⚠️ 任务资源释放失败 ({job.id}): {e}")
+
+
+# 全局单例
+_job_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """获取全局任务管理器 (单例，参数取自 Settings)"""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(
+            ttl_seconds=settings.JOB_RESULT_TTL_SECONDS,
+            max_retained=settings.JOB_MAX_RETAINED,
+            max_active=settings.JOB_MAX_ACTIVE,
+        )
+    return _job_manager
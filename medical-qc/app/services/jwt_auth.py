@@ -0,0 +1,130 @@
+# app/services/jwt_auth.py
+# ----------------------------------------------------------------------------------
+# 无状态令牌认证 (Signed Token Authentication, AUTH_MODE=jwt)
+# 作用：登录签发带过期时间的 JWT，请求认证在进程内完成，不在热路径上访问数据库：
+#       1. 签名与过期时间在进程内校验；用户 ID 取自令牌声明；
+#       2. 吊销检查：令牌携带签发时的 token_version (ver)，每个用户每 AUTH_REVOCATION_CHECK_SECONDS 秒
+#          最多查询一次数据库中的用户行，并缓存该行供接口读取 (与不透明令牌模式返回同样完整的 User)；
+#          版本已递增或账号已禁用时拒绝；
+#       3. 本进程通过 ORM 修改 token_version / is_active 时立即清除该用户的检查结果 (见 app.services.token_cache)；
+#       4. 数据库暂时不可用时沿用上次检查结果；该用户没有检查结果时拒绝 (fail closed)。
+# 对接模块：
+#   - 签发:     app.services.auth_service.login_user
+#   - 吊销:     app.services.auth_service.revoke_user_tokens (POST /auth/logout)
+#   - 校验:     app.services.token_cache.get_user_by_token (按令牌格式分派)
+#   - 编解码:   app.utils.jwt_utils
+#   - 配置项:   app.core.config.Settings (AUTH_MODE, ACCESS_TOKEN_EXPIRE_MINUTES, AUTH_REVOCATION_CHECK_SECONDS)
+# ----------------------------------------------------------------------------------
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import jwt
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.utils.jwt_utils import create_access_token, decode_access_token
+from app.utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+
+def issue_access_token(user: User) -> str:
+    """为用户签发 JWT (sub = 用户 ID，ver = 当前 token_version)"""
+    return create_access_token({"sub": str(user.id), "username": user.username, "ver": user.token_version or 0})
+
+
+class RevocationChecker:
+    """
+    按用户缓存吊销检查结果 (用户行快照，含 token_version / is_active)
+
+    参数：
+        check_interval: 同一用户两次查询数据库的最小间隔 (秒)
+        max_entries:    最多缓存的用户数 (LRU 淘汰)
+    说明：
+        缓存的 User 实例已脱离会话 (expunge)，与 TokenCache 相同，只可读取列属性。
+    """
+
+    def __init__(self, name: str = "jwt_revocation", check_interval: float = 30.0, max_entries: int = 10000):
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        # 用户 ID -> (用户行，用户不存在时为 None, 检查时间)
+        self._state: "OrderedDict[int, Tuple[Optional[User], float]]" = OrderedDict()
+
+        self._checks = Counter(f"{name}_checks_total", "吊销检查查询数据库的次数")
+        self._check_failures = Counter(f"{name}_check_failures_total", "吊销检查查询失败次数 (沿用上次结果)")
+        self._rejected = Counter(f"{name}_rejected_total", "因令牌版本过期或账号禁用被拒绝的请求数")
+
+    async def get_user(self, db: AsyncSession, user_id: int, version: int) -> Optional[User]:
+        """
+        返回令牌对应的有效用户；版本已递增、账号已禁用或不存在时返回 None
+
+        说明：
+            查询失败时沿用上次结果；该用户没有任何检查结果时拒绝 (fail closed)。
+        """
+        state = self._state.get(user_id)
+        if state is None or time.monotonic() - state[1] > self.check_interval:
+            state = await self._refresh(db, user_id, state)
+        user = state[0] if state is not None else None
+        if user is None or not user.is_active or (user.token_version or 0) != version:
+            self._rejected.inc()
+            return None
+        return user
+
+    def invalidate(self, user_id: int):
+        self._state.pop(user_id, None)
+
+    def clear(self):
+        self._state.clear()
+
+    async def _refresh(self, db: AsyncSession, user_id: int,
+                       previous: Optional[Tuple[Optional[User], float]]) -> Optional[Tuple[Optional[User], float]]:
+        self._checks.inc()
+        try:
+            user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+        except (SQLAlchemyError, OSError) as e:
+            self._check_failures.inc()
+            logger.warning(f"⚠️ 令牌吊销检查失败，沿用上次结果 (user_id={user_id}): {e}")
+            return previous
+        if user is not None:
+            # 脱离请求会话后再缓存，避免被其他请求的会话共享
+            db.expunge(user)
+        state = (user, time.monotonic())
+        self._state[user_id] = state
+        self._state.move_to_end(user_id)
+        while len(self._state) > self.max_entries:
+            self._state.popitem(last=False)
+        return state
+
+
+# 全局单例
+_revocation_checker: Optional[RevocationChecker] = None
+
+
+def get_revocation_checker() -> RevocationChecker:
+    """获取全局吊销检查器 (单例，参数取自 Settings)"""
+    global _revocation_checker
+    if _revocation_checker is None:
+        _revocation_checker = RevocationChecker(check_interval=settings.AUTH_REVOCATION_CHECK_SECONDS)
+    return _revocation_checker
+
+
+async def get_user_from_jwt(db: AsyncSession, token: str) -> Optional[User]:
+    """
+    校验 JWT 并返回用户
+
+    返回：
+        User (已脱离会话的用户行快照)；签名无效、已过期、已吊销或账号已禁用时返回 None
+    """
+    try:
+        payload = decode_access_token(token)
+        user_id = int(payload["sub"])
+        version = int(payload.get("ver", 0))
+    except (jwt.InvalidTokenError, ValueError, TypeError):
+        return None
+    return await get_revocation_checker().get_user(db, user_id, version)
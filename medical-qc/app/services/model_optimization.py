@@ -0,0 +1,85 @@
+# app/services/model_optimization.py
+# ----------------------------------------------------------------------------------
+# 推理图优化 (Load-Time Inference Graph Optimization)
+# 作用：在模型加载完成后做一次与精度无关的结构优化，降低每次请求的推理延迟：
+#       1. BatchNorm 折叠：将每个 BatchNorm2d 的缩放/平移并入前一个 Conv2d；
+#       2. 移除 Dropout / Dropout2d (评估模式下本就是恒等映射)；
+#       3. 转换为 channels_last 内存格式 (CPU/GPU 卷积核更友好)；
+#       4. 与未优化模型做数值等价性校验，不通过则不启用。
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai.get_model (MODEL_OPTIMIZE=True 时)
+#   - 配置项:   app.core.config.Settings (MODEL_OPTIMIZE / MODEL_OPTIMIZE_ATOL)
+# ----------------------------------------------------------------------------------
+
+import copy
+import logging
+
+import torch
+import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
+
+logger = logging.getLogger(__name__)
+
+# 评估模式下为恒等映射、可直接删除的层
+_DROPOUT_TYPES = (nn.Dropout, nn.Dropout2d)
+
+
+class ModelOptimizationError(Exception):
+    """优化后的模型与原模型数值不等价，不应启用"""
+
+
+def _fold_sequential(seq: nn.Sequential) -> nn.Sequential:
+    """重建 Sequential：Conv2d + BatchNorm2d 折叠为单个 Conv2d，并移除 Dropout 层"""
+    layers = list(seq)
+    folded = []
+    i = 0
+    while i < len(layers):
+        layer = layers[i]
+        nxt = layers[i + 1] if i + 1 < len(layers) else None
+        if isinstance(layer, nn.Conv2d) and isinstance(nxt, nn.BatchNorm2d):
+            folded.append(fuse_conv_bn_eval(layer, nxt))
+            i += 2
+            continue
+        if not isinstance(layer, _DROPOUT_TYPES):
+            folded.append(layer)
+        i += 1
+    return nn.Sequential(*folded)
+
+
+def optimize_model(model: nn.Module, channels_last: bool = True) -> nn.Module:
+    """
+    生成优化后的推理模型 (不修改传入模型)
+
+    说明：
+        仅处理模型中直接挂载的 nn.Sequential 子模块 (Classifier.features / classifier)，
+        forward 逻辑保持不变。
+    """
+    optimized = copy.deepcopy(model).eval()
+    for name, child in list(optimized.named_children()):
+        if isinstance(child, nn.Sequential):
+            setattr(optimized, name, _fold_sequential(child))
+    if channels_last:
+        optimized = optimized.to(memory_format=torch.channels_last)
+    return optimized.eval()
+
+
+def check_equivalence(reference: nn.Module, optimized: nn.Module, device: torch.device,
+                      atol: float = 1e-4, channels_last: bool = True, batch_size: int = 4) -> float:
+    """
+    数值等价性校验：固定随机输入下比较两者的 Softmax 概率
+
+    返回：
+        float - 最大绝对误差
+    异常：
+        ModelOptimizationError - 误差超过 atol
+    """
+    generator = torch.Generator().manual_seed(0)
+    inputs = torch.randn((batch_size, 1, 224, 224), generator=generator).to(device)
+    optimized_inputs = inputs.contiguous(memory_format=torch.channels_last) if channels_last else inputs
+    with torch.inference_mode():
+        expected = torch.softmax(reference(inputs), dim=1)
+        actual = torch.softmax(optimized(optimized_inputs), dim=1)
+    max_diff = float((expected - actual).abs().max())
+    if max_diff > atol:
+        raise ModelOptimizationError(f"优化后模型输出偏差 {max_diff:.2e} 超过容差 {atol:.0e}")
+    return max_diff
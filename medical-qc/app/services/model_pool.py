@@ -0,0 +1,274 @@
+# app/services/model_pool.py
+# ----------------------------------------------------------------------------------
+# 多进程 CPU 模型服务池 (Multi-Process Model Serving Pool)
+# 作用：在纯 CPU 节点上以独立进程的方式集中提供模型推理服务：
+#       1. 父进程只加载一次 hemorrhage_model_best.pth，并将权重放入共享内存；
+#       2. fork 出固定数量的推理 worker 进程 (写时复制，不重复占用权重内存)，
+#          每个 worker 固定 torch.set_num_threads 线程预算，避免线程超额订阅；
+#       3. 各 uvicorn API 进程通过 IPC 连接 (multiprocessing.connection) 提交批次，
+#          由任务队列分发给空闲 worker，结果按请求 ID 回传。
+# 启动方式：
+#   python -m app.services.model_pool
+#   (API 进程需配置 INFERENCE_SERVING_MODE=pool 才会连接本服务)
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai.predict_probabilities (pool 模式)
+#   - 配置项:   app.core.config.Settings (MODEL_POOL_*)
+# ----------------------------------------------------------------------------------
+
+import itertools
+import logging
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Optional
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_address():
+    return (settings.MODEL_POOL_HOST, settings.MODEL_POOL_PORT)
+
+
+def _pool_authkey() -> bytes:
+    return settings.MODEL_POOL_AUTHKEY.encode("utf-8")
+
+
+# ==================================================================================
+# 服务端 (Serving Pool)
+# ==================================================================================
+
+def _worker_main(worker_id: int, num_threads: int, task_queue, result_queue):
+    """
+    推理 worker 进程主循环
+
+    说明：
+        模型在 fork 前已加载并 share_memory()，子进程直接复用父进程的权重页；
+        推理后端 (INFERENCE_BACKEND) 在 fork 之后于各 worker 内构建，
+        避免 ONNX Runtime 会话等非 fork 安全的对象跨进程共享。
+        任务格式: (conn_id, request_id, batch ndarray)；收到 None 时退出。
+    """
+    from app.services import hemorrhage_ai
+
+    torch.set_num_threads(num_threads)
+    backend = hemorrhage_ai.get_backend()
+    logger.info(f"✅ 推理 worker #{worker_id} 已启动 (backend={backend.name}, threads={num_threads})")
+    with torch.inference_mode():
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            conn_id, request_id, batch = task
+            try:
+                probs = backend.predict(torch.from_numpy(batch))
+                result_queue.put((conn_id, request_id, probs, None))
+            except Exception as e:
+                result_queue.put((conn_id, request_id, None, f"worker #{worker_id} 推理失败: {e}"))
+
+
+class ModelServingPool:
+    """
+    模型服务池 (运行在独立进程中)
+
+    参数：
+        num_workers: 推理 worker 进程数
+        threads_per_worker: 每个 worker 的 torch 线程数 (num_workers * threads_per_worker 建议 ≈ 物理核数)
+    """
+
+    def __init__(self, num_workers: int, threads_per_worker: int):
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self._ctx = mp.get_context("fork")
+        self._task_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._workers = []
+        self._conns: Dict[int, object] = {}
+        self._conn_locks: Dict[int, threading.Lock] = {}
+        self._conn_ids = itertools.count()
+        self.model_is_random = False
+
+    def start_workers(self):
+        """加载模型 → 放入共享内存 → fork worker 进程"""
+        # 延迟导入，避免 hemorrhage_ai <-> model_pool 循环依赖
+        from app.services import hemorrhage_ai
+
+        model = hemorrhage_ai.get_model()
+        model.share_memory()
+        # 直接读取本进程的加载结果：is_model_random() 在 pool 模式下会转而询问服务池客户端
+        self.model_is_random = hemorrhage_ai._model_is_random
+
+        for worker_id in range(self.num_workers):
+            p = self._ctx.Process(
+                target=_worker_main,
+                args=(worker_id, self.threads_per_worker, self._task_queue, self._result_queue),
+                daemon=True,
+            )
+            p.start()
+            self._workers.append(p)
+        logger.info(f"✅ 模型服务池已启动: workers={self.num_workers}, threads/worker={self.threads_per_worker}")
+
+    def _dispatch_results(self):
+        """将 worker 的推理结果回传给对应的 API 连接"""
+        while True:
+            conn_id, request_id, probs, error = self._result_queue.get()
+            conn = self._conns.get(conn_id)
+            if conn is None:
+                continue  # 客户端已断开，丢弃结果
+            try:
+                with self._conn_locks[conn_id]:
+                    conn.send(("result", request_id, probs, error))
+            except (OSError, EOFError):
+                self._drop_conn(conn_id)
+
+    def _drop_conn(self, conn_id: int):
+        conn = self._conns.pop(conn_id, None)
+        self._conn_locks.pop(conn_id, None)
+        if conn is not None:
+            conn.close()
+
+    def _serve_conn(self, conn_id: int, conn):
+        """读取单个 API 进程发送的请求并投递到任务队列"""
+        try:
+            while True:
+                msg = conn.recv()
+                if msg[0] == "hello":
+                    with self._conn_locks[conn_id]:
+                        conn.send(("hello", self.model_is_random))
+                elif msg[0] == "predict":
+                    _, request_id, batch = msg
+                    self._task_queue.put((conn_id, request_id, batch))
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._drop_conn(conn_id)
+
+    def serve_forever(self):
+        self.start_workers()
+        threading.Thread(target=self._dispatch_results, name="pool-results", daemon=True).start()
+
+        with Listener(_pool_address(), authkey=_pool_authkey()) as listener:
+            logger.info(f"✅ 模型服务池监听于 {_pool_address()}")
+            try:
+                while True:
+                    conn = listener.accept()
+                    conn_id = next(self._conn_ids)
+                    self._conns[conn_id] = conn
+                    self._conn_locks[conn_id] = threading.Lock()
+                    threading.Thread(target=self._serve_conn, args=(conn_id, conn), daemon=True).start()
+            except KeyboardInterrupt:
+                logger.info("模型服务池正在退出...")
+            finally:
+                for _ in self._workers:
+                    self._task_queue.put(None)
+                for p in self._workers:
+                    p.join(timeout=5)
+
+
+# ==================================================================================
+# 客户端 (API 进程侧)
+# ==================================================================================
+
+class ModelPoolClient:
+    """
+    模型服务池客户端
+
+    作用：
+        在 API 进程中维持一条到服务池的 IPC 连接，支持多线程并发提交批次；
+        后台线程按请求 ID 将结果写回对应的 Future。
+    """
+
+    def __init__(self, address=None, authkey: bytes = None, timeout: float = 30.0):
+        self.address = address or _pool_address()
+        self.authkey = authkey or _pool_authkey()
+        self.timeout = timeout
+        self.model_is_random = False
+        self._conn = None
+        self._pending: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = Client(self.address, authkey=self.authkey)
+        conn.send(("hello",))
+        _, self.model_is_random = conn.recv()
+        self._conn = conn
+        threading.Thread(target=self._read_results, args=(conn,), name="pool-client", daemon=True).start()
+        logger.info(f"✅ 已连接模型服务池 {self.address}")
+
+    def _read_results(self, conn):
+        try:
+            while True:
+                _, request_id, probs, error = conn.recv()
+                fut = self._pending.pop(request_id, None)
+                if fut is None:
+                    continue
+                if error:
+                    fut.set_exception(RuntimeError(error))
+                else:
+                    fut.set_result(probs)
+        except (EOFError, OSError) as e:
+            # 连接断开：让所有挂起请求失败，下次调用时重连
+            with self._lock:
+                if self._conn is conn:
+                    self._conn = None
+                pending, self._pending = self._pending, {}
+            for fut in pending.values():
+                fut.set_exception(ConnectionError(f"模型服务池连接已断开: {e}"))
+
+    def _reset_conn(self):
+        """关闭当前连接 (调用方需持有 _lock)，下次调用时重连；读取线程随之退出并使挂起请求失败"""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def predict(self, batch: torch.Tensor) -> np.ndarray:
+        """
+        提交一个批次并阻塞等待结果 (供 MicroBatcher 在线程池中调用)
+
+        异常：
+            ConnectionError - 发送失败 (连接已重置，下次调用时重连)
+            concurrent.futures.TimeoutError - 超过 timeout 未返回 (迟到的结果会被丢弃)
+        """
+        fut: Future = Future()
+        with self._lock:
+            if self._conn is None:
+                self._connect()
+            request_id = next(self._ids)
+            self._pending[request_id] = fut
+            try:
+                self._conn.send(("predict", request_id, batch.cpu().numpy()))
+            except (OSError, EOFError, ValueError) as e:
+                self._pending.pop(request_id, None)
+                self._reset_conn()
+                raise ConnectionError(f"向模型服务池发送批次失败: {e}") from e
+        try:
+            return fut.result(timeout=self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+
+_client: Optional[ModelPoolClient] = None
+
+
+def get_pool_client() -> ModelPoolClient:
+    """获取当前 API 进程的服务池客户端 (单例)"""
+    global _client
+    if _client is None:
+        _client = ModelPoolClient()
+    return _client
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ModelServingPool(
+        num_workers=settings.MODEL_POOL_WORKERS,
+        threads_per_worker=settings.MODEL_POOL_THREADS_PER_WORKER,
+    ).serve_forever()
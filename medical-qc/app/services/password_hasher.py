@@ -0,0 +1,119 @@
+# app/services/password_hasher.py
+# ----------------------------------------------------------------------------------
+# 密码哈希执行器 (Bounded Password Hasher)
+# 作用：pbkdf2 / bcrypt 哈希是刻意设计的慢计算 (数十毫秒以上)，在 async 接口中直接调用会阻塞事件循环，
+#       交接班时的集中登录会拖慢同一 worker 上的检测请求。本模块：
+#       1. 在独立的有界线程池中执行哈希与验证 (passlib 底层实现计算期间释放 GIL)，
+#          线程数与推理执行器分开配置，登录高峰不占用推理线程；
+#       2. 限制排队与执行中的任务数，超过上限时快速拒绝 (503)，不在队列中无限堆积；
+#       3. 验证时一并判断哈希是否需要按当前算法 / 成本重新生成 (verify_and_update)。
+# 对接模块：
+#   - 上游调用: app.services.auth_service (register_user, login_user)
+#   - 异常处理: app.api.v1.auth (捕获 ExecutorSaturatedError 返回 503)
+#   - 哈希配置: app.core.security.pwd_context
+#   - 配置项:   app.core.config.Settings (PASSWORD_HASH_*)
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.security import pwd_context
+from app.services.inference_executor import ExecutorSaturatedError
+from app.utils.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    有界密码哈希执行器
+
+    参数：
+        context:     passlib 哈希上下文
+        max_workers: 线程数
+        max_pending: 排队与执行中的任务上限，超过则立即拒绝
+    """
+
+    def __init__(self, context: CryptContext, name: str = "password_hash", max_workers: int = 2,
+                 max_pending: int = 64):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+        self._pending_gauge = Gauge(f"{name}_pending", "排队与执行中的密码哈希任务数")
+        self._rejected = Counter(f"{name}_rejected_total", "因哈希队列已满被拒绝的登录 / 注册请求数")
+        self._rehashed = Counter(f"{name}_rehashed_total", "登录时按新算法 / 成本重新哈希的次数")
+        self._seconds = Histogram(f"{name}_seconds", "单次密码哈希 / 验证耗时 (秒，含排队)")
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+            logger.info(f"✅ 密码哈希线程池已启动: workers={self.max_workers}, max_pending={self.max_pending}")
+        return self._pool
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected.inc()
+            raise ExecutorSaturatedError(f"密码哈希队列已满 (在途 {self._pending}/{self.max_pending})")
+        self._pending += 1
+        self._pending_gauge.inc()
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self._seconds.observe(time.perf_counter() - start)
+            self._pending -= 1
+            self._pending_gauge.dec()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        验证密码
+
+        返回：
+            (是否匹配, 新哈希)；存储的哈希使用过时的算法或成本时返回新哈希，否则为 None
+        """
+        if not hashed:
+            return False, None
+        ok, new_hash = await self._run(self._safe_verify_and_update, password, hashed)
+        if new_hash is not None:
+            self._rehashed.inc()
+        return ok, new_hash
+
+    def _safe_verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        try:
+            return self.context.verify_and_update(password, hashed)
+        except ValueError:
+            # 无法识别的哈希格式 (如占位值)：按密码不匹配处理
+            return False, None
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# 全局单例
+_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """获取全局密码哈希执行器 (单例，参数取自 Settings)"""
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher(
+            pwd_context,
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+        )
+    return _hasher
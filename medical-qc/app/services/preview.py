@@ -0,0 +1,124 @@
+# app/services/preview.py
+# ----------------------------------------------------------------------------------
+# 检测预览图 (Hemorrhage Preview Rendering)
+# 作用：按客户端选择的模式生成检测结果中的预览图：
+#       - png:  512x512 无损 PNG，Base64 内嵌 (默认，Hemorrhage.vue 使用)
+#       - jpeg / webp: 指定尺寸的有损缩略图，Base64 内嵌，体积远小于 PNG
+#       - url:  预览图异步写入 /static/hemorrhage/previews/，响应中只返回 URL
+#       - none: 不生成预览图 (PACS 集成等不展示图像的 API 客户端)
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai (build_detection_result / run_hemorrhage_detection_async)
+#   - 接口参数: app.api.v1.quality (preview / preview_size / preview_quality)
+#   - 静态资源: app.main (/static/hemorrhage 挂载 data/hemorrhage_uploads)
+# ----------------------------------------------------------------------------------
+
+import base64
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_MODES = ("png", "jpeg", "webp", "url", "none")
+
+# 预览图产物目录 (位于 /static/hemorrhage 挂载目录下)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+PREVIEW_DIR = os.path.join(PROJECT_ROOT, "data", "hemorrhage_uploads", "previews")
+PREVIEW_URL_PREFIX = "/static/hemorrhage/previews"
+
+# 缩略图尺寸范围 (分析图像为 512x512)
+MIN_PREVIEW_SIZE = 32
+MAX_PREVIEW_SIZE = 512
+
+
+@dataclass(frozen=True)
+class PreviewOptions:
+    """
+    预览图选项
+
+    参数：
+        mode:    png / jpeg / webp / url / none
+        size:    预览图最长边像素数 (png 模式固定为分析图像原尺寸)
+        quality: jpeg / webp 压缩质量 (1-100)
+    """
+    mode: str = "png"
+    size: int = MAX_PREVIEW_SIZE
+    quality: int = 80
+
+    def cache_tag(self) -> str:
+        """参与结果缓存键，不同预览选项的结果分别缓存"""
+        if self.mode in ("png", "none"):
+            return self.mode
+        if self.mode == "url":
+            return f"url:{self.size}"
+        return f"{self.mode}:{self.size}:{self.quality}"
+
+
+def parse_preview_options(mode: Optional[str] = None, size: Optional[int] = None,
+                          quality: Optional[int] = None) -> PreviewOptions:
+    """
+    校验并规范化接口参数
+
+    异常：
+        ValueError - 不支持的预览模式
+    """
+    mode = (mode or "png").lower()
+    if mode == "jpg":
+        mode = "jpeg"
+    if mode not in PREVIEW_MODES:
+        raise ValueError(f"不支持的预览模式: {mode} (可选: {', '.join(PREVIEW_MODES)})")
+    size = MAX_PREVIEW_SIZE if size is None else max(MIN_PREVIEW_SIZE, min(int(size), MAX_PREVIEW_SIZE))
+    quality = 80 if quality is None else max(1, min(int(quality), 100))
+    return PreviewOptions(mode=mode, size=size, quality=quality)
+
+
+def _thumbnail(image: Image.Image, size: int) -> Image.Image:
+    if max(image.size) <= size:
+        return image
+    thumb = image.copy()
+    thumb.thumbnail((size, size), Image.Resampling.BILINEAR)
+    return thumb
+
+
+def render_preview(image: Image.Image, options: PreviewOptions) -> Dict:
+    """
+    生成内嵌预览图字段
+
+    返回：
+        dict - png: {"image_base64"}；jpeg/webp: {"image_base64", "image_format", "preview_width", "preview_height"}；
+               url / none: {} (url 模式由调用方写入产物并填充 image_url)
+    """
+    if options.mode == "png":
+        buffered = BytesIO()
+        image.save(buffered, format="PNG")
+        return {"image_base64": base64.b64encode(buffered.getvalue()).decode('utf-8')}
+    if options.mode in ("jpeg", "webp"):
+        thumb = _thumbnail(image, options.size)
+        buffered = BytesIO()
+        thumb.save(buffered, format=options.mode.upper(), quality=options.quality)
+        return {
+            "image_base64": base64.b64encode(buffered.getvalue()).decode('utf-8'),
+            "image_format": options.mode,
+            "preview_width": thumb.width,
+            "preview_height": thumb.height,
+        }
+    return {}
+
+
+def new_preview_artifact() -> Tuple[str, str]:
+    """分配预览图产物的 (文件路径, 访问 URL)"""
+    filename = f"{uuid.uuid4().hex}.png"
+    return os.path.join(PREVIEW_DIR, filename), f"{PREVIEW_URL_PREFIX}/{filename}"
+
+
+def write_preview_artifact(image: Image.Image, path: str, size: int = MAX_PREVIEW_SIZE):
+    """写入预览图产物 (先写临时文件再原子替换，避免客户端读到不完整的图片)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    _thumbnail(image, size).save(tmp_path, format="PNG")
+    os.replace(tmp_path, path)
@@ -0,0 +1,264 @@
+# app/services/quantization.py
+# ----------------------------------------------------------------------------------
+# INT8 量化推理 (INT8 Quantized CPU Inference)
+# 作用：为 CPU 推理节点提供 Classifier 的 INT8 量化版本，降低单张切片推理延迟。
+#       1. 卷积主干 (features)：Conv-BN-ReLU 融合 + 静态训练后量化 (PTQ)，
+#          使用 data/head_ct 中的样本做校准 (Calibration)；
+#       2. 分类头 (classifier)：对 Linear 层做动态量化；
+#       3. 精度校验：在与校准集不重叠的验证集上对比 FP32 与 INT8 的 AUC，下降超过阈值则拒绝启用；
+#          验证集样本不足或缺少正 / 负样本时同样拒绝 (不在校准集上自证精度)。
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai.get_model (INFERENCE_PRECISION=int8 时)
+#   - 配置项:   app.core.config.Settings (INFERENCE_PRECISION / QUANT_*)
+# ----------------------------------------------------------------------------------
+
+import copy
+import csv
+import logging
+import os
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+from PIL import Image
+from torch.ao.quantization import DeQuantStub, QuantStub, fuse_modules, get_default_qconfig, prepare, convert, quantize_dynamic
+
+logger = logging.getLogger(__name__)
+
+# 数据集路径 (与 train_hemorrhage_optimized.py 保持一致)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+DATA_DIR = os.path.join(PROJECT_ROOT, "data", "head_ct")
+LABELS_FILE = os.path.join(PROJECT_ROOT, "data", "labels.csv")
+
+# 固定随机种子，保证校准集与验证集划分可复现
+SEED = 42
+
+
+class QuantizationRejectedError(Exception):
+    """量化模型未通过精度校验 (或无法校验)，不应启用"""
+
+
+class QuantizedClassifier(nn.Module):
+    """
+    可量化的 Classifier 包装
+
+    结构：
+        QuantStub -> features (INT8 静态量化) -> DeQuantStub -> classifier (Linear 动态量化)
+    """
+
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.quant = QuantStub()
+        self.features = model.features
+        self.dequant = DeQuantStub()
+        self.classifier = model.classifier
+
+    def forward(self, x):
+        x = self.quant(x)
+        x = self.features(x)
+        x = self.dequant(x)
+        return self.classifier(x)
+
+
+def _quantized_engine() -> str:
+    """选择当前平台可用的量化后端 (x86/fbgemm 优先，ARM 上回退 qnnpack)"""
+    supported = torch.backends.quantized.supported_engines
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in supported:
+            return engine
+    raise RuntimeError(f"当前 PyTorch 不支持 INT8 量化后端: {supported}")
+
+
+def _conv_bn_relu_groups(features: nn.Sequential) -> List[List[str]]:
+    """
+    在 features 中查找可融合的连续结构：Conv2d -> BatchNorm2d -> ReLU，
+    或 BN 已在加载期折叠后的 Conv2d -> ReLU (见 app.services.model_optimization)
+    """
+    groups = []
+    layers = list(features)
+    for i in range(len(layers) - 1):
+        if not isinstance(layers[i], nn.Conv2d):
+            continue
+        if (i + 2 < len(layers)
+                and isinstance(layers[i + 1], nn.BatchNorm2d)
+                and isinstance(layers[i + 2], nn.ReLU)):
+            groups.append([str(i), str(i + 1), str(i + 2)])
+        elif isinstance(layers[i + 1], nn.ReLU):
+            groups.append([str(i), str(i + 1)])
+    return groups
+
+
+# ----------------------------------------------------------------------------------
+# 数据集工具：读取 labels.csv 并划分校准集 / 验证集
+# ----------------------------------------------------------------------------------
+def load_labeled_samples() -> List[Tuple[str, int]]:
+    """读取 data/labels.csv (列: id, hemorrhage)，返回 [(图像路径, 标签)]"""
+    if not os.path.exists(LABELS_FILE):
+        return []
+    samples = []
+    with open(LABELS_FILE, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            row = {k.strip(): v for k, v in row.items()}
+            path = os.path.join(DATA_DIR, f"{int(row['id']):03d}.png")
+            if os.path.exists(path):
+                samples.append((path, int(row["hemorrhage"])))
+    return samples
+
+
+def split_samples(samples, calibration_size: int, min_validation: int = 1, min_per_class: int = 1):
+    """
+    固定种子打乱后切分：前 calibration_size 个用于校准，其余用于精度校验 (两者不重叠)
+
+    异常：
+        QuantizationRejectedError - 验证集少于 min_validation 个，或正 / 负样本少于 min_per_class 个
+    """
+    if calibration_size < 1:
+        raise QuantizationRejectedError(f"校准样本数必须大于 0 (当前 {calibration_size})")
+    shuffled = list(samples)
+    random.Random(SEED).shuffle(shuffled)
+    calibration = shuffled[:calibration_size]
+    validation = shuffled[calibration_size:]
+    if len(validation) < min_validation:
+        raise QuantizationRejectedError(
+            f"精度校验样本不足: 共 {len(samples)} 个样本，扣除 {len(calibration)} 个校准样本后剩余 "
+            f"{len(validation)} 个 (至少需要 {min_validation} 个)"
+        )
+    positives = sum(1 for _, label in validation if label == 1)
+    negatives = len(validation) - positives
+    if min(positives, negatives) < min_per_class:
+        raise QuantizationRejectedError(
+            f"精度校验集类别不足: 出血 {positives} 个，未出血 {negatives} 个 (每类至少需要 {min_per_class} 个)"
+        )
+    return calibration, validation
+
+
+def _load_batch(paths: List[str]) -> torch.Tensor:
+    # 延迟导入，复用线上服务完全一致的预处理流程
+    from app.services.hemorrhage_ai import preprocess_image
+
+    tensors = [preprocess_image(Image.open(p).convert("L"))[1] for p in paths]
+    return torch.cat(tensors, dim=0)
+
+
+def _predict(model: nn.Module, inputs: torch.Tensor, batch_size: int = 16) -> np.ndarray:
+    """返回出血类别 (index=1) 的概率"""
+    outputs = []
+    with torch.inference_mode():
+        for i in range(0, len(inputs), batch_size):
+            logits = model(inputs[i:i + batch_size])
+            outputs.append(torch.softmax(logits, dim=1)[:, 1].numpy())
+    return np.concatenate(outputs) if outputs else np.zeros(0)
+
+
+def roc_auc(labels: np.ndarray, scores: np.ndarray) -> float:
+    """
+    计算 ROC AUC (Mann-Whitney U 统计量，平局取平均秩)
+    不依赖 sklearn，避免为推理服务引入训练侧依赖。
+    """
+    labels = np.asarray(labels)
+    scores = np.asarray(scores, dtype=np.float64)
+    n_pos = int((labels == 1).sum())
+    n_neg = int((labels == 0).sum())
+    if n_pos == 0 or n_neg == 0:
+        raise ValueError("AUC 计算需要同时包含正负样本")
+    order = np.argsort(scores, kind="mergesort")
+    ranks = np.empty(len(scores), dtype=np.float64)
+    sorted_scores = scores[order]
+    i = 0
+    while i < len(scores):
+        j = i
+        while j + 1 < len(scores) and sorted_scores[j + 1] == sorted_scores[i]:
+            j += 1
+        ranks[order[i:j + 1]] = (i + j) / 2.0 + 1
+        i = j + 1
+    return float((ranks[labels == 1].sum() - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+
+# ----------------------------------------------------------------------------------
+# 核心函数：构建 INT8 量化模型
+# ----------------------------------------------------------------------------------
+def quantize_classifier(model: nn.Module, calibration_inputs: torch.Tensor) -> nn.Module:
+    """
+    构建 INT8 量化模型 (不修改传入的 FP32 模型)
+
+    Steps:
+    1. 深拷贝 FP32 模型并包装 QuantStub / DeQuantStub。
+    2. 融合 Conv-BN-ReLU，插入观察器 (Observer)。
+    3. 用校准数据跑一遍前向，统计激活值范围。
+    4. 转换为 INT8 卷积；分类头 Linear 层做动态量化。
+    """
+    engine = _quantized_engine()
+    torch.backends.quantized.engine = engine
+
+    wrapped = QuantizedClassifier(copy.deepcopy(model).cpu().eval())
+    fuse_modules(wrapped.features, _conv_bn_relu_groups(wrapped.features), inplace=True)
+
+    # 仅对卷积主干做静态量化，分类头单独做动态量化
+    wrapped.qconfig = get_default_qconfig(engine)
+    wrapped.classifier.qconfig = None
+    prepare(wrapped, inplace=True)
+
+    with torch.inference_mode():
+        for i in range(0, len(calibration_inputs), 16):
+            wrapped(calibration_inputs[i:i + 16])
+
+    convert(wrapped, inplace=True)
+    wrapped.classifier = quantize_dynamic(wrapped.classifier, {nn.Linear}, dtype=torch.qint8)
+    return wrapped.eval()
+
+
+def check_accuracy_parity(fp32_model: nn.Module, int8_model: nn.Module,
+                          validation: List[Tuple[str, int]], max_auc_drop: float) -> dict:
+    """
+    精度校验：对比验证集上 FP32 与 INT8 的 AUC
+
+    返回：
+        dict - fp32_auc / int8_auc / auc_drop / max_prob_diff
+    异常：
+        QuantizationRejectedError - AUC 下降超过 max_auc_drop
+    """
+    inputs = _load_batch([p for p, _ in validation])
+    labels = np.array([y for _, y in validation])
+
+    fp32_scores = _predict(fp32_model.cpu().eval(), inputs)
+    int8_scores = _predict(int8_model, inputs)
+
+    report = {
+        "samples": len(validation),
+        "fp32_auc": roc_auc(labels, fp32_scores),
+        "int8_auc": roc_auc(labels, int8_scores),
+        "max_prob_diff": float(np.abs(fp32_scores - int8_scores).max()),
+    }
+    report["auc_drop"] = report["fp32_auc"] - report["int8_auc"]
+    if report["auc_drop"] > max_auc_drop:
+        raise QuantizationRejectedError(
+            f"INT8 模型 AUC 下降 {report['auc_drop']:.4f} 超过阈值 {max_auc_drop} "
+            f"(FP32={report['fp32_auc']:.4f}, INT8={report['int8_auc']:.4f})"
+        )
+    return report
+
+
+def build_int8_model(fp32_model: nn.Module, calibration_samples: int, max_auc_drop: float,
+                     samples: Optional[List[Tuple[str, int]]] = None, min_validation: int = 1,
+                     min_per_class: int = 1) -> Tuple[nn.Module, dict]:
+    """
+    完整流程：划分数据 → 校准量化 → 精度校验
+
+    异常：
+        QuantizationRejectedError - 缺少校准/验证数据、验证集不足，或精度校验未通过
+    """
+    samples = load_labeled_samples() if samples is None else samples
+    if not samples:
+        raise QuantizationRejectedError(f"缺少校准与验证数据 (需要 {LABELS_FILE} 与 {DATA_DIR})")
+
+    calibration, validation = split_samples(samples, calibration_samples, min_validation, min_per_class)
+    int8_model = quantize_classifier(fp32_model, _load_batch([p for p, _ in calibration]))
+    report = check_accuracy_parity(fp32_model, int8_model, validation, max_auc_drop)
+    logger.info(
+        f"✅ INT8 量化校验通过: FP32 AUC={report['fp32_auc']:.4f}, INT8 AUC={report['int8_auc']:.4f}, "
+        f"最大概率差={report['max_prob_diff']:.4f} (验证样本 {report['samples']})"
+    )
+    return int8_model, report
@@ -0,0 +1,234 @@
+# app/services/record_writer.py
+# ----------------------------------------------------------------------------------
+# 检测记录异步批量写入 (Write-Behind Record Buffer)
+# 作用：持久化脑出血检测结果 (hemorrhage_records)，且不让每个检测请求承担
+#       同步 INSERT + COMMIT 的数据库往返：
+#       1. 接口只把记录放入内存缓冲区 (不等待数据库)；
+#       2. 后台协程在攒满 RECORD_FLUSH_BATCH_SIZE 条或距上次写入超过 RECORD_FLUSH_INTERVAL_MS 时，
+#          以一条多行 INSERT 批量写入并提交；
+#       3. 写入失败时记录放回缓冲区稍后重试；缓冲区超过上限时丢弃最旧的记录 (计入指标)；
+#       4. 服务正常关闭时排空缓冲区 (最长 RECORD_SHUTDOWN_DRAIN_SECONDS 秒)；
+#       5. 同一事务内增量更新质控日汇总 (qc_daily_stats)，供异常汇总接口读取；
+#          写入成功后通知监听者 (如使异常汇总缓存失效)。
+# 对接模块：
+#   - 上游调用: app.api.v1.quality (检测接口提交记录)
+#   - 生命周期: app.main (startup 启动 / shutdown 排空)
+#   - 日汇总:   app.services.stats_rollup
+#   - 配置项:   app.core.config.Settings (RECORD_*)
+#   - 指标导出: app.utils.metrics (积压条数、写入耗时、批大小)
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.hemorrhage_record import HemorrhageRecord
+from app.services.stats_rollup import apply_daily_rollup, describe_issue, initial_issue_status
+from app.utils.database import AsyncSessionLocal
+from app.utils.metrics import Counter, Gauge, Histogram, DEFAULT_LATENCY_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+# 批大小直方图分桶
+FLUSH_ROWS_BUCKETS = (1, 5, 10, 25, 50, 100, 200, 500, 1000)
+
+# 写入失败后的重试间隔 (秒)
+_RETRY_BACKOFF_SECONDS = 1.0
+
+# 批量写入函数：接收若干行 (列名 -> 值)，一次写入并提交
+WriteFunction = Callable[[List[Dict]], Awaitable[None]]
+
+# 写入成功监听者：接收刚提交的若干行
+FlushListener = Callable[[List[Dict]], None]
+
+
+async def insert_hemorrhage_records(rows: List[Dict]):
+    """一次多行 INSERT 写入 hemorrhage_records，并累加日汇总，单次提交 (失败时一并回滚)"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(HemorrhageRecord), rows)
+        await apply_daily_rollup(session, rows)
+        await session.commit()
+
+
+def build_hemorrhage_row(user_id: int, result: Dict, image_path: str,
+                         patient_name: Optional[str] = None, exam_id: Optional[str] = None) -> Dict:
+    """
+    将检测结果转换为 hemorrhage_records 的一行
+
+    说明：
+        created_at 取提交时刻 (而非批量写入时刻)，记录时间不受写入延迟影响。
+    """
+    return {
+        "user_id": user_id,
+        "patient_name": patient_name[:100] if patient_name else None,
+        "exam_id": exam_id[:100] if exam_id else None,
+        "image_path": image_path[:500],
+        "prediction": result["prediction"],
+        "confidence_level": result.get("confidence"),
+        "hemorrhage_probability": result["probability"]["hemorrhage"],
+        "no_hemorrhage_probability": result["probability"]["no_hemorrhage"],
+        "analysis_duration": result.get("duration_ms"),
+        "status": initial_issue_status(result["prediction"]),
+        "issue_description": describe_issue(result),
+        "created_at": datetime.now(),
+    }
+
+
+class RecordWriteBuffer:
+    """
+    写后缓冲 (Write-Behind) 批量写入器
+
+    参数：
+        write_fn:        批量写入函数 (默认写入 hemorrhage_records)
+        name:            指标名前缀 (如 "hemorrhage_records" -> hemorrhage_records_buffer_backlog)
+        batch_size:      单次写入的最大行数，缓冲区达到该数量时立即写入
+        flush_interval:  最长写入间隔 (秒)
+        max_backlog:     缓冲区上限，超过时丢弃最旧的记录
+    """
+
+    def __init__(self, write_fn: WriteFunction = insert_hemorrhage_records, name: str = "hemorrhage_records",
+                 batch_size: int = 200, flush_interval: float = 1.0, max_backlog: int = 10000):
+        self.write_fn = write_fn
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_backlog = max_backlog
+
+        self._buffer: Deque[Dict] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self._listeners: List[FlushListener] = []
+
+        self._backlog = Gauge(f"{name}_buffer_backlog", "等待写入数据库的记录数")
+        self._written = Counter(f"{name}_written_total", "已写入数据库的记录数")
+        self._dropped = Counter(f"{name}_dropped_total", "因缓冲区已满而丢弃的记录数")
+        self._failures = Counter(f"{name}_flush_failures_total", "批量写入失败次数 (记录会重试)")
+        self._flush_seconds = Histogram(f"{name}_flush_seconds", "单次批量写入 (INSERT + COMMIT) 耗时 (秒)",
+                                        DEFAULT_LATENCY_BUCKETS)
+        self._flush_rows = Histogram(f"{name}_flush_rows", "单次批量写入的行数", FLUSH_ROWS_BUCKETS)
+
+    # ------------------------------------------------------------------
+    # 生命周期管理
+    # ------------------------------------------------------------------
+    def start(self):
+        """在当前事件循环中启动后台写入协程"""
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """停止后台协程并排空缓冲区 (超时后剩余记录丢弃并记录日志)"""
+        deadline = time.monotonic() + drain_timeout
+        if self._worker is not None and not self._worker.done():
+            # 不直接取消：等待进行中的写入完成，避免已出队的记录在提交途中丢失
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._worker, timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.error("❌ 检测记录写入协程未能在排空时限内结束")
+        self._worker = None
+        self._stopping = False
+        while self._buffer and time.monotonic() < deadline:
+            if not await self.flush():
+                await asyncio.sleep(min(_RETRY_BACKOFF_SECONDS, max(0.0, deadline - time.monotonic())))
+        if self._buffer:
+            logger.error(f"❌ 关闭时仍有 {len(self._buffer)} 条检测记录未能写入数据库")
+
+    # ------------------------------------------------------------------
+    # 提交与写入
+    # ------------------------------------------------------------------
+    def add_flush_listener(self, listener: FlushListener):
+        """注册写入成功回调 (在事件循环中同步调用，应快速返回；异常只记录日志)"""
+        self._listeners.append(listener)
+
+    @property
+    def backlog(self) -> int:
+        return len(self._buffer)
+
+    def submit(self, row: Dict):
+        """放入缓冲区 (不等待数据库)；达到批大小时唤醒后台协程立即写入"""
+        self._buffer.append(row)
+        while len(self._buffer) > self.max_backlog:
+            self._buffer.popleft()
+            self._dropped.inc()
+        self._backlog.set(len(self._buffer))
+        if self._worker is None:
+            self.start()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """
+        写入一批记录
+
+        返回：
+            bool - 成功 (或缓冲区为空) 返回 True；失败时记录已放回缓冲区头部，返回 False
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._buffer:
+                return True
+            rows = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            started = time.perf_counter()
+            try:
+                await self.write_fn(rows)
+            except Exception as e:
+                logger.error(f"❌ 检测记录批量写入失败 ({len(rows)} 条，稍后重试): {e}")
+                self._failures.inc()
+                self._buffer.extendleft(reversed(rows))
+                while len(self._buffer) > self.max_backlog:
+                    self._buffer.pop()
+                    self._dropped.inc()
+                return False
+            finally:
+                self._backlog.set(len(self._buffer))
+            self._flush_seconds.observe(time.perf_counter() - started)
+            self._flush_rows.observe(len(rows))
+            self._written.inc(len(rows))
+            for listener in self._listeners:
+                try:
+                    listener(rows)
+                except Exception as e:
+                    logger.warning(f"⚠️ 检测记录写入监听者执行失败: {e}")
+            return True
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # 连续写入直到缓冲区不足一批 (积压时不等待下一个间隔)；关闭时由 stop() 接手排空
+            while self._buffer and not self._stopping:
+                if not await self.flush():
+                    await asyncio.sleep(_RETRY_BACKOFF_SECONDS)
+                    break
+                if len(self._buffer) < self.batch_size:
+                    break
+
+
+# 全局单例
+_record_buffer: Optional[RecordWriteBuffer] = None
+
+
+def get_record_buffer() -> RecordWriteBuffer:
+    """获取全局检测记录写入器 (单例，参数取自 Settings)"""
+    global _record_buffer
+    if _record_buffer is None:
+        _record_buffer = RecordWriteBuffer(
+            batch_size=settings.RECORD_FLUSH_BATCH_SIZE,
+            flush_interval=settings.RECORD_FLUSH_INTERVAL_MS / 1000.0,
+            max_backlog=settings.RECORD_BUFFER_MAX_BACKLOG,
+        )
+    return _record_buffer
@@ -0,0 +1,272 @@
+# app/services/result_cache.py
+# ----------------------------------------------------------------------------------
+# 检测结果缓存 (Content-Addressed Result Cache)
+# 作用：以 "上传内容哈希 + 模型版本 + 预处理配置" 为键缓存检测结果，
+#       同一切片被重复上传 (重新打开检查、刷新 Hemorrhage.vue 页面) 时直接返回结果，
+#       不再重复执行解码、推理与后处理。
+#       1. 内存层：LRU，按条目数淘汰；
+#       2. 磁盘层 (可选)：JSON 文件，按总大小 (最久未写入优先) 与 TTL 淘汰；
+#       3. 单飞 (Single-Flight)：相同键的并发请求只计算一次，其余请求等待同一结果；
+#          发起计算的请求被取消时，等待者重新发起计算，而不是收到取消异常。
+#       内存层可设置 TTL，并支持整体失效 (clear)，也用于缓存异常汇总等查询结果。
+# 对接模块：
+#   - 上游调用: app.api.v1.quality (脑出血检测接口), app.services.summary_service (异常汇总)
+#   - 缓存键:   app.services.hemorrhage_ai.detection_cache_key
+#   - 配置项:   app.core.config.Settings (HEMORRHAGE_CACHE_*)
+#   - 指标导出: app.utils.metrics (命中率、淘汰次数)
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.utils.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    两级结果缓存 + 单飞合并
+
+    参数：
+        name:              指标名前缀 (如 "hemorrhage" -> hemorrhage_cache_hits_total)
+        max_entries:       内存层最大条目数
+        disk_dir:          磁盘层目录，为空则不启用磁盘层
+        disk_max_bytes:    磁盘层总大小上限
+        disk_ttl_seconds:  磁盘层条目的有效期 (0 表示不过期)
+        ttl_seconds:       内存层条目的有效期 (0 表示不过期)
+    说明：
+        缓存值须可 JSON 序列化；每次返回深拷贝，调用方修改结果 (含嵌套字段) 不会污染缓存。
+    """
+
+    def __init__(self, name: str = "result", max_entries: int = 128, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 512 * 1024 * 1024, disk_ttl_seconds: float = 0, ttl_seconds: float = 0):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_ttl_seconds = disk_ttl_seconds
+
+        # 内存层：key -> (值, 写入时间)
+        self._memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # clear() 时递增；失效前开始的计算结果不再写入缓存
+        self._generation = 0
+        # 磁盘层索引：key -> (文件大小, 写入时间)，启动时从目录重建
+        self._disk_index: Dict[str, Tuple[int, float]] = {}
+        self._disk_bytes = 0
+        self._disk_lock = threading.RLock()  # 磁盘读写在线程池中并发执行，索引需加锁
+
+        self._hits = Counter(f"{name}_cache_hits_total", "内存层命中次数")
+        self._disk_hits = Counter(f"{name}_cache_disk_hits_total", "磁盘层命中次数")
+        self._misses = Counter(f"{name}_cache_misses_total", "未命中 (需重新计算) 次数")
+        self._coalesced = Counter(f"{name}_cache_coalesced_total", "合并到进行中计算的并发请求数")
+        self._evictions = Counter(f"{name}_cache_evictions_total", "内存层 LRU 淘汰次数")
+        self._disk_evictions = Counter(f"{name}_cache_disk_evictions_total", "磁盘层按大小/TTL 淘汰次数")
+        self._entries = Gauge(f"{name}_cache_entries", "内存层当前条目数")
+        self._hit_ratio = Gauge(f"{name}_cache_hit_ratio", "累计命中率 (内存 + 磁盘 + 合并)")
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        查询缓存，未命中时调用 compute() 计算并写入缓存
+
+        说明：
+            同一键已有计算在进行时，直接等待其结果 (计算失败时异常同样传递给所有等待者，且不缓存)。
+        """
+        value, _ = await self.lookup(key, compute)
+        return value
+
+    async def lookup(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        同 get_or_compute，同时返回结果是否来自缓存
+
+        返回：
+            (值, cached) - cached 为 True 表示命中内存层 / 磁盘层或合并到其他请求的计算，
+                           值中的耗时等字段反映的是原始计算
+        """
+        while True:
+            value = self._memory_get(key)
+            if value is not None:
+                self._hits.inc()
+                self._update_hit_ratio()
+                return copy.deepcopy(value), True
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self._coalesced.inc()
+            self._update_hit_ratio()
+            try:
+                return copy.deepcopy(await asyncio.shield(pending)), True
+            except asyncio.CancelledError:
+                # 发起计算的请求被取消 (而非本请求被取消)：重新查询，由本请求或其他等待者重新计算
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            value = await self._disk_get(key)
+            cached = value is not None
+            if cached:
+                self._disk_hits.inc()
+            else:
+                self._misses.inc()
+                value = await compute()
+                await self._disk_put(key, value)
+            self._update_hit_ratio()
+            if generation == self._generation:
+                self._memory_put(key, value)
+            future.set_result(value)
+            return copy.deepcopy(value), cached
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 标记异常已读取，无等待者时不产生告警
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def clear(self):
+        """
+        清空内存层 (磁盘层保留)
+
+        说明：
+            进行中的计算仍会返回给已在等待的请求，但结果不写入缓存；
+            之后的请求重新计算，不会合并到失效前开始的计算。
+        """
+        self._generation += 1
+        self._memory.clear()
+        self._inflight.clear()
+        self._entries.set(0)
+
+    # ------------------------------------------------------------------
+    # 内存层 (LRU)
+    # ------------------------------------------------------------------
+    def _memory_get(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds:
+            del self._memory[key]
+            self._entries.set(len(self._memory))
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (value, time.monotonic())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._evictions.inc()
+        self._entries.set(len(self._memory))
+
+    def _update_hit_ratio(self):
+        hits = self._hits.value + self._disk_hits.value + self._coalesced.value
+        total = hits + self._misses.value
+        if total:
+            self._hit_ratio.set(hits / total)
+
+    # ------------------------------------------------------------------
+    # 磁盘层 (JSON 文件，文件 I/O 在默认线程池中执行)
+    # ------------------------------------------------------------------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _load_disk_index(self):
+        for filename in os.listdir(self.disk_dir):
+            if not filename.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.disk_dir, filename))
+            self._disk_index[filename[:-5]] = (stat.st_size, stat.st_mtime)
+            self._disk_bytes += stat.st_size
+        self._evict_disk()
+
+    def _remove_disk_entry(self, key: str):
+        """删除磁盘条目，调用方需持有 _disk_lock"""
+        size, _ = self._disk_index.pop(key, (0, 0))
+        self._disk_bytes -= size
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+        self._disk_evictions.inc()
+
+    def _evict_disk(self):
+        """删除过期条目，再按写入时间从旧到新删除，直到总大小不超过上限 (调用方需持有 _disk_lock)"""
+        if self.disk_ttl_seconds > 0:
+            deadline = time.time() - self.disk_ttl_seconds
+            for key in [k for k, (_, mtime) in self._disk_index.items() if mtime < deadline]:
+                self._remove_disk_entry(key)
+        if self._disk_bytes > self.disk_max_bytes:
+            for key, _ in sorted(self._disk_index.items(), key=lambda item: item[1][1]):
+                if self._disk_bytes <= self.disk_max_bytes:
+                    break
+                self._remove_disk_entry(key)
+
+    def _disk_read(self, key: str) -> Optional[Dict]:
+        with self._disk_lock:
+            entry = self._disk_index.get(key)
+            if entry is None:
+                return None
+            if self.disk_ttl_seconds > 0 and entry[1] < time.time() - self.disk_ttl_seconds:
+                self._remove_disk_entry(key)
+                return None
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ 读取磁盘缓存失败 ({key}): {e}")
+                self._remove_disk_entry(key)
+                return None
+
+    def _disk_write(self, key: str, value: Any):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        with self._disk_lock:
+            os.replace(tmp_path, path)  # 原子替换，避免读到写了一半的文件
+            size = os.path.getsize(path)
+            old_size, _ = self._disk_index.get(key, (0, 0))
+            self._disk_index[key] = (size, time.time())
+            self._disk_bytes += size - old_size
+            self._evict_disk()
+
+    async def _disk_get(self, key: str) -> Optional[Dict]:
+        if not self.disk_dir or key not in self._disk_index:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, self._disk_read, key)
+
+    async def _disk_put(self, key: str, value: Dict):
+        if not self.disk_dir:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._disk_write, key, value)
+        except (OSError, TypeError, ValueError) as e:
+            # 磁盘层写入失败不影响本次结果返回
+            logger.warning(f"⚠️ 写入磁盘缓存失败 ({key}): {e}")
@@ -0,0 +1,144 @@
+# app/services/slice_analysis.py
+# ----------------------------------------------------------------------------------
+# 切片分析内核 (Fused Slice Analysis Kernel)
+# 作用：一次性计算脑出血检测后处理所需的全部统计量，替代逐项的整图遍历：
+#       1. 启发式出血检测：ROI (去除 15% 边缘) 内 >50 像素的均值/标准差、动态阈值、
+#          高亮像素计数以及 BBox；
+#       2. 中线对称性评分：左半与翻转后的右半逐像素差的均值；
+#       3. 脑室 ROI 平均灰度。
+# 实现要点：
+#   - 全部基于切片视图 (View) 操作，不复制 ROI / 左右半脑；
+#   - 平方和、阈值化使用 256 项查找表 (LUT)，像素级临时数组仅为 uint16 / bool；
+#   - 中线差值使用 int16 (替代 int64)，BBox 通过行/列投影求得 (替代 np.argwhere)；
+#   - 支持 [N, H, W] 堆叠切片批量计算，统计量按切片一次归约得到。
+# 对接模块：
+#   - 上游调用: app.services.hemorrhage_ai.build_detection_result
+#   - 基准测试: scripts/benchmark_slice_analysis.py
+# ----------------------------------------------------------------------------------
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 启发式检测参数 (与原 build_detection_result 中的规则保持一致)
+ROI_MARGIN_RATIO = 0.15       # 去除头骨的边缘比例
+VALID_PIXEL_MIN = 50          # 排除背景的灰度下限
+THRESHOLD_RANGE = (110, 230)  # 动态阈值的取值范围
+ARTIFACT_PIXEL_MIN = 250      # 高于该值视为骨骼/金属伪影
+VENTRICLE_BOX_RATIO = 0.12    # 脑室 ROI 半宽占图像短边的比例
+
+_LEVELS = np.arange(256, dtype=np.uint32)
+# 灰度 > VALID_PIXEL_MIN 时取其平方，否则为 0 (最大 255² = 65025，可用 uint16 表示)
+_VALID_SQUARE_LUT = np.where(_LEVELS > VALID_PIXEL_MIN, _LEVELS ** 2, 0).astype(np.uint16)
+
+
+@dataclass
+class SliceAnalysis:
+    """单张切片的分析统计量"""
+    valid_count: int                 # ROI 内灰度 > 50 的像素数
+    valid_mean: float
+    valid_std: float
+    threshold: Optional[float]       # 动态阈值 (无有效像素时为 None)
+    hot_count: int                   # 超过阈值且非伪影的高亮像素数
+    hot_extent: Optional[Tuple[int, int, int, int]]  # 高亮像素外接范围 (x0, y0, x1, y1)，闭区间
+    symmetry_score: Optional[float]  # 中线对称性差异 (无法计算时为 None)
+    ventricle_mean: Optional[float]
+
+
+def _projection_extent(mask: np.ndarray) -> Tuple[int, int, int, int]:
+    """通过行/列投影求二值图中 True 像素的外接范围 (x0, y0, x1, y1)"""
+    rows = mask.any(axis=1)
+    cols = mask.any(axis=0)
+    y0 = int(rows.argmax())
+    y1 = len(rows) - 1 - int(rows[::-1].argmax())
+    x0 = int(cols.argmax())
+    x1 = len(cols) - 1 - int(cols[::-1].argmax())
+    return x0, y0, x1, y1
+
+
+def analyze_slices(slices: np.ndarray) -> List[SliceAnalysis]:
+    """
+    批量分析切片
+
+    参数：
+        slices - uint8 灰度图，形状 [H, W] 或 [N, H, W]
+    返回：
+        List[SliceAnalysis] - 与输入切片一一对应
+    """
+    slices = np.asarray(slices)
+    if slices.ndim == 2:
+        slices = slices[np.newaxis]
+    if slices.dtype != np.uint8:
+        slices = slices.astype(np.uint8)
+    n, h, w = slices.shape
+
+    # ---------------------------
+    # A. 启发式检测统计量：ROI 视图上做一次比较 + 一次查表
+    # ---------------------------
+    m_x, m_y = int(w * ROI_MARGIN_RATIO), int(h * ROI_MARGIN_RATIO)
+    roi = slices[:, m_y:h - m_y, m_x:w - m_x]
+    valid = roi > VALID_PIXEL_MIN
+    valid_count = np.count_nonzero(valid, axis=(1, 2))
+    valid_sum = np.sum(roi, axis=(1, 2), where=valid, dtype=np.int64)
+    valid_sq_sum = np.sum(_VALID_SQUARE_LUT[roi], axis=(1, 2), dtype=np.int64)
+
+    # ---------------------------
+    # B. 中线对称性：左半与翻转右半的差值，仅统计中心行 (int16 足以容纳 uint8 之差)
+    # ---------------------------
+    mid_x = w // 2
+    min_w = min(mid_x, w - mid_x)
+    symmetry = None
+    if min_w > 0 and h - 2 * m_y > 0:
+        left = slices[:, m_y:h - m_y, :min_w]
+        right_flipped = slices[:, m_y:h - m_y, mid_x:mid_x + min_w][:, :, ::-1]
+        diff = np.subtract(left, right_flipped, dtype=np.int16)
+        np.abs(diff, out=diff)
+        symmetry = diff.sum(axis=(1, 2), dtype=np.int64) / float(diff[0].size)
+
+    # ---------------------------
+    # C. 脑室 ROI 均值 (视图上直接归约)
+    # ---------------------------
+    cx, cy = w // 2, h // 2
+    box_v = int(min(w, h) * VENTRICLE_BOX_RATIO)
+    ventricle = slices[:, max(cy - box_v, 0):cy + box_v, max(cx - box_v, 0):cx + box_v]
+    ventricle_mean = None
+    if ventricle[0].size > 0:
+        ventricle_mean = ventricle.sum(axis=(1, 2), dtype=np.int64) / float(ventricle[0].size)
+
+    results = []
+    for i in range(n):
+        count = int(valid_count[i])
+        mean = std = 0.0
+        threshold = None
+        hot_count = 0
+        extent = None
+        if count > 0:
+            mean = float(valid_sum[i]) / count
+            std = float(np.sqrt(max(float(valid_sq_sum[i]) / count - mean * mean, 0.0)))
+            threshold = max(THRESHOLD_RANGE[0], min(mean + 2.0 * std, THRESHOLD_RANGE[1]))
+
+            # 像素为整数：x > threshold 等价于 x > floor(threshold)，用查表一次得到二值图
+            hot_lut = (_LEVELS > int(np.floor(threshold))) & (_LEVELS <= ARTIFACT_PIXEL_MIN)
+            hot = hot_lut[roi[i]]
+            hot_count = int(np.count_nonzero(hot))
+            if hot_count > 0:
+                x0, y0, x1, y1 = _projection_extent(hot)
+                extent = (x0 + m_x, y0 + m_y, x1 + m_x, y1 + m_y)
+
+        results.append(SliceAnalysis(
+            valid_count=count,
+            valid_mean=mean,
+            valid_std=std,
+            threshold=threshold,
+            hot_count=hot_count,
+            hot_extent=extent,
+            symmetry_score=None if symmetry is None else float(symmetry[i]),
+            ventricle_mean=None if ventricle_mean is None else float(ventricle_mean[i]),
+        ))
+    return results
+
+
+def analyze_slice(image: np.ndarray) -> SliceAnalysis:
+    """分析单张切片 ([H, W] uint8)"""
+    return analyze_slices(image)[0]
@@ -0,0 +1,236 @@
+# app/services/stats_rollup.py
+# ----------------------------------------------------------------------------------
+# 质控日汇总维护 (Daily Stats Rollup)
+# 作用：维护 qc_daily_stats 预聚合表，使异常汇总接口不必对 hemorrhage_records 做全表 COUNT / GROUP BY：
+#       1. 增量更新：检测记录批量写入时，在同一事务内按维度聚合本批记录，
+#          以一条多行 INSERT ... ON DUPLICATE KEY UPDATE record_count = record_count + N 累加；
+#          记录与汇总同时提交或同时回滚 (写入失败重试时不会重复计数)；
+#       2. 状态变更：处理状态是汇总维度之一，修改异常记录的状态必须经 change_issue_status，
+#          在同一事务内把计数从旧状态移到新状态；直接 UPDATE 明细表的 status 会使汇总偏离明细，
+#          需执行回填重建修正；
+#       3. 回填重建：按日期范围删除汇总行，再以一条 INSERT ... SELECT ... GROUP BY 从明细表重新计算
+#          (首次上线、修复历史数据或手工修改状态后执行 scripts/backfill_daily_stats.py)。
+#       累加语句按数据库方言构造：MySQL 使用 ON DUPLICATE KEY UPDATE，
+#       SQLite / PostgreSQL (测试与本地开发) 使用 ON CONFLICT DO UPDATE，其他方言直接报错。
+# 对接模块：
+#   - 上游调用: app.services.record_writer (批量写入时增量更新)
+#   - 回填脚本: scripts/backfill_daily_stats.py
+#   - 数据模型: app.models.qc_daily_stat.QCDailyStat, app.models.hemorrhage_record.HemorrhageRecord
+# ----------------------------------------------------------------------------------
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, literal, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.hemorrhage_record import HemorrhageRecord
+from app.models.qc_daily_stat import QCDailyStat
+from app.models.user import User
+
+# 检查类型 (目前仅脑出血检测的记录落库)
+EXAM_TYPE_HEMORRHAGE = "脑出血检测"
+
+# 检测结论 -> 异常类型 (未列出的结论不计为异常)
+ISSUE_TYPE_BY_PREDICTION = {"出血": "脑出血"}
+
+# 异常处理状态
+ISSUE_PENDING = "待处理"
+ISSUE_IN_PROGRESS = "处理中"
+ISSUE_RESOLVED = "已解决"
+ISSUE_IGNORED = "忽略"
+ISSUE_STATUSES = (ISSUE_PENDING, ISSUE_IN_PROGRESS, ISSUE_RESOLVED, ISSUE_IGNORED)
+
+# 汇总维度 (与 qc_daily_stats 唯一键一致)
+ROLLUP_KEYS = ("stat_date", "exam_type", "hospital", "department", "issue_type", "status")
+
+RollupKey = Tuple[date, str, str, str, str, str]
+
+
+def initial_issue_status(prediction: str) -> Optional[str]:
+    """新检测记录的处理状态：检出异常为 "待处理"，否则为空"""
+    return ISSUE_PENDING if prediction in ISSUE_TYPE_BY_PREDICTION else None
+
+
+def describe_issue(result: Dict) -> Optional[str]:
+    """由检测结果生成异常描述 (如 "脑出血、中线偏移")；未检出异常时为空"""
+    issue_type = ISSUE_TYPE_BY_PREDICTION.get(result["prediction"])
+    if issue_type is None:
+        return None
+    findings = [issue_type]
+    if result.get("midline_shift"):
+        findings.append("中线偏移")
+    if result.get("ventricle_issue"):
+        findings.append("脑室异常")
+    return "、".join(findings)
+
+
+def aggregate_rows(rows: Iterable[Dict], user_dims: Dict[int, Tuple[Optional[str], Optional[str]]]) -> Counter:
+    """
+    按汇总维度统计一批检测记录
+
+    参数：
+        rows      - hemorrhage_records 行 (见 record_writer.build_hemorrhage_row)
+        user_dims - 用户 ID -> (医院, 科室)
+    返回：
+        Counter[(日期, 检查类型, 医院, 科室, 异常类型, 状态)] -> 记录数
+    """
+    counts: Counter = Counter()
+    for row in rows:
+        hospital, department = user_dims.get(row["user_id"], (None, None))
+        created_at = row.get("created_at") or datetime.now()
+        counts[(
+            created_at.date(),
+            EXAM_TYPE_HEMORRHAGE,
+            hospital or "",
+            department or "",
+            ISSUE_TYPE_BY_PREDICTION.get(row["prediction"], ""),
+            row.get("status") or "",
+        )] += 1
+    return counts
+
+
+def build_rollup_upsert(counts: Counter, dialect: str = "mysql"):
+    """
+    构造多行累加语句 (按维度排序，降低并发写入时的死锁概率)
+
+    参数：
+        dialect - 数据库方言名 (mysql 使用 ON DUPLICATE KEY UPDATE，sqlite / postgresql 使用 ON CONFLICT DO UPDATE)
+    异常：
+        ValueError - 不支持的方言
+    """
+    values = [
+        {**dict(zip(ROLLUP_KEYS, key)), "record_count": count}
+        for key, count in sorted(counts.items())
+    ]
+    if dialect == "mysql":
+        stmt = mysql_insert(QCDailyStat).values(values)
+        return stmt.on_duplicate_key_update(
+            record_count=QCDailyStat.record_count + stmt.inserted.record_count,
+            updated_at=func.now(),
+        )
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(QCDailyStat).values(values)
+        return stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEYS),
+            set_={"record_count": QCDailyStat.record_count + stmt.excluded.record_count, "updated_at": func.now()},
+        )
+    raise ValueError(f"日汇总累加不支持该数据库方言: {dialect}")
+
+
+def _dialect_name(session: AsyncSession) -> str:
+    return (session.bind or session.get_bind()).dialect.name
+
+
+async def _user_dims(session: AsyncSession, user_ids) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+    result = await session.execute(
+        select(User.id, User.hospital, User.department).where(User.id.in_(set(user_ids)))
+    )
+    return {user_id: (hospital, department) for user_id, hospital, department in result.all()}
+
+
+async def apply_daily_rollup(session: AsyncSession, rows: List[Dict]):
+    """
+    将一批新写入的检测记录累加到日汇总 (在调用方的事务内执行，由调用方提交)
+
+    说明：
+        医院 / 科室取写入时用户所属的医院 / 科室；用户之后调岗不会改变历史汇总。
+    """
+    if not rows:
+        return
+    user_dims = await _user_dims(session, (row["user_id"] for row in rows))
+    await session.execute(build_rollup_upsert(aggregate_rows(rows, user_dims), _dialect_name(session)))
+
+
+async def change_issue_status(session: AsyncSession, record_ids: Iterable[int], status: str) -> int:
+    """
+    修改异常记录的处理状态，并在同一事务内把日汇总计数从旧状态移到新状态 (由调用方提交)
+
+    说明：
+        只处理检出异常且状态确有变化的记录；医院 / 科室取用户当前所属 (与回填重建一致)。
+    返回：
+        实际变更的记录数
+    异常：
+        ValueError - 状态不在 ISSUE_STATUSES 中
+    """
+    if status not in ISSUE_STATUSES:
+        raise ValueError(f"无效的处理状态: {status}")
+    result = await session.execute(
+        select(HemorrhageRecord.id, HemorrhageRecord.user_id, HemorrhageRecord.created_at,
+               HemorrhageRecord.prediction, HemorrhageRecord.status)
+        .where(HemorrhageRecord.id.in_(list(record_ids)),
+               HemorrhageRecord.prediction.in_(list(ISSUE_TYPE_BY_PREDICTION)),
+               or_(HemorrhageRecord.status.is_(None), HemorrhageRecord.status != status))
+        .with_for_update()
+    )
+    old_rows = [dict(row) for row in result.mappings().all()]
+    if not old_rows:
+        return 0
+
+    await session.execute(
+        update(HemorrhageRecord)
+        .where(HemorrhageRecord.id.in_([row["id"] for row in old_rows]))
+        .values(status=status)
+    )
+
+    user_dims = await _user_dims(session, (row["user_id"] for row in old_rows))
+    removed = aggregate_rows(old_rows, user_dims)
+    added = aggregate_rows([{**row, "status": status} for row in old_rows], user_dims)
+    for key, count in sorted(removed.items()):
+        await session.execute(
+            update(QCDailyStat)
+            .where(*(getattr(QCDailyStat, column) == value for column, value in zip(ROLLUP_KEYS, key)))
+            .values(record_count=QCDailyStat.record_count - count, updated_at=func.now())
+        )
+    await session.execute(build_rollup_upsert(added, _dialect_name(session)))
+    return len(old_rows)
+
+
+async def backfill_issue_status(session: AsyncSession) -> int:
+    """为新增 status / issue_description 列之前写入的异常记录补全处理状态 (待处理) 与异常描述，返回更新行数"""
+    result = await session.execute(
+        update(HemorrhageRecord)
+        .where(HemorrhageRecord.status.is_(None),
+               HemorrhageRecord.prediction.in_(list(ISSUE_TYPE_BY_PREDICTION)))
+        .values(
+            status=ISSUE_PENDING,
+            issue_description=func.coalesce(
+                HemorrhageRecord.issue_description,
+                case(ISSUE_TYPE_BY_PREDICTION, value=HemorrhageRecord.prediction),
+            ),
+        )
+    )
+    return result.rowcount
+
+
+async def rebuild_daily_stats(session: AsyncSession, date_from: Optional[date] = None):
+    """
+    从明细表重建日汇总 (date_from 为空时全量重建；在调用方的事务内执行)
+
+    说明：
+        删除与重算在同一事务中完成。重建期间写入的记录会等待该事务提交，
+        建议在低峰期执行。
+    """
+    stat_date = func.date(HemorrhageRecord.created_at)
+    issue_type = case(ISSUE_TYPE_BY_PREDICTION, value=HemorrhageRecord.prediction, else_="")
+    hospital = func.coalesce(User.hospital, "")
+    department = func.coalesce(User.department, "")
+    status = func.coalesce(HemorrhageRecord.status, "")
+
+    source = (
+        select(stat_date, literal(EXAM_TYPE_HEMORRHAGE), hospital, department, issue_type, status, func.count())
+        .select_from(HemorrhageRecord)
+        .join(User, User.id == HemorrhageRecord.user_id)
+        .group_by(stat_date, hospital, department, issue_type, status)
+    )
+    purge = delete(QCDailyStat)
+    if date_from is not None:
+        source = source.where(HemorrhageRecord.created_at >= datetime.combine(date_from, datetime.min.time()))
+        purge = purge.where(QCDailyStat.stat_date >= date_from)
+
+    await session.execute(purge)
+    await session.execute(insert(QCDailyStat).from_select([*ROLLUP_KEYS, "record_count"], source))
@@ -0,0 +1,140 @@
+# app/services/summary_service.py
+# ----------------------------------------------------------------------------------
+# 异常汇总查询服务 (Summary Service)
+# 作用：为异常汇总页面计算统计指标。所有查询只读取日汇总表 qc_daily_stats
+#       (每天每个维度组合一行)，扫描行数与 hemorrhage_records 的记录总数无关；
+#       每个接口每次请求只执行一条分组查询。
+#       查询结果缓存在进程内 (看板被各工作站轮询)：本进程写入新记录时整体失效，
+#       其他 worker 写入的记录由 TTL (SUMMARY_CACHE_TTL_SECONDS) 兜底。
+# 对接模块：
+#   - 上游调用: app.api.v1.summary
+#   - 数据维护: app.services.stats_rollup (增量更新 / 回填)
+#   - 缓存失效: app.services.record_writer (写入成功监听，见 app.main)
+# ----------------------------------------------------------------------------------
+
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.qc_daily_stat import QCDailyStat
+from app.services.result_cache import ResultCache
+from app.services.stats_rollup import ISSUE_IGNORED, ISSUE_IN_PROGRESS, ISSUE_PENDING, ISSUE_RESOLVED
+
+# 已结束的处理状态 (计入解决率 / 每日解决数)
+CLOSED_STATUSES = (ISSUE_RESOLVED, ISSUE_IGNORED)
+
+_summary_cache: Optional[ResultCache] = None
+
+
+def get_summary_cache() -> ResultCache:
+    """获取异常汇总缓存 (单例，参数取自 Settings)"""
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = ResultCache(
+            name="summary",
+            max_entries=settings.SUMMARY_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.SUMMARY_CACHE_TTL_SECONDS,
+        )
+    return _summary_cache
+
+
+async def cached_summary(endpoint: str, params: Dict[str, Any], compute: Callable[[], Awaitable[Any]]) -> Any:
+    """按 "接口 + 查询参数" 缓存查询结果 (并发的相同请求只查询一次)"""
+    key = endpoint + "?" + "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return await get_summary_cache().get_or_compute(key, compute)
+
+
+def invalidate_summary_cache(rows: Optional[List[Dict]] = None):
+    """新检测记录提交后使全部汇总缓存失效 (作为 RecordWriteBuffer 的写入监听者)"""
+    get_summary_cache().clear()
+
+
+def _scope(stmt, hospital: Optional[str], department: Optional[str]):
+    """按医院 / 科室过滤 (为空时统计全部)"""
+    if hospital:
+        stmt = stmt.where(QCDailyStat.hospital == hospital)
+    if department:
+        stmt = stmt.where(QCDailyStat.department == department)
+    return stmt
+
+
+async def fetch_summary_stats(db: AsyncSession, today: date, hospital: Optional[str] = None,
+                              department: Optional[str] = None) -> Dict:
+    """
+    计算看板顶部的关键指标 (一条按状态分组的查询)
+
+    返回：
+        SummaryStats 结构 (totalIssues, todayIssues, pendingIssues, resolutionRate, avgResolutionTime)
+    """
+    stmt = _scope(
+        select(
+            QCDailyStat.status,
+            func.sum(QCDailyStat.record_count),
+            func.sum(case((QCDailyStat.stat_date == today, QCDailyStat.record_count), else_=0)),
+        )
+        .where(QCDailyStat.issue_type != "")
+        .group_by(QCDailyStat.status),
+        hospital, department,
+    )
+    by_status = {status: (int(total or 0), int(today_count or 0))
+                 for status, total, today_count in (await db.execute(stmt)).all()}
+
+    total = sum(counts[0] for counts in by_status.values())
+    closed = sum(by_status.get(status, (0, 0))[0] for status in CLOSED_STATUSES)
+    return {
+        "totalIssues": total,
+        "todayIssues": sum(counts[1] for counts in by_status.values()),
+        "pendingIssues": sum(by_status.get(status, (0, 0))[0] for status in (ISSUE_PENDING, ISSUE_IN_PROGRESS)),
+        "resolutionRate": round(closed * 100.0 / total, 1) if total else 0.0,
+        # 异常记录没有处理完成时间，无法计算平均处理时长；返回空值而非 0 (前端显示 "—")
+        "avgResolutionTime": None,
+    }
+
+
+async def fetch_issue_trend(db: AsyncSession, today: date, days: int, hospital: Optional[str] = None,
+                            department: Optional[str] = None) -> Dict:
+    """
+    统计最近 days 天 (含今天) 每天的异常数与已解决数 (一条按日期分组的查询，无记录的日期补 0)
+
+    说明：
+        已解决数按异常的检出日期统计 (目前未记录处理完成时间)。
+    """
+    start = today - timedelta(days=days - 1)
+    stmt = _scope(
+        select(
+            QCDailyStat.stat_date,
+            func.sum(QCDailyStat.record_count),
+            func.sum(case((QCDailyStat.status.in_(CLOSED_STATUSES), QCDailyStat.record_count), else_=0)),
+        )
+        .where(QCDailyStat.issue_type != "", QCDailyStat.stat_date >= start, QCDailyStat.stat_date <= today)
+        .group_by(QCDailyStat.stat_date),
+        hospital, department,
+    )
+    by_date = {str(stat_date)[:10]: (int(count or 0), int(solved or 0))
+               for stat_date, count, solved in (await db.execute(stmt)).all()}
+
+    dates, counts, solved = [], [], []
+    for offset in range(days):
+        d = start + timedelta(days=offset)
+        count, solved_count = by_date.get(d.isoformat(), (0, 0))
+        dates.append(f"{d.month}/{d.day}")
+        counts.append(count)
+        solved.append(solved_count)
+    return {"dates": dates, "counts": counts, "solved": solved}
+
+
+async def fetch_issue_distribution(db: AsyncSession, hospital: Optional[str] = None,
+                                   department: Optional[str] = None) -> List[Dict]:
+    """统计各异常类型的累计数量 (一条按异常类型分组的查询，按数量降序)"""
+    total = func.sum(QCDailyStat.record_count)
+    stmt = _scope(
+        select(QCDailyStat.issue_type, total)
+        .where(QCDailyStat.issue_type != "")
+        .group_by(QCDailyStat.issue_type)
+        .order_by(total.desc()),
+        hospital, department,
+    )
+    return [{"value": int(value or 0), "name": issue_type} for issue_type, value in (await db.execute(stmt)).all()]
@@ -0,0 +1,192 @@
+# app/services/token_cache.py
+# ----------------------------------------------------------------------------------
+# 访问令牌缓存 (Access Token -> User Cache)
+# 作用：受保护接口每次请求都要按 access_token 查询用户，推理请求在开始工作前先承担一次数据库往返。
+#       本模块在进程内缓存 "令牌 -> 用户"：
+#       1. LRU + TTL：条目数有上限，过期后重新查询数据库 (多 worker 部署时其他进程的变更最迟 TTL 秒后生效)；
+#       2. 显式失效：通过 ORM 修改用户的 access_token (轮换)、token_version (吊销 JWT) 或 is_active (禁用) 时，
+#          事务提交后立即清除该用户的全部缓存令牌与 JWT 吊销检查结果；
+#          批量 UPDATE 语句绕过 ORM 事件，需调用 invalidate_user；
+#       3. 只缓存有效令牌 (无效令牌不占用缓存，避免被随机令牌刷满)；
+#       4. 命中率等指标经 /metrics 导出。
+#       AUTH_MODE=jwt 时 JWT 格式的令牌改由 app.services.jwt_auth 在进程内校验，不经过本缓存。
+# 对接模块：
+#   - 上游调用: app.api.deps.get_current_user, app.api.v1.quality.get_current_user
+#   - 配置项:   app.core.config.Settings (TOKEN_CACHE_*)
+#   - 指标导出: app.utils.metrics
+# ----------------------------------------------------------------------------------
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.jwt_auth import get_revocation_checker, get_user_from_jwt
+from app.utils.jwt_utils import looks_like_jwt
+from app.utils.metrics import Counter, Gauge
+
+# session.info 中待失效的用户 ID (事务提交后处理)
+_PENDING_KEY = "token_cache_invalidate_user_ids"
+
+
+class TokenCache:
+    """
+    令牌 -> 用户 LRU + TTL 缓存
+
+    参数：
+        name:        指标名前缀 (如 "token" -> token_cache_hits_total)
+        max_entries: 最大条目数 (0 表示禁用缓存)
+        ttl_seconds: 条目有效期
+    说明：
+        缓存的 User 实例已脱离会话 (expunge)，只可读取列属性，不能访问延迟加载的关联对象。
+    """
+
+    def __init__(self, name: str = "token", max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # token -> (用户, 写入时间)
+        self._entries: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()
+        # 用户 ID -> 该用户的缓存令牌 (按用户失效)
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+
+        self._hits = Counter(f"{name}_cache_hits_total", "令牌缓存命中次数")
+        self._misses = Counter(f"{name}_cache_misses_total", "令牌缓存未命中 (查询数据库) 次数")
+        self._evictions = Counter(f"{name}_cache_evictions_total", "令牌缓存 LRU 淘汰次数")
+        self._invalidations = Counter(f"{name}_cache_invalidations_total", "令牌缓存显式失效的条目数")
+        self._size = Gauge(f"{name}_cache_entries", "令牌缓存当前条目数")
+        self._hit_ratio = Gauge(f"{name}_cache_hit_ratio", "令牌缓存累计命中率")
+
+    def get(self, token: str) -> Optional[User]:
+        entry = self._entries.get(token)
+        if entry is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+            self._remove(token)
+            entry = None
+        if entry is None:
+            self._misses.inc()
+            self._update_hit_ratio()
+            return None
+        self._entries.move_to_end(token)
+        self._hits.inc()
+        self._update_hit_ratio()
+        return entry[0]
+
+    def put(self, token: str, user: User):
+        if self.max_entries <= 0:
+            return
+        self._remove(token)
+        self._entries[token] = (user, time.monotonic())
+        self._tokens_by_user.setdefault(user.id, set()).add(token)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self._evictions.inc()
+        self._size.set(len(self._entries))
+
+    def invalidate_token(self, token: str):
+        if self._remove(token):
+            self._invalidations.inc()
+
+    def invalidate_user(self, user_id: int):
+        """清除某用户的全部缓存令牌 (轮换令牌、禁用账号后调用)"""
+        for token in list(self._tokens_by_user.get(user_id, ())):
+            self.invalidate_token(token)
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+        self._size.set(0)
+
+    def _remove(self, token: str) -> bool:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return False
+        user_id = entry[0].id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+        self._size.set(len(self._entries))
+        return True
+
+    def _update_hit_ratio(self):
+        total = self._hits.value + self._misses.value
+        if total:
+            self._hit_ratio.set(self._hits.value / total)
+
+
+# 全局单例
+_token_cache: Optional[TokenCache] = None
+
+
+def get_token_cache() -> TokenCache:
+    """获取全局令牌缓存 (单例，参数取自 Settings)"""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache(
+            max_entries=settings.TOKEN_CACHE_MAX_ENTRIES if settings.TOKEN_CACHE_ENABLED else 0,
+            ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+        )
+    return _token_cache
+
+
+async def get_user_by_token(db: AsyncSession, token: str) -> Optional[User]:
+    """
+    按访问令牌获取有效用户 (优先读取缓存)
+
+    返回：
+        User；令牌不存在、已过期 (JWT)、已吊销或账号已禁用时返回 None
+    """
+    if settings.AUTH_MODE == "jwt" and looks_like_jwt(token):
+        return await get_user_from_jwt(db, token)
+    cache = get_token_cache()
+    user = cache.get(token)
+    if user is not None:
+        return user
+    result = await db.execute(select(User).where(User.access_token == token))
+    user = result.scalars().first()
+    if user is None or not user.is_active:
+        return None
+    # 脱离请求会话后再缓存，避免被其他请求的会话共享
+    db.expunge(user)
+    cache.put(token, user)
+    return user
+
+
+# ----------------------------------------------------------------------------------
+# ORM 事件：令牌轮换 / JWT 吊销 / 账号禁用后失效缓存
+# 修改属性时立即失效一次，事务提交后再失效一次 (防止提交前的并发请求把旧值重新写入缓存)
+# ----------------------------------------------------------------------------------
+def invalidate_user(user_id: int):
+    """清除用户的缓存令牌与 JWT 吊销检查结果"""
+    get_token_cache().invalidate_user(user_id)
+    get_revocation_checker().invalidate(user_id)
+
+
+def _on_credentials_changed(target: User, value, oldvalue, initiator):
+    if target.id is None:
+        return
+    invalidate_user(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+def _on_commit(session: Session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user(user_id)
+
+
+def _on_rollback(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(User.access_token, "set", _on_credentials_changed)
+event.listen(User.token_version, "set", _on_credentials_changed)
+event.listen(User.is_active, "set", _on_credentials_changed)
+event.listen(Session, "after_commit", _on_commit)
+event.listen(Session, "after_rollback", _on_rollback)
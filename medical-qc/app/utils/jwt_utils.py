@@ -1,38 +1,42 @@
 # app/utils/jwt_utils.py
 # ----------------------------------------------------------------------------------
 # JWT 工具模块 (JWT Utilities)
-# 作用：提供独立的 JWT 编码和解码验证功能。
-# 注意：部分功能与 app.core.security 重叠，建议后续合并。
+# 作用：提供 JWT 编码和解码验证功能 (app.core.security 的 create_access_token 复用本模块)。
+#       密钥、算法与有效期统一取自 app.core.config.Settings。
 # 对接前端：
-#   - 生成的 Token 会被前端存储在 localStorage 中。
+#   - 生成的 Token 会被前端存储在 sessionStorage 中。
 #   - 验证失败时返回 401，前端拦截器会据此跳转回登录页。
 # ----------------------------------------------------------------------------------
 
 import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from fastapi import HTTPException, status
-from pydantic import BaseModel
 
-# 密钥配置 (应统一从 core.config 获取)
-SECRET_KEY = "your-secret-key-here"  
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+from app.core.config import settings
 
 # ----------------------------------------------------------------------------------
 # 函数：创建 Access Token
-# 作用：生成包含过期时间的 JWT 字符串。
-# 参数：data (Payload 数据), expires_delta (过期时间增量)
+# 作用：生成包含签发时间与过期时间的 JWT 字符串。
+# 参数：data (Payload 数据), expires_delta (过期时间增量，默认 ACCESS_TOKEN_EXPIRE_MINUTES)
 # ----------------------------------------------------------------------------------
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    now = datetime.now(timezone.utc)
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    to_encode.update({
+        "iat": now,
+        "exp": now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)),
+    })
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+# ----------------------------------------------------------------------------------
+# 函数：解码 Token
+# 作用：校验签名与过期时间并返回 Payload (不访问数据库)。
+# 异常：jwt.ExpiredSignatureError (已过期), jwt.InvalidTokenError (签名或格式无效)
+# ----------------------------------------------------------------------------------
+def decode_access_token(token: str) -> dict:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM],
+                      options={"require": ["exp", "sub"]})
 
 # ----------------------------------------------------------------------------------
 # 函数：验证 Token
@@ -41,9 +45,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 # ----------------------------------------------------------------------------------
 def verify_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return decode_access_token(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+# ----------------------------------------------------------------------------------
+# 函数：判断是否为 JWT 格式
+# 作用：区分 JWT 与不透明令牌 (secrets.token_urlsafe 不含 "."，JWT 由 "." 分隔为三段)。
+# ----------------------------------------------------------------------------------
+def looks_like_jwt(token: str) -> bool:
+    return token.count(".") == 2
@@ -0,0 +1,190 @@
+# app/utils/metrics.py
+# ----------------------------------------------------------------------------------
+# 运行指标工具 (Metrics Utils)
+# 作用：提供进程内的轻量级指标收集 (Counter / Gauge / Histogram)，
+#       并以 Prometheus 文本格式导出，供性能调优与监控告警使用。
+# 对接模块：
+#   - 上游调用: app.services.* (推理批处理、缓存等模块记录指标)
+#   - 导出接口: app.main (GET /metrics)
+# 对接前端：
+#   - 不直接对接前端，由 Prometheus / 运维看板抓取。
+# ----------------------------------------------------------------------------------
+
+import threading
+from typing import Dict, List, Optional, Sequence
+
+# 默认直方图分桶 (单位：秒)，覆盖 1ms ~ 10s 的常见请求耗时范围
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    """
+    指标基类
+
+    作用：
+        保存指标名称、说明和线程锁，并在创建时自动注册到全局注册表。
+    """
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    计数器：只增不减 (如请求总数、缓存命中次数)
+    """
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def render(self) -> List[str]:
+        return [f"{self.name} {self._value}"]
+
+    def snapshot(self) -> Dict:
+        return {"value": self._value}
+
+
+class Gauge(_Metric):
+    """
+    仪表盘：可增可减的瞬时值 (如队列长度、在途请求数)
+    """
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._value = 0.0
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def render(self) -> List[str]:
+        return [f"{self.name} {self._value}"]
+
+    def snapshot(self) -> Dict:
+        return {"value": self._value}
+
+
+class Histogram(_Metric):
+    """
+    直方图：统计观测值的分布 (如批大小、排队等待时间)
+
+    说明：
+        分桶为累计上界 (le)，与 Prometheus 约定一致，最后自动追加 +Inf 桶。
+    """
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    self._counts[i] += 1
+                    return
+            self._counts[-1] += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def render(self) -> List[str]:
+        lines = []
+        cumulative = 0
+        with self._lock:
+            for upper, c in zip(self.buckets, self._counts):
+                cumulative += c
+                lines.append(f'{self.name}_bucket{{le="{upper}"}} {cumulative}')
+            cumulative += self._counts[-1]
+            lines.append(f'{self.name}_bucket{{le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum {self._sum}")
+            lines.append(f"{self.name}_count {self._count}")
+        return lines
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self._counts)),
+                "sum": self._sum,
+                "count": self._count,
+            }
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    作用：
+        汇总进程内所有指标，统一导出为 Prometheus 文本或 JSON 快照。
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标名称重复: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: m.snapshot() for name, m in list(self._metrics.items())}
+
+
+# 全局单例注册表
+REGISTRY = MetricsRegistry()
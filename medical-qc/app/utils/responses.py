@@ -0,0 +1,69 @@
+# app/utils/responses.py
+# ----------------------------------------------------------------------------------
+# 响应序列化工具 (Response Serialization Utils)
+# 作用：为质控与汇总接口提供更快的响应序列化：
+#       1. 默认使用 orjson 序列化 JSON (比标准库 json 快数倍)；
+#       2. 客户端请求头 Accept 包含 application/msgpack 时返回 MessagePack，
+#          进一步减小批量集成 (PACS 等) 的传输体积。
+# 用法：
+#   router = APIRouter(route_class=NegotiatedRoute, default_response_class=NegotiatedResponse)
+# 对接模块：
+#   - 上游调用: app.api.v1.quality, app.api.v1.summary
+# ----------------------------------------------------------------------------------
+
+from contextvars import ContextVar
+from typing import Any, Callable
+
+import orjson
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.responses import JSONResponse, Response
+
+try:
+    import msgpack  # 可选依赖：未安装时始终返回 JSON
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# 当前请求是否接受 MessagePack (由 NegotiatedRoute 在调用接口函数前设置)
+_accept_msgpack: ContextVar[bool] = ContextVar("accept_msgpack", default=False)
+
+
+def wants_msgpack(accept_header: str) -> bool:
+    return msgpack is not None and any(t in (accept_header or "").lower() for t in MSGPACK_MEDIA_TYPES)
+
+
+class NegotiatedResponse(JSONResponse):
+    """
+    按 Accept 协商格式的响应类
+
+    说明：
+        默认 orjson 序列化 (支持 NumPy 标量/数组)；当前请求接受 MessagePack 时
+        改为 msgpack 编码并设置对应 Content-Type。
+    """
+
+    def render(self, content: Any) -> bytes:
+        if _accept_msgpack.get():
+            self.media_type = MSGPACK_MEDIA_TYPES[0]
+            return msgpack.packb(content, use_bin_type=True)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class NegotiatedRoute(APIRoute):
+    """在接口执行期间记录请求的 Accept 偏好，供 NegotiatedResponse 渲染时读取"""
+
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            token = _accept_msgpack.set(wants_msgpack(request.headers.get("accept", "")))
+            try:
+                response = await original_handler(request)
+            finally:
+                _accept_msgpack.reset(token)
+            # 同一 URL 的响应格式随 Accept 变化，告知缓存代理
+            response.headers.setdefault("Vary", "Accept")
+            return response
+
+        return route_handler
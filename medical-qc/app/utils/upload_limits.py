@@ -0,0 +1,148 @@
+# app/utils/upload_limits.py
+# ----------------------------------------------------------------------------------
+# 上传大小限制工具 (Upload Size Limits)
+# 作用：保证单个请求的内存占用有上限，与上传文件大小无关：
+#       1. BodySizeLimitMiddleware：Content-Length 超限时在读取请求体之前直接返回 413；
+#          未声明长度 (chunked) 的请求在接收过程中累计字节数，超限立即中止并返回 413；
+#       2. read_upload_digest：按块读取已落入 SpooledTemporaryFile 的上传文件，
+#          边读边计算 SHA-256 并校验大小，不把整个文件读入内存；
+#       3. spool_upload：将上传文件按块复制到独立的 SpooledTemporaryFile，
+#          供请求结束后仍在运行的后台任务使用 (请求结束时框架会关闭原上传文件)。
+# 对接模块：
+#   - 中间件注册: app.main
+#   - 上游调用: app.api.v1.quality (文件上传接口、序列任务提交)
+#   - 配置项:   app.core.config.Settings (MAX_REQUEST_BODY_MB / MAX_UPLOAD_SIZE_MB / UPLOAD_CHUNK_SIZE_KB / ARCHIVE_MAX_UPLOAD_MB)
+# ----------------------------------------------------------------------------------
+
+import hashlib
+import tempfile
+from typing import BinaryIO, Dict, Optional, Tuple
+
+from fastapi import UploadFile
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class UploadTooLargeError(Exception):
+    """上传内容超过允许的最大尺寸 (API 层转换为 413)"""
+
+
+class _BodyTooLarge(Exception):
+    """中间件内部使用：接收请求体过程中超限"""
+
+
+class BodySizeLimitMiddleware:
+    """
+    请求体大小限制中间件 (纯 ASGI 实现，不缓冲请求体)
+
+    参数：
+        max_body_size: 请求体最大字节数 (<=0 表示不限制)
+        path_limits:   按路径单独设置的上限 (如归档批量检测接口需要更大的请求体)
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    @staticmethod
+    def _reject(limit: int) -> JSONResponse:
+        limit_mb = limit / (1024 * 1024)
+        return JSONResponse(status_code=413, content={"detail": f"请求体过大，最大允许 {limit_mb:.0f} MB"})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = self.path_limits.get(scope.get("path"), self.max_body_size) if scope["type"] == "http" else 0
+        if limit <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        # 1. 提前拒绝：声明的 Content-Length 已超限，不读取请求体
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > limit:
+                    await self._reject(limit)(scope, receive, send)
+                    return
+                break
+
+        # 2. 流式计数：chunked 或声明长度不实的请求，在接收过程中超限即中止
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(limit)(scope, receive, send)
+
+
+async def read_upload_digest(upload: UploadFile, max_bytes: int, chunk_size: int = 1024 * 1024) -> Tuple[BinaryIO, str, int]:
+    """
+    按块读取上传文件，计算内容 SHA-256 并校验大小
+
+    说明：
+        Starlette 已将上传文件写入 SpooledTemporaryFile (小文件在内存，大文件溢出到磁盘)，
+        这里只按块遍历一次，读取完成后将文件指针复位，供解码流程直接读取文件对象。
+    返回：
+        (文件对象, SHA-256 十六进制摘要, 字节数)
+    异常：
+        UploadTooLargeError - 文件超过 max_bytes
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_bytes > 0 and size > max_bytes:
+            raise UploadTooLargeError(f"上传文件过大，最大允许 {max_bytes / (1024 * 1024):.0f} MB")
+        digest.update(chunk)
+    await upload.seek(0)
+    return upload.file, digest.hexdigest(), size
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int, chunk_size: int = 1024 * 1024,
+                       spool_max_size: int = 8 * 1024 * 1024) -> BinaryIO:
+    """
+    将上传文件复制到调用方持有的临时文件 (超过 spool_max_size 后溢出到磁盘)
+
+    返回：
+        文件对象 (指针已复位，调用方负责关闭)
+    异常：
+        UploadTooLargeError - 文件超过 max_bytes
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes > 0 and size > max_bytes:
+                raise UploadTooLargeError(f"上传文件过大，最大允许 {max_bytes / (1024 * 1024):.0f} MB")
+            spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+    spooled.seek(0)
+    return spooled
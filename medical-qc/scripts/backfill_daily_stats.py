@@ -0,0 +1,46 @@
+# scripts/backfill_daily_stats.py
+# ----------------------------------------------------------------------------------
+# 回填质控日汇总 (Backfill Daily Stats)
+# 作用：从 hemorrhage_records 明细重新计算 qc_daily_stats。
+#       首次上线 (已有历史记录)、手工修改明细数据后执行；日常写入由 record_writer 增量维护，无需执行。
+# 用法：
+#   python scripts/backfill_daily_stats.py                    全量重建
+#   python scripts/backfill_daily_stats.py --since 2026-01-01  只重建该日期 (含) 之后的汇总
+# 前置：先执行 python scripts/upgrade_schema.py (补建 status 列与汇总表)
+# ----------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+
+# Add the project root to the python path
+sys.path.append(os.getcwd())
+
+from app.utils.database import AsyncSessionLocal, engine
+from app.models.user_role import UserRole
+from app.models.user import User
+from app.models.hemorrhage_record import HemorrhageRecord
+from app.models.qc_daily_stat import QCDailyStat
+from app.services.stats_rollup import backfill_issue_status, rebuild_daily_stats
+
+
+async def backfill(since: date = None):
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        updated = await backfill_issue_status(session)
+        print(f"✅ 补全异常处理状态: {updated} 条")
+        await rebuild_daily_stats(session, since)
+        await session.commit()
+    await engine.dispose()
+    scope = f"{since.isoformat()} 起" if since else "全量"
+    print(f"✅ 日汇总已重建 ({scope})，耗时 {time.perf_counter() - started:.1f} 秒")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="从检测明细重建质控日汇总 (qc_daily_stats)")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="起始日期 YYYY-MM-DD (含)")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.since))
@@ -0,0 +1,143 @@
+# scripts/benchmark_login_storm.py
+# ----------------------------------------------------------------------------------
+# 集中登录压测 (Login Storm Benchmark)
+# 作用：模拟交接班时的集中登录，同时以固定间隔发起检测请求 (切片分析内核，经推理执行器执行)，
+#       对比原实现 (在事件循环中直接验证密码) 与哈希线程池实现 (app.services.password_hasher)：
+#       登录吞吐 (次/秒) 以及检测请求的端到端延迟 (p50 / p95 / 最大值)。
+#       用户数据写入内存 SQLite，不依赖 MySQL。
+# 用法 (在 medical-qc 目录下执行)：
+#   python scripts/benchmark_login_storm.py
+#   python scripts/benchmark_login_storm.py --logins 400 --concurrency 50 --rounds 100000
+# ----------------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+# Add the project root to the python path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.security import build_password_context
+from app.models.hemorrhage_record import HemorrhageRecord  # noqa: F401
+from app.models.user_role import UserRole  # noqa: F401
+from app.models.user import User
+from app.services.inference_executor import get_inference_executor
+from app.services.password_hasher import PasswordHasher
+from app.services.slice_analysis import analyze_slices
+from app.utils.database import Base
+
+
+async def legacy_login(db, context, username: str, password: str) -> bool:
+    """原 login_user 的实现：查询用户后在事件循环中直接验证密码"""
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+    return user is not None and context.verify(password, user.password_hash)
+
+
+async def pooled_login(db, hasher: PasswordHasher, username: str, password: str) -> bool:
+    """现 login_user 的实现：在哈希线程池中验证密码"""
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+    return user is not None and (await hasher.verify_and_update(password, user.password_hash))[0]
+
+
+async def probe_inference(stop: asyncio.Event, interval_ms: float, latencies: list):
+    """以固定间隔发起检测请求 (单张 512x512 切片分析)，记录端到端延迟 (ms)"""
+    executor = get_inference_executor()
+    image = np.random.default_rng(0).integers(0, 120, size=(512, 512), dtype=np.uint8)
+    while not stop.is_set():
+        start = time.perf_counter()
+        await executor.run(analyze_slices, image)
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval_ms / 1000)
+
+
+async def run_phase(login, sessions, logins: int, concurrency: int, interval_ms: float):
+    """返回 (登录吞吐 次/秒, 检测延迟列表)；logins 为 0 时只测空闲延迟"""
+    stop = asyncio.Event()
+    latencies: list = []
+    probe = asyncio.create_task(probe_inference(stop, interval_ms, latencies))
+    await asyncio.sleep(0.2)  # 先采集若干空载样本，确保压测期间探针已在运行
+    latencies.clear()
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(logins):
+        queue.put_nowait(f"user{i % concurrency}")
+
+    async def client():
+        async with sessions() as db:
+            while not queue.empty():
+                assert await login(db, queue.get_nowait(), "password")
+
+    start = time.perf_counter()
+    if logins:
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    else:
+        await asyncio.sleep(1.0)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    return (logins / elapsed if logins else 0.0), latencies
+
+
+def describe(latencies: list) -> str:
+    if not latencies:
+        return f"{'-':>10}{'-':>10}{'-':>10}"
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{statistics.median(ordered):>10.1f}{p95:>10.1f}{ordered[-1]:>10.1f}"
+
+
+async def main_async(args):
+    context = build_password_context(args.scheme, args.rounds)
+    hasher = PasswordHasher(context, max_workers=args.workers, max_pending=args.logins + args.concurrency)
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    password_hash = context.hash("password")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+        await conn.execute(insert(User), [
+            {"id": i + 1, "username": f"user{i}", "email": f"user{i}@example.com", "password_hash": password_hash,
+             "role_id": 2, "access_token": f"token{i}"}
+            for i in range(args.concurrency)
+        ])
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    phases = [
+        ("空闲 (无登录)", None, 0),
+        ("原实现 (事件循环内验证)", lambda db, u, p: legacy_login(db, context, u, p), args.logins),
+        (f"哈希线程池 (workers={args.workers})", lambda db, u, p: pooled_login(db, hasher, u, p), args.logins),
+    ]
+    print(f"算法: {args.scheme}, 成本: {args.rounds or '默认'}, 登录数: {args.logins}, 并发: {args.concurrency}")
+    print(f"{'场景':<28}{'登录/秒':>10}{'检测p50':>10}{'检测p95':>10}{'检测max':>10}  (延迟单位 ms)")
+    for name, login, logins in phases:
+        throughput, latencies = await run_phase(login, sessions, logins, args.concurrency, args.probe_interval_ms)
+        rate = f"{throughput:>10.1f}" if logins else f"{'-':>10}"
+        print(f"{name:<28}{rate}{describe(latencies)}")
+
+    hasher.shutdown()
+    get_inference_executor().shutdown()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="集中登录时的登录吞吐与检测请求延迟")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scheme", default=settings.PASSWORD_HASH_SCHEME)
+    parser.add_argument("--rounds", type=int, default=settings.PASSWORD_HASH_ROUNDS)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--probe-interval-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
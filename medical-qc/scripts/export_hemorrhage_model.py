@@ -0,0 +1,67 @@
+# scripts/export_hemorrhage_model.py
+# ----------------------------------------------------------------------------------
+# 模型导出与后端延迟对比 (Export & Benchmark)
+# 作用：从训练产出的 models/hemorrhage_model_best.pth 导出 TorchScript / ONNX 产物，
+#       并可选地在当前机器上对比各推理后端的延迟，用于选择 INFERENCE_BACKEND。
+#       每个产物旁写入清单 (<产物>.json：源权重 SHA-256 与精度)，服务只加载与当前权重一致的产物；
+#       更换 .pth 后需重新执行本脚本 (未重新导出前服务会从内存中的模型即时生成)。
+# 用法 (在 medical-qc 目录下执行)：
+#   python scripts/export_hemorrhage_model.py                      # 导出全部产物
+#   python scripts/export_hemorrhage_model.py --benchmark          # 导出后对比延迟
+#   python scripts/export_hemorrhage_model.py --formats onnx --benchmark --batch-sizes 1 8 16
+# ----------------------------------------------------------------------------------
+
+import argparse
+import os
+import sys
+
+# Add the project root to the python path
+sys.path.append(os.getcwd())
+
+from app.services.hemorrhage_ai import artifact_fingerprint, get_model
+from app.services.inference_backends import (
+    ONNX_PATH,
+    SUPPORTED_BACKENDS,
+    TORCHSCRIPT_PATH,
+    compare_backends,
+    export_onnx,
+    export_torchscript,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出脑出血检测模型并对比推理后端延迟")
+    parser.add_argument("--formats", nargs="+", default=["torchscript", "onnx"], choices=["torchscript", "onnx"])
+    parser.add_argument("--benchmark", action="store_true", help="导出后对比各推理后端延迟")
+    parser.add_argument("--backends", nargs="+", default=list(SUPPORTED_BACKENDS), choices=list(SUPPORTED_BACKENDS))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    model = get_model()
+    fingerprint = artifact_fingerprint()
+    if fingerprint is None:
+        sys.exit("Nothing to export: trained weights are missing or INFERENCE_PRECISION=int8 is active")
+
+    if "torchscript" in args.formats:
+        print(f"Exporting TorchScript -> {export_torchscript(model, fingerprint, TORCHSCRIPT_PATH)}")
+    if "onnx" in args.formats:
+        print(f"Exporting ONNX -> {export_onnx(model, ONNX_PATH, fingerprint)}")
+
+    if args.benchmark:
+        rows = compare_backends(model, args.backends, args.batch_sizes, args.iterations, fingerprint)
+        print(f"\n{'backend':<12}{'batch':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'ms/slice':>10}")
+        for row in rows:
+            if "error" in row:
+                print(f"{row['backend']:<12}  unavailable: {row['error']}")
+                continue
+            print(f"{row['backend']:<12}{row['batch_size']:>6}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['per_sample_ms']:>10}")
+
+        ok = [r for r in rows if "error" not in r]
+        if ok:
+            best = min(ok, key=lambda r: r["per_sample_ms"])
+            print(f"\nFastest: INFERENCE_BACKEND={best['backend']} (batch={best['batch_size']}, {best['per_sample_ms']} ms/slice)")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from app.utils.database import AsyncSessionLocal
 from app.models.user_role import UserRole
 from app.models.user import User
 from app.models.hemorrhage_record import HemorrhageRecord
+from app.models.qc_daily_stat import QCDailyStat
 from sqlalchemy import select
 
 async def init_db():
@@ -0,0 +1,49 @@
+# scripts/upgrade_schema.py
+# ----------------------------------------------------------------------------------
+# 表结构升级 (Upgrade Schema)
+# 作用：create_all 只创建缺失的表，不会为已存在的表补建新增的列与索引。
+#       本脚本：1. 创建缺失的表；2. 为已有表补建模型中新增的列 (ALTER TABLE ... ADD COLUMN)；
+#       3. 补建模型中声明、数据库中尚不存在的索引。可重复执行。
+# 用法：python scripts/upgrade_schema.py
+# ----------------------------------------------------------------------------------
+
+import asyncio
+import os
+import sys
+
+# Add the project root to the python path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from app.utils.database import Base, engine
+from app.models.user_role import UserRole
+from app.models.user import User
+from app.models.hemorrhage_record import HemorrhageRecord
+from app.models.qc_daily_stat import QCDailyStat
+
+
+def _upgrade(connection):
+    Base.metadata.create_all(connection)
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                print(f"✅ {table.name}.{column.name} (新增列)")
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            index.create(connection, checkfirst=True)
+            print(f"✅ {table.name}.{index.name}")
+
+
+async def upgrade_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(upgrade_schema())
@@ -0,0 +1,151 @@
+import asyncio
+import io
+import tarfile
+import zipfile
+from types import SimpleNamespace
+
+import numpy as np
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.api.v1 import quality
+from app.services.archive_ingest import ArchiveFormatError, check_archive_format, ingest_archive
+from app.services.inference_executor import get_inference_executor
+from app.utils.database import get_db
+
+
+def _png_bytes(seed):
+    pixels = np.random.default_rng(seed).integers(0, 255, size=(32, 32), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _collect(fileobj, **kwargs):
+    async def main():
+        return [line async for line in ingest_archive(fileobj, **kwargs)]
+    return asyncio.run(main())
+
+
+def test_zip_members_stream_one_line_each_plus_summary():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(5):
+            archive.writestr(f"series/{i}.png", _png_bytes(i))
+        archive.writestr("series/huge.png", b"\0" * 4096)
+        archive.writestr("__MACOSX/series/._0.png", b"junk")
+
+    lines = _collect(buffer, max_member_bytes=2048, concurrency=2)
+
+    results, summary = lines[:-1], lines[-1]["summary"]
+    assert sorted(line["index"] for line in results) == list(range(6))
+    assert {line["file"] for line in results if line["status"] == "ok"} == {f"series/{i}.png" for i in range(5)}
+    assert [line["file"] for line in results if line["status"] == "error"] == ["series/huge.png"]
+    assert summary["files"] == 6 and summary["succeeded"] == 5 and summary["failed"] == 1
+
+
+def test_tar_gz_is_read_as_stream():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for i in range(3):
+            data = _png_bytes(10 + i)
+            info = tarfile.TarInfo(f"{i}.png")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    assert check_archive_format(buffer) == "tar"
+    assert _collect(buffer)[-1]["summary"]["succeeded"] == 3
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ArchiveFormatError):
+        check_archive_format(io.BytesIO(b"not an archive" * 64))
+
+
+@pytest.fixture
+def quality_client(monkeypatch):
+    saved = []
+
+    async def fake_user(token, db):
+        return SimpleNamespace(id=1, username="tester")
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(quality, "get_current_user", fake_user)
+    monkeypatch.setattr(quality, "_save_record", lambda user, result, image_path, *args: saved.append(image_path))
+    app = FastAPI()
+    app.include_router(quality.router, prefix="/api/v1/quality")
+    app.dependency_overrides[get_db] = no_db
+    return TestClient(app), saved
+
+
+def _post_archive(client, content, filename="series.zip", content_type="application/zip"):
+    return client.post(
+        "/api/v1/quality/hemorrhage/archive",
+        files={"file": (filename, content, content_type)},
+        headers={"Authorization": "Bearer test"},
+    )
+
+
+def test_archive_endpoint_streams_without_persisting_and_releases_slot(quality_client):
+    client, saved = quality_client
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(3):
+            archive.writestr(f"{i}.png", _png_bytes(20 + i))
+        archive.writestr("broken.png", b"not a png")
+
+    response = _post_archive(client, buffer.getvalue())
+
+    assert response.status_code == 200
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert lines[-1]["summary"]["succeeded"] == 3
+    # 回顾性审计结果不写入检测记录
+    assert saved == []
+    assert get_inference_executor().inflight == 0
+
+
+def test_archive_endpoint_rejects_wrong_type_and_saturation(quality_client, monkeypatch):
+    client, saved = quality_client
+    assert _post_archive(client, b"\x89PNG....", "slice.png", "image/png").status_code == 400
+
+    executor = get_inference_executor()
+    monkeypatch.setattr(executor, "max_inflight", 0)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("0.png", _png_bytes(30))
+    response = _post_archive(client, buffer.getvalue())
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert executor.inflight == 0 and saved == []
+
+
+def test_series_job_persists_one_study_record(quality_client, monkeypatch):
+    client, saved = quality_client
+
+    async def fake_series(sources, preview, progress=None):
+        return {"key_slice": 1, "slices": [{"source": "a.png", "probability": {}},
+                                           {"source": "b.png", "probability": {"hemorrhage": 0.9}}]}
+
+    monkeypatch.setattr(quality, "run_hemorrhage_series_async", fake_series)
+    monkeypatch.setattr(quality, "_save_record",
+                        lambda user, result, image_path, *args: saved.append((image_path, *args)))
+    with client:
+        response = client.post(
+            "/api/v1/quality/hemorrhage/series/jobs",
+            files=[("files", (name, _png_bytes(40 + i), "image/png")) for i, name in enumerate(["a.png", "b.png"])],
+            data={"patient_name": "张三", "exam_id": "E001"},
+            headers={"Authorization": "Bearer test"},
+        )
+        assert response.status_code == 202
+        for _ in range(100):
+            if saved:
+                break
+            client.portal.call(asyncio.sleep, 0.01)
+
+    assert saved == [("b.png", "张三", "E001")]
@@ -0,0 +1,50 @@
+import numpy as np
+import pydicom
+from pydicom.data import get_testdata_file
+
+from app.services.dicom_decode import apply_window, decode_dicom, is_dicom
+from app.services.hemorrhage_ai import load_image
+
+CT_FILE = get_testdata_file("CT_small.dcm")
+
+
+def _reference_window(ds, center, width):
+    hu = ds.pixel_array.astype(np.float64) * float(ds.RescaleSlope) + float(ds.RescaleIntercept)
+    low = center - width / 2.0
+    return np.clip((hu - low) / width * 255.0, 0, 255).astype(np.uint8)
+
+
+def test_dicom_detected_by_preamble():
+    with open(CT_FILE, "rb") as f:
+        data = f.read()
+
+    assert is_dicom(data)
+    assert is_dicom(CT_FILE)
+    assert not is_dicom(b"\x89PNG" + b"\x00" * 200)
+
+
+def test_brain_window_matches_reference_hu_conversion():
+    ds = pydicom.dcmread(CT_FILE)
+    expected = _reference_window(ds, 40.0, 80.0)
+
+    result = decode_dicom(CT_FILE, window="brain")
+
+    assert result.dtype == np.uint8
+    assert np.abs(result.astype(int) - expected.astype(int)).max() <= 1
+
+
+def test_lut_and_float_paths_agree():
+    pixels = np.arange(-2000, 3000, 7, dtype=np.int16).reshape(1, -1)
+
+    lut = apply_window(pixels, 1.0, -1024.0, 75.0, 215.0)
+    float_path = apply_window(pixels.astype(np.int32), 1.0, -1024.0, 75.0, 215.0)
+
+    assert np.abs(lut.astype(int) - float_path.astype(int)).max() <= 1
+
+
+def test_load_image_uses_dicom_path_for_bytes():
+    with open(CT_FILE, "rb") as f:
+        image = load_image(f.read())
+
+    assert image.mode == "L"
+    assert image.size == (128, 128)
@@ -0,0 +1,25 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from app.services.hemorrhage_ai import load_image
+
+
+def _png_bytes():
+    pixels = np.random.default_rng(0).integers(0, 255, size=(64, 80), dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_bytes_and_path_decode_identically(tmp_path):
+    data = _png_bytes()
+    path = tmp_path / "slice.png"
+    path.write_bytes(data)
+
+    from_bytes = load_image(data)
+    from_path = load_image(str(path))
+
+    assert from_bytes.mode == "L"
+    assert np.array_equal(np.asarray(from_bytes), np.asarray(from_path))
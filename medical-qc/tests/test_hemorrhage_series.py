@@ -0,0 +1,97 @@
+import asyncio
+import tempfile
+from io import BytesIO
+
+import numpy as np
+import pydicom
+from PIL import Image
+import pytest
+from pydicom.data import get_testdata_file
+
+from app.services import hemorrhage_ai
+from app.services.dicom_decode import DicomDecodeError, count_frames, decode_dicom, decode_dicom_frames
+from app.services.hemorrhage_ai import run_hemorrhage_series_async, summarize_series
+
+
+def _png_bytes(seed):
+    pixels = np.random.default_rng(seed).integers(0, 255, size=(64, 64), dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _multiframe_dicom(frames=3):
+    ds = pydicom.dcmread(get_testdata_file("CT_small.dcm"))
+    volume = np.stack([ds.pixel_array + 10 * i for i in range(frames)]).astype(ds.pixel_array.dtype)
+    ds.NumberOfFrames = frames
+    ds.PixelData = volume.tobytes()
+    buffer = BytesIO()
+    ds.save_as(buffer)
+    return buffer.getvalue()
+
+
+def test_multiframe_frames_match_single_frame_decode():
+    data = _multiframe_dicom(3)
+
+    frames = decode_dicom_frames(data)
+
+    assert frames.shape == (3, 128, 128)
+    assert np.array_equal(frames[1], decode_dicom(data))  # 默认中间帧
+
+
+def test_frame_limit_is_checked_from_header_before_pixels():
+    data = _multiframe_dicom(3)
+
+    assert count_frames(data) == 3
+    with pytest.raises(DicomDecodeError):
+        decode_dicom_frames(data, max_frames=2)
+
+
+def test_series_rejects_multiframe_over_limit_without_decoding(monkeypatch):
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("像素数据不应被解码")
+
+    monkeypatch.setattr(hemorrhage_ai, "decode_dicom_frames", fail_decode)
+    sources = [("a.png", _png_bytes(0)), ("series.dcm", _multiframe_dicom(4))]
+
+    with pytest.raises(ValueError, match="切片数过多"):
+        asyncio.run(run_hemorrhage_series_async(sources, max_slices=4))
+
+
+def test_series_returns_per_slice_results_and_study_verdict():
+    sources = [("a.png", _png_bytes(0)), ("series.dcm", _multiframe_dicom(3)), ("b.png", _png_bytes(1))]
+
+    result = asyncio.run(run_hemorrhage_series_async(sources))
+
+    assert result["slice_count"] == 5
+    assert [s["index"] for s in result["slices"]] == [0, 1, 2, 3, 4]
+    assert [(s["source"], s["frame"]) for s in result["slices"]] == [
+        ("a.png", None), ("series.dcm", 0), ("series.dcm", 1), ("series.dcm", 2), ("b.png", None),
+    ]
+    assert all("image_base64" not in s for s in result["slices"])  # 序列默认不生成预览图
+    assert result["prediction"] in ("出血", "未出血")
+
+
+def test_series_file_objects_keep_all_frames():
+    # 上传接口传入的是文件对象 (UploadFile / spool_upload)，头部读取后解码仍须得到全部帧
+    spooled = tempfile.SpooledTemporaryFile()
+    spooled.write(_multiframe_dicom(5))
+    spooled.seek(0)
+
+    result = asyncio.run(run_hemorrhage_series_async([("series.dcm", spooled)]))
+
+    assert result["slice_count"] == 5
+    assert [s["frame"] for s in result["slices"]] == [0, 1, 2, 3, 4]
+
+
+def test_study_is_positive_when_any_slice_is_positive():
+    def slice_result(prediction, prob):
+        return {"prediction": prediction, "probability": {"hemorrhage": prob, "no_hemorrhage": 1 - prob},
+                "midline_shift": False, "ventricle_issue": False}
+
+    summary = summarize_series([slice_result("未出血", 0.1), slice_result("出血", 0.95), slice_result("未出血", 0.3)])
+
+    assert summary["prediction"] == "出血"
+    assert summary["positive_slices"] == [1]
+    assert summary["key_slice"] == 1
+    assert summary["confidence"] == "高"
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.user import User  # noqa: F401  (注册 users 表，满足外键)
+from app.models.user_role import UserRole  # noqa: F401
+from app.models.hemorrhage_record import HemorrhageRecord
+from app.services.history_service import decode_cursor, encode_cursor, fetch_hemorrhage_history
+from app.utils.database import Base
+
+BASE_TIME = datetime(2026, 3, 1, 8, 0, 0)
+
+
+def _rows():
+    rows = []
+    for i in range(25):
+        rows.append({
+            "user_id": 1 if i < 23 else 2,
+            "image_path": f"{i}.png",
+            "prediction": "出血" if i % 3 == 0 else "未出血",
+            "confidence_level": "高",
+            "hemorrhage_probability": 0.5,
+            "no_hemorrhage_probability": 0.5,
+            # 每两条记录共享同一时间戳，验证 id 作为次级排序键
+            "created_at": BASE_TIME + timedelta(hours=i // 2),
+        })
+    return rows
+
+
+def _query(**kwargs):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[HemorrhageRecord.__table__])
+            await conn.execute(insert(HemorrhageRecord), _rows())
+        pages = []
+        async with async_sessionmaker(engine)() as db:
+            cursor = None
+            while True:
+                items, cursor = await fetch_hemorrhage_history(db, 1, cursor=cursor, **kwargs)
+                pages.append(items)
+                if cursor is None:
+                    break
+        await engine.dispose()
+        return pages
+
+    return asyncio.run(main())
+
+
+def test_keyset_pages_cover_all_rows_in_order_without_overlap():
+    pages = _query(limit=5)
+
+    ids = [item["id"] for page in pages for item in page]
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 23  # 不含其他用户的记录
+
+
+def test_filters_by_prediction_and_date():
+    pages = _query(limit=100, prediction="出血", date_to=date(2026, 3, 1))
+
+    items = pages[0]
+    assert len(pages) == 1
+    assert items and all(item["prediction"] == "出血" for item in items)
+    assert all(item["created_at"].startswith("2026-03-01") for item in items)
+
+
+def test_cursor_round_trip_and_invalid_cursor():
+    assert decode_cursor(encode_cursor(BASE_TIME, 42)) == (BASE_TIME, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+
+from app.core.config import settings
+from app.services import hemorrhage_ai
+from app.services.inference_backends import (
+    CompileBackend,
+    EagerBackend,
+    OnnxRuntimeBackend,
+    TorchScriptBackend,
+    create_backend,
+    export_onnx,
+    export_torchscript,
+)
+
+FP32 = {"checkpoint_sha256": "a" * 64, "precision": "fp32"}
+
+
+def tiny_model(seed: int) -> nn.Module:
+    torch.manual_seed(seed)
+    return nn.Sequential(nn.AdaptiveAvgPool2d(4), nn.Flatten(), nn.Linear(16, 2)).eval()
+
+
+def test_backend_selection():
+    model = tiny_model(0)
+    assert isinstance(create_backend("eager", model), EagerBackend)
+    assert isinstance(create_backend("torchscript", model), TorchScriptBackend)
+    assert isinstance(create_backend("compile", model), CompileBackend)
+    assert isinstance(create_backend("onnx", model), OnnxRuntimeBackend)
+    with pytest.raises(ValueError):
+        create_backend("tensorrt", model)
+
+
+@pytest.mark.parametrize("kind", ["torchscript", "onnx"])
+def test_artifact_used_only_when_manifest_matches(tmp_path, kind):
+    exported, current = tiny_model(0), tiny_model(1)
+    batch = torch.randn(2, 1, 224, 224)
+    path = str(tmp_path / f"model.{kind}")
+    if kind == "torchscript":
+        export_torchscript(exported, FP32, path)
+        build = lambda fingerprint: TorchScriptBackend(current, path=path, fingerprint=fingerprint)
+    else:
+        export_onnx(exported, path, FP32)
+        build = lambda fingerprint: OnnxRuntimeBackend(current, path=path, fingerprint=fingerprint)
+    expected_exported = EagerBackend(exported).predict(batch)
+    expected_current = EagerBackend(current).predict(batch)
+
+    matching = build(FP32)
+    stale = build({**FP32, "checkpoint_sha256": "b" * 64})
+    int8 = build({**FP32, "precision": "int8"})
+    random_weights = build(None)
+
+    assert matching.artifact_path == path
+    np.testing.assert_allclose(matching.predict(batch), expected_exported, atol=1e-5)
+    for backend in (stale, int8, random_weights):
+        assert backend.artifact_path is None
+        np.testing.assert_allclose(backend.predict(batch), expected_current, atol=1e-5)
+
+
+def test_export_refuses_int8_and_random_models(tmp_path):
+    with pytest.raises(ValueError):
+        export_torchscript(tiny_model(0), {**FP32, "precision": "int8"}, str(tmp_path / "m.pt"))
+    with pytest.raises(ValueError):
+        export_onnx(tiny_model(0), str(tmp_path / "m.onnx"), None)
+
+
+def test_get_backend_falls_back_to_eager(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("backend unavailable")
+
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "onnx")
+    monkeypatch.setattr(hemorrhage_ai, "create_backend", broken)
+    monkeypatch.setattr(hemorrhage_ai, "_backend_instance", None)
+
+    assert isinstance(hemorrhage_ai.get_backend(), EagerBackend)
@@ -0,0 +1,50 @@
+import asyncio
+
+import numpy as np
+import torch
+
+from app.services.inference_batcher import MicroBatcher
+
+
+def test_concurrent_requests_are_batched_and_scattered():
+    calls = []
+
+    def predict(batch):
+        calls.append(batch.shape[0])
+        # 每个样本返回其第一个像素值，便于校验结果分发顺序
+        return batch.reshape(batch.shape[0], -1)[:, :1].numpy()
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=50, name="test_batched")
+
+    async def main():
+        items = [torch.full((1, 1, 2, 2), float(i)) for i in range(6)]
+        results = await asyncio.gather(*(batcher.submit(t) for t in items))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+
+    assert [float(r[0]) for r in results] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert calls == [4, 2]
+    assert batcher.batch_size_histogram.count == 2
+    assert batcher.queue_wait_histogram.count == 6
+
+
+def test_predict_error_is_propagated_to_every_waiter():
+    def predict(batch):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(predict, max_batch_size=2, max_wait_ms=10, name="test_batch_error")
+
+    async def main():
+        results = await asyncio.gather(
+            batcher.submit(torch.zeros(1, 2, 2)),
+            batcher.submit(torch.zeros(1, 2, 2)),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+import torch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import quality
+from app.services.inference_batcher import MicroBatcher
+from app.services.inference_executor import ExecutorSaturatedError, InferenceExecutor
+from app.utils.database import get_db
+
+
+def test_slot_rejects_when_saturated_and_releases():
+    executor = InferenceExecutor(max_workers=1, max_inflight=2)
+
+    async def main():
+        async with executor.slot(), executor.slot():
+            assert executor.inflight == 2
+            with pytest.raises(ExecutorSaturatedError):
+                async with executor.slot():
+                    pass
+        assert executor.inflight == 0
+        async with executor.slot():
+            return executor.inflight
+
+    assert asyncio.run(main()) == 1
+
+
+def test_batcher_forward_pass_runs_on_executor_model_thread():
+    executor = InferenceExecutor(max_workers=1, max_inflight=2)
+    threads = []
+
+    def predict(batch):
+        threads.append(threading.current_thread().name)
+        return batch.reshape(batch.shape[0], -1)[:, :1].numpy()
+
+    batcher = MicroBatcher(predict, max_batch_size=2, max_wait_ms=5, name="test_executor_lane",
+                           run_fn=executor.run_model)
+
+    async def main():
+        await batcher.submit(torch.zeros(1, 2, 2))
+        await batcher.stop()
+
+    asyncio.run(main())
+    executor.shutdown()
+    assert threads and threads[0].startswith("inference-model")
+
+
+def test_saturation_maps_to_503_with_retry_after(monkeypatch):
+    async def fake_user(token, db):
+        return object()
+
+    async def saturated(*args, **kwargs):
+        raise ExecutorSaturatedError("推理队列已满 (在途 16/16)")
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(quality, "get_current_user", fake_user)
+    monkeypatch.setattr(quality, "_detect_upload", saturated)
+    app = FastAPI()
+    app.include_router(quality.router, prefix="/api/v1/quality")
+    app.dependency_overrides[get_db] = no_db
+
+    response = TestClient(app).post(
+        "/api/v1/quality/hemorrhage",
+        files={"file": ("slice.png", b"\x89PNG....", "image/png")},
+        headers={"Authorization": "Bearer test"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.user_role import UserRole  # noqa: F401
+from app.models.user import User  # noqa: F401
+from app.models.hemorrhage_record import HemorrhageRecord
+from app.services.issue_service import fetch_recent_issues, search_condition
+from app.services.record_writer import build_hemorrhage_row
+from app.utils.database import Base
+
+POSITIVE = {"prediction": "出血", "confidence": "高", "probability": {"hemorrhage": 0.9, "no_hemorrhage": 0.1},
+            "midline_shift": True}
+NEGATIVE = {"prediction": "未出血", "confidence": "高", "probability": {"hemorrhage": 0.1, "no_hemorrhage": 0.9}}
+BASE_TIME = datetime(2026, 3, 1, 8, 0)
+
+
+def _rows():
+    rows = []
+    for i in range(12):
+        row = build_hemorrhage_row(1, POSITIVE if i % 4 else NEGATIVE, f"{i}.png", f"患者{i}", f"ACC{i:04d}")
+        row["created_at"] = BASE_TIME + timedelta(minutes=i // 2)
+        if i == 11:
+            row["status"] = "已解决"
+        rows.append(row)
+    return rows
+
+
+def _run(calls):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[HemorrhageRecord.__table__])
+            await conn.execute(insert(HemorrhageRecord), _rows())
+        async with async_sessionmaker(engine)() as db:
+            results = [await call(db) for call in calls]
+        await engine.dispose()
+        return results
+
+    return asyncio.run(main())
+
+
+def test_cursor_pages_cover_issues_only_and_agree_with_offset_pages():
+    async def walk(db):
+        pages, cursor = [], None
+        while True:
+            page = await fetch_recent_issues(db, limit=4, cursor=cursor, query="A")
+            pages.append([item["id"] for item in page["items"]])
+            cursor = page["nextCursor"]
+            if cursor is None:
+                return pages
+
+    async def offset_page(db):
+        return [item["id"] for item in (await fetch_recent_issues(db, page=2, limit=4, query="A"))["items"]]
+
+    pages, second = _run([walk, offset_page])
+
+    ids = [i for page in pages for i in page]
+    assert len(ids) == len(set(ids)) == 9  # 12 条记录中 3 条未出血
+    assert second == pages[1]
+
+
+def test_status_filter_and_item_shape():
+    async def resolved(db):
+        return await fetch_recent_issues(db, status="已解决", query="A")
+
+    (page,) = _run([resolved])
+
+    assert page["total"] == 1 and not page["totalApproximate"]
+    item = page["items"][0]
+    assert item["status"] == "已解决" and item["description"] == "脑出血、中线偏移"
+    assert item["examId"] == "ACC0011" and item["priority"] == "High" and item["imageUrl"] is None
+
+
+def test_search_uses_fulltext_phrase_for_longer_terms():
+    sql = str(select(HemorrhageRecord.id).where(search_condition('张伟 +"')).compile(dialect=mysql.dialect()))
+
+    assert "MATCH (hemorrhage_records.patient_name, hemorrhage_records.exam_id, " \
+           "hemorrhage_records.issue_description) AGAINST (%s IN BOOLEAN MODE)" in sql
@@ -0,0 +1,44 @@
+import asyncio
+
+from app.services.job_manager import FAILED, SUCCEEDED, JobManager
+
+
+def test_subscriber_receives_progress_then_done():
+    manager = JobManager(ttl_seconds=60, max_retained=10, max_active=1)
+
+    async def work(progress):
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            progress("analyze", i + 1, 3, [{"index": i}])
+        return {"slice_count": 3}
+
+    async def main():
+        job = manager.submit("test", "alice", work)
+        events = [event async for event in manager.subscribe(job)]
+        return job, events
+
+    job, events = asyncio.run(main())
+
+    assert [e["event"] for e in events] == ["snapshot", "status", "progress", "progress", "progress", "done"]
+    assert [e["partial_results"][0]["index"] for e in events if e["event"] == "progress"] == [0, 1, 2]
+    assert events[-1]["status"] == SUCCEEDED
+    assert job.result == {"slice_count": 3}
+
+
+def test_failed_job_records_error_and_expires_after_ttl():
+    manager = JobManager(ttl_seconds=0, max_retained=10, max_active=1)
+
+    async def work(progress):
+        raise ValueError("bad slice")
+
+    async def main():
+        job = manager.submit("test", "alice", work)
+        events = [event async for event in manager.subscribe(job)]
+        return job, events
+
+    job, events = asyncio.run(main())
+
+    assert job.status == FAILED
+    assert events[-1]["error"] == "bad slice"
+    job.finished_at -= 1
+    assert manager.get(job.id) is None
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.models.user_role import UserRole  # noqa: F401
+from app.models.user import User
+from app.services.auth_service import revoke_user_tokens
+from app.services.jwt_auth import RevocationChecker, get_revocation_checker, issue_access_token
+from app.services.token_cache import get_token_cache, get_user_by_token
+from app.utils.database import Base
+from app.utils.jwt_utils import create_access_token
+
+
+def test_jwt_is_validated_in_process_and_revoked_by_version(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_MODE", "jwt")
+    queries = []
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        event.listen(engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: queries.append(statement))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+            await conn.execute(insert(User), [{"id": 1, "username": "a", "email": "a@x", "password_hash": "-",
+                                               "role_id": 2, "access_token": "opaque"}])
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        get_token_cache().clear()
+        get_revocation_checker().clear()
+
+        async with sessions() as db:
+            user = (await db.execute(select(User).where(User.id == 1))).scalars().one()
+            token = issue_access_token(user)
+        queries.clear()
+
+        async with sessions() as db:
+            principals = [await get_user_by_token(db, token) for _ in range(5)]
+            opaque = await get_user_by_token(db, "opaque")
+        lookups = len(queries)
+
+        # 吊销：token_version 递增后已签发的令牌立即失效
+        async with sessions() as db:
+            await revoke_user_tokens(db, 1)
+            user = (await db.execute(select(User).where(User.id == 1))).scalars().one()
+            fresh = issue_access_token(user)
+        async with sessions() as db:
+            revoked = await get_user_by_token(db, token)
+            reissued = await get_user_by_token(db, fresh)
+
+        expired = create_access_token({"sub": "1", "ver": 1}, expires_delta=timedelta(seconds=-1))
+        async with sessions() as db:
+            rejected = [await get_user_by_token(db, t) for t in (expired, fresh[:-2] + "xx", "a.b.c")]
+        await engine.dispose()
+        return principals, opaque, lookups, revoked, reissued, rejected
+
+    principals, opaque, lookups, revoked, reissued, rejected = asyncio.run(main())
+
+    assert all(p.id == 1 and p.username == "a" and p.email == "a@x" and p.is_active for p in principals)
+    assert opaque.id == 1  # jwt 模式下仍接受不透明令牌
+    assert lookups == 2  # 一次吊销检查 + 一次不透明令牌查询
+    assert revoked is None and reissued.id == 1
+    assert rejected == [None, None, None]
+
+
+def test_revocation_check_fails_closed_without_previous_state():
+    class BrokenSession:
+        async def execute(self, *args, **kwargs):
+            raise OperationalError("SELECT", {}, Exception("database is down"))
+
+    checker = RevocationChecker(name="test_fail_closed")
+    assert asyncio.run(checker.get_user(BrokenSession(), 1, 0)) is None
@@ -0,0 +1,39 @@
+import torch
+import torch.nn as nn
+
+from app.services.hemorrhage_ai import Classifier
+from app.services.model_optimization import check_equivalence, optimize_model
+
+
+def _model_with_nontrivial_bn():
+    torch.manual_seed(0)
+    model = Classifier().eval()
+    for module in model.modules():
+        if isinstance(module, nn.BatchNorm2d):
+            module.running_mean.uniform_(-0.5, 0.5)
+            module.running_var.uniform_(0.5, 2.0)
+            module.weight.data.uniform_(0.5, 1.5)
+            module.bias.data.uniform_(-0.2, 0.2)
+    return model
+
+
+def test_optimized_model_has_no_batchnorm_or_dropout():
+    optimized = optimize_model(_model_with_nontrivial_bn())
+
+    layer_types = {type(m) for m in optimized.modules()}
+    assert nn.BatchNorm2d not in layer_types
+    assert nn.Dropout not in layer_types
+    assert nn.Dropout2d not in layer_types
+
+
+def test_optimized_model_matches_reference_logits():
+    model = _model_with_nontrivial_bn()
+    optimized = optimize_model(model)
+    inputs = torch.randn(2, 1, 224, 224)
+
+    with torch.inference_mode():
+        expected = model(inputs)
+        actual = optimized(inputs.contiguous(memory_format=torch.channels_last))
+
+    assert torch.allclose(expected, actual, atol=1e-4)
+    assert check_equivalence(model, optimized, torch.device("cpu")) <= 1e-4
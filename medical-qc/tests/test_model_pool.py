@@ -0,0 +1,71 @@
+from concurrent.futures import TimeoutError
+
+import numpy as np
+import pytest
+import torch
+
+from app.core.config import settings
+from app.services import hemorrhage_ai
+from app.services.model_pool import ModelPoolClient, ModelServingPool
+
+
+class FakeConnection:
+    """模拟到服务池的连接：按 reply 决定立即回传结果、不回传或发送失败"""
+
+    def __init__(self, client: ModelPoolClient, reply: str):
+        self.client = client
+        self.reply = reply
+        self.closed = False
+
+    def send(self, msg):
+        if self.reply == "error":
+            raise OSError("broken pipe")
+        if self.reply == "echo":
+            _, request_id, batch = msg
+            self.client._pending[request_id].set_result(batch.sum(axis=(1, 2, 3)))
+
+    def close(self):
+        self.closed = True
+
+
+def client_with(reply: str) -> ModelPoolClient:
+    client = ModelPoolClient(address=("127.0.0.1", 0), authkey=b"test", timeout=0.05)
+    client._conn = FakeConnection(client, reply)
+    return client
+
+
+def test_round_trip_clears_pending():
+    client = client_with("echo")
+    result = client.predict(torch.ones(2, 1, 2, 2))
+
+    np.testing.assert_allclose(result, [4.0, 4.0])
+    assert client._pending == {}
+
+
+def test_timeout_does_not_leak_pending_futures():
+    client = client_with("silent")
+    with pytest.raises(TimeoutError):
+        client.predict(torch.zeros(1, 1, 2, 2))
+
+    assert client._pending == {}
+
+
+def test_send_failure_resets_connection():
+    client = client_with("error")
+    conn = client._conn
+    with pytest.raises(ConnectionError):
+        client.predict(torch.zeros(1, 1, 2, 2))
+
+    assert client._pending == {}
+    assert client._conn is None and conn.closed
+
+
+def test_pool_reports_its_own_random_weights_flag(monkeypatch):
+    monkeypatch.setattr(settings, "INFERENCE_SERVING_MODE", "pool")
+    hemorrhage_ai.get_model()
+    monkeypatch.setattr(hemorrhage_ai, "_model_is_random", True)
+
+    pool = ModelServingPool(num_workers=0, threads_per_worker=1)
+    pool.start_workers()
+
+    assert pool.model_is_random is True
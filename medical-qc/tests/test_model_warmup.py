@@ -0,0 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import hemorrhage_ai
+
+
+def test_concurrent_first_calls_share_one_model():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        models = list(pool.map(lambda _: hemorrhage_ai.get_model(), range(4)))
+
+    assert all(m is models[0] for m in models)
+
+
+def test_warmup_marks_model_ready():
+    hemorrhage_ai.warmup_model(batch_sizes=[1, 2], rounds=1)
+
+    assert hemorrhage_ai.is_model_ready()
+    assert hemorrhage_ai.get_warmup_error() is None
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.security import build_password_context
+from app.models.user_role import UserRole  # noqa: F401
+from app.models.user import User
+from app.services import password_hasher
+from app.services.auth_service import login_user
+from app.services.inference_executor import ExecutorSaturatedError
+from app.services.password_hasher import PasswordHasher
+from app.utils.database import Base
+
+
+def test_login_rehashes_when_cost_changes(monkeypatch):
+    old_hash = build_password_context("pbkdf2_sha256", 1000).hash("secret")
+    hasher = PasswordHasher(build_password_context("pbkdf2_sha256", 2000), name="test_rehash")
+    monkeypatch.setattr(password_hasher, "_hasher", hasher)
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+            await conn.execute(insert(User), [{"id": 1, "username": "a", "email": "a@x", "password_hash": old_hash,
+                                               "role_id": 2, "access_token": "opaque"}])
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        async with sessions() as db:
+            wrong = await login_user(db, "a", "nope")
+            first = await login_user(db, "a", "secret")
+        async with sessions() as db:
+            stored = (await db.execute(select(User.password_hash).where(User.id == 1))).scalar()
+            second = await login_user(db, "a", "secret")
+        await engine.dispose()
+        hasher.shutdown()
+        return wrong, first, stored, second
+
+    wrong, first, stored, second = asyncio.run(main())
+
+    assert wrong == (None, "密码错误")
+    assert first == ("opaque", None) and second == ("opaque", None)
+    assert stored.startswith("$pbkdf2-sha256$2000$")
+    assert hasher._rehashed.value == 1
+
+
+def test_verify_and_reject_when_saturated():
+    hasher = PasswordHasher(build_password_context("pbkdf2_sha256", 1000), name="test_bounded",
+                            max_workers=1, max_pending=1)
+
+    async def main():
+        hashed = await hasher.hash("secret")
+        ok = await hasher.verify_and_update("secret", hashed)
+        unknown = await hasher.verify_and_update("secret", "-")
+        first = asyncio.ensure_future(hasher.hash("x"))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturatedError):
+            await hasher.hash("y")
+        await first
+        hasher.shutdown()
+        return ok, unknown
+
+    ok, unknown = asyncio.run(main())
+    assert ok == (True, None)
+    assert unknown == (False, None)
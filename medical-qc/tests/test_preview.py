@@ -0,0 +1,30 @@
+import base64
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services.preview import parse_preview_options, render_preview
+
+
+def _analysis_image():
+    pixels = np.random.default_rng(0).integers(0, 255, size=(512, 512), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def test_thumbnail_modes_are_smaller_than_png():
+    image = _analysis_image()
+    png = render_preview(image, parse_preview_options("png"))
+    webp = render_preview(image, parse_preview_options("webp", size=128, quality=60))
+
+    assert webp["image_format"] == "webp"
+    assert (webp["preview_width"], webp["preview_height"]) == (128, 128)
+    assert len(base64.b64decode(webp["image_base64"])) < len(base64.b64decode(png["image_base64"]))
+    assert render_preview(image, parse_preview_options("none")) == {}
+
+
+def test_invalid_mode_and_size_clamping():
+    with pytest.raises(ValueError):
+        parse_preview_options("gif")
+    assert parse_preview_options("jpg", size=4096).size == 512
+    assert parse_preview_options("jpg").mode == "jpeg"
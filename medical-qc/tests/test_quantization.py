@@ -0,0 +1,86 @@
+import pytest
+import torch
+import torch.nn as nn
+
+from app.services import hemorrhage_ai, quantization
+from app.services.quantization import (
+    QuantizationRejectedError,
+    build_int8_model,
+    check_accuracy_parity,
+    roc_auc,
+    split_samples,
+)
+
+
+class SignScorer(nn.Module):
+    """把输入的第一个像素当作出血得分 (sign=-1 时得分反转)"""
+
+    def __init__(self, sign: float = 1.0):
+        super().__init__()
+        self.sign = sign
+
+    def forward(self, x):
+        score = self.sign * x.reshape(len(x), -1)[:, :1]
+        return torch.cat([-score, score], dim=1)
+
+
+def labelled(n_pos: int, n_neg: int):
+    return [(f"{i}.png", 1) for i in range(n_pos)] + [(f"n{i}.png", 0) for i in range(n_neg)]
+
+
+@pytest.fixture
+def label_inputs(monkeypatch):
+    """_load_batch 返回以标签为像素值的张量，无需读取图像文件"""
+    def load(paths):
+        return torch.tensor([[0.0 if p.startswith("n") else 1.0] for p in paths])
+
+    monkeypatch.setattr(quantization, "_load_batch", load)
+
+
+def test_roc_auc():
+    assert roc_auc([0, 0, 1, 1], [0.1, 0.2, 0.8, 0.9]) == 1.0
+    assert roc_auc([0, 0, 1, 1], [0.9, 0.8, 0.2, 0.1]) == 0.0
+    assert roc_auc([0, 1, 0, 1], [0.5, 0.5, 0.5, 0.5]) == 0.5
+    assert roc_auc([0, 0, 1, 1], [0.1, 0.4, 0.35, 0.8]) == 0.75
+    with pytest.raises(ValueError):
+        roc_auc([1, 1], [0.2, 0.3])
+
+
+def test_split_is_disjoint_and_requires_both_classes():
+    samples = labelled(30, 30)
+    calibration, validation = split_samples(samples, 20, min_validation=30, min_per_class=5)
+    assert len(calibration) == 20 and len(validation) == 40
+    assert not set(calibration) & set(validation)
+
+    with pytest.raises(QuantizationRejectedError):
+        split_samples(samples, 60)  # 全部用于校准，没有独立验证集
+    with pytest.raises(QuantizationRejectedError):
+        split_samples(samples, 20, min_validation=41)
+    with pytest.raises(QuantizationRejectedError):
+        split_samples(labelled(60, 2), 10, min_per_class=5)
+
+
+def test_parity_check_rejects_auc_drop(label_inputs):
+    validation = labelled(5, 5)
+
+    report = check_accuracy_parity(SignScorer(), SignScorer(), validation, max_auc_drop=0.01)
+    assert report["auc_drop"] == 0.0
+
+    with pytest.raises(QuantizationRejectedError):
+        check_accuracy_parity(SignScorer(), SignScorer(-1.0), validation, max_auc_drop=0.01)
+
+
+def test_build_rejects_when_validation_cannot_be_formed():
+    with pytest.raises(QuantizationRejectedError):
+        build_int8_model(SignScorer(), calibration_samples=32, max_auc_drop=0.01,
+                         samples=labelled(10, 10), min_validation=40, min_per_class=10)
+
+
+def test_rejected_quantization_keeps_fp32(monkeypatch):
+    def reject(*args, **kwargs):
+        raise QuantizationRejectedError("AUC drop too large")
+
+    monkeypatch.setattr(hemorrhage_ai, "build_int8_model", reject)
+    model = SignScorer()
+
+    assert hemorrhage_ai._quantize_or_keep_fp32(model) is model
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.services.record_writer import RecordWriteBuffer, build_hemorrhage_row
+
+RESULT = {"prediction": "出血", "confidence": "高", "probability": {"hemorrhage": 0.9, "no_hemorrhage": 0.1},
+          "duration_ms": 12.5}
+
+
+def test_flushes_in_batches_by_size_and_drains_on_stop():
+    batches = []
+
+    async def write(rows):
+        batches.append(len(rows))
+
+    buffer = RecordWriteBuffer(write, name="test_records_size", batch_size=4, flush_interval=60, max_backlog=100)
+
+    async def main():
+        for i in range(10):
+            buffer.submit(build_hemorrhage_row(1, RESULT, f"{i}.png", "张三", "E001"))
+        await asyncio.sleep(0.05)
+        flushed_before_stop = list(batches)
+        await buffer.stop()
+        return flushed_before_stop
+
+    before_stop = asyncio.run(main())
+
+    assert before_stop == [4, 4]  # 达到批大小立即写入，剩余 2 条等待时间阈值
+    assert batches == [4, 4, 2]   # 关闭时排空
+    assert buffer.backlog == 0
+
+
+def test_failed_flush_keeps_rows_for_retry():
+    attempts = []
+
+    async def write(rows):
+        attempts.append([row["image_path"] for row in rows])
+        if len(attempts) == 1:
+            raise ConnectionError("db down")
+
+    buffer = RecordWriteBuffer(write, name="test_records_retry", batch_size=10, flush_interval=60)
+
+    async def main():
+        buffer.submit(build_hemorrhage_row(1, RESULT, "a.png"))
+        buffer.submit(build_hemorrhage_row(1, RESULT, "b.png"))
+        assert not await buffer.flush()
+        assert buffer.backlog == 2
+        assert await buffer.flush()
+        await buffer.stop()
+
+    asyncio.run(main())
+
+    assert attempts == [["a.png", "b.png"], ["a.png", "b.png"]]
@@ -0,0 +1,33 @@
+import msgpack
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.schemas.response import IssueDistributionItem
+from app.utils.responses import NegotiatedResponse, NegotiatedRoute
+
+router = APIRouter(route_class=NegotiatedRoute, default_response_class=NegotiatedResponse)
+
+
+@router.get("/items", response_model=list[IssueDistributionItem])
+def items():
+    return [{"value": 3, "name": "伪影问题"}]
+
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+
+def test_json_is_default():
+    resp = client.get("/items")
+
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == [{"value": 3, "name": "伪影问题"}]
+    assert resp.headers["vary"] == "Accept"
+
+
+def test_msgpack_when_accepted():
+    resp = client.get("/items", headers={"Accept": "application/msgpack"})
+
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(resp.content) == [{"value": 3, "name": "伪影问题"}]
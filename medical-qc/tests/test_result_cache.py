@@ -0,0 +1,126 @@
+import asyncio
+import os
+
+from app.services.result_cache import ResultCache
+
+
+def test_concurrent_identical_requests_share_one_computation():
+    cache = ResultCache(name="test_coalesce", max_entries=4)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"prediction": "出血"}
+
+    async def main():
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+        results.append(await cache.get_or_compute("k", compute))
+        return results
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(r == {"prediction": "出血"} for r in results)
+    assert cache._coalesced.value == 4
+    assert cache._hits.value == 1
+
+
+def test_lru_eviction_and_disk_tier(tmp_path):
+    cache = ResultCache(name="test_tiers", max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=60)
+
+    async def value(v):
+        return {"v": v}
+
+    async def main():
+        await cache.get_or_compute("a", lambda: value(1))
+        await cache.get_or_compute("b", lambda: value(2))
+        # "a" 已被内存层淘汰，但仍可从磁盘层读取
+        return await cache.get_or_compute("a", lambda: value(-1))
+
+    assert asyncio.run(main()) == {"v": 1}
+    assert cache._evictions.value >= 1
+    assert cache._disk_hits.value == 1
+
+    # 磁盘层按大小淘汰最早写入的条目
+    async def fill():
+        for key in "cdefgh":
+            await cache.get_or_compute(key, lambda: value(0))
+
+    asyncio.run(fill())
+    total = sum(os.path.getsize(tmp_path / f) for f in os.listdir(tmp_path))
+    assert total <= 60
+    assert cache._disk_evictions.value > 0
+
+
+def test_ttl_expiry_and_clear_during_computation():
+    cache = ResultCache(name="test_ttl", max_entries=4, ttl_seconds=0.05)
+    versions = iter(range(100))
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return [next(versions)]
+
+    async def main():
+        first = await cache.get_or_compute("k", compute)
+        cached = await cache.get_or_compute("k", compute)
+        await asyncio.sleep(0.06)
+        expired = await cache.get_or_compute("k", compute)
+        # 计算进行中失效：进行中的结果不写入缓存，之后的请求重新计算
+        inflight = asyncio.ensure_future(cache.get_or_compute("j", compute))
+        await asyncio.sleep(0)
+        cache.clear()
+        stale = await inflight
+        fresh = await cache.get_or_compute("j", compute)
+        return first, cached, expired, stale, fresh
+
+    first, cached, expired, stale, fresh = asyncio.run(main())
+
+    assert first == cached == [0]
+    assert expired == [1]
+    assert stale == [2] and fresh == [3]
+
+
+def test_results_are_deep_copies_and_hits_are_marked():
+    cache = ResultCache(name="test_deepcopy", max_entries=4)
+
+    async def compute():
+        return {"probability": {"hemorrhage": 0.9}, "bboxes": [[1, 2, 3, 4]]}
+
+    async def main():
+        first, first_cached = await cache.lookup("k", compute)
+        first["probability"]["hemorrhage"] = 0.0
+        first["bboxes"].append([0, 0, 0, 0])
+        second, second_cached = await cache.lookup("k", compute)
+        return first_cached, second, second_cached
+
+    first_cached, second, second_cached = asyncio.run(main())
+
+    assert not first_cached and second_cached
+    assert second == {"probability": {"hemorrhage": 0.9}, "bboxes": [[1, 2, 3, 4]]}
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    cache = ResultCache(name="test_cancel", max_entries=4)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"v": len(calls)}
+
+    async def main():
+        leader = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.get_or_compute("k", compute)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        return leader.cancelled(), results
+
+    leader_cancelled, results = asyncio.run(main())
+
+    # 等待者之一重新计算，其余合并到新的计算
+    assert leader_cancelled
+    assert results == [{"v": 2}] * 3
+    assert len(calls) == 2
@@ -0,0 +1,61 @@
+import numpy as np
+
+from app.services.slice_analysis import analyze_slice, analyze_slices
+
+
+def _reference_analysis(img):
+    """逐项整图计算的原始实现，用作对照"""
+    h, w = img.shape
+    m_x, m_y = int(w * 0.15), int(h * 0.15)
+    mask = np.zeros_like(img)
+    mask[m_y:h - m_y, m_x:w - m_x] = 1
+    roi = img * mask
+    valid = roi[roi > 50]
+    threshold, bbox, hot_count = None, None, 0
+    if len(valid) > 0:
+        threshold = max(110, min(np.mean(valid) + 2.0 * np.std(valid), 230))
+        binary = roi > threshold
+        binary[roi > 250] = 0
+        coords = np.argwhere(binary)
+        hot_count = len(coords)
+        if hot_count:
+            (y0, x0), (y1, x1) = coords.min(axis=0), coords.max(axis=0)
+            bbox = (int(x0), int(y0), int(x1), int(y1))
+    mid_x = w // 2
+    left, right = img[:, :mid_x], img[:, mid_x:]
+    min_w = min(left.shape[1], right.shape[1])
+    diff = np.abs(left[:, :min_w].astype(int) - np.fliplr(right[:, :min_w]).astype(int))
+    symmetry = float(np.mean(diff[m_y:h - m_y, :]))
+    box_v = int(min(w, h) * 0.12)
+    ventricle = float(np.mean(img[h // 2 - box_v:h // 2 + box_v, w // 2 - box_v:w // 2 + box_v]))
+    return threshold, hot_count, bbox, symmetry, ventricle
+
+
+def _synthetic_slice(seed):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 120, size=(512, 512), dtype=np.uint8)
+    img[200:260, 300:340] = rng.integers(180, 255, size=(60, 40), dtype=np.uint8)
+    img[:20, :] = 255  # 头骨
+    return img
+
+
+def test_kernel_matches_reference_implementation():
+    for seed in range(3):
+        img = _synthetic_slice(seed)
+        threshold, hot_count, bbox, symmetry, ventricle = _reference_analysis(img)
+        result = analyze_slice(img)
+
+        assert np.isclose(result.threshold, threshold)
+        assert result.hot_count == hot_count
+        assert result.hot_extent == bbox
+        assert np.isclose(result.symmetry_score, symmetry)
+        assert np.isclose(result.ventricle_mean, ventricle)
+
+
+def test_batch_matches_per_slice_and_handles_empty_slice():
+    stack = np.stack([_synthetic_slice(0), np.zeros((512, 512), dtype=np.uint8)])
+    batch = analyze_slices(stack)
+
+    assert batch[0] == analyze_slice(stack[0])
+    assert batch[1].threshold is None
+    assert batch[1].hot_extent is None
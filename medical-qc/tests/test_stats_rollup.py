@@ -0,0 +1,133 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.user_role import UserRole  # noqa: F401
+from app.models.user import User
+from app.models.hemorrhage_record import HemorrhageRecord
+from app.models.qc_daily_stat import QCDailyStat
+from app.services.record_writer import build_hemorrhage_row
+from app.services.stats_rollup import (
+    aggregate_rows, apply_daily_rollup, build_rollup_upsert, change_issue_status, rebuild_daily_stats,
+)
+from app.services.summary_service import fetch_issue_distribution, fetch_issue_trend, fetch_summary_stats
+from app.utils.database import Base
+
+POSITIVE = {"prediction": "出血", "confidence": "高", "probability": {"hemorrhage": 0.9, "no_hemorrhage": 0.1}}
+NEGATIVE = {"prediction": "未出血", "confidence": "高", "probability": {"hemorrhage": 0.1, "no_hemorrhage": 0.9}}
+DAY1 = datetime(2026, 3, 1, 9, 0)
+DAY2 = datetime(2026, 3, 2, 9, 0)
+
+
+def _row(user_id, result, created_at, status=None):
+    row = build_hemorrhage_row(user_id, result, "x.png")
+    row["created_at"] = created_at
+    if status:
+        row["status"] = status
+    return row
+
+
+ROWS = [
+    _row(1, POSITIVE, DAY1),
+    _row(1, POSITIVE, DAY1),
+    _row(1, NEGATIVE, DAY1),
+    _row(2, POSITIVE, DAY2, status="已解决"),
+    _row(2, POSITIVE, DAY2),
+]
+USER_DIMS = {1: ("协和医院", "放射科"), 2: ("协和医院", None)}
+
+
+def test_aggregate_rows_groups_by_dimensions():
+    counts = aggregate_rows(ROWS, USER_DIMS)
+
+    assert counts[(DAY1.date(), "脑出血检测", "协和医院", "放射科", "脑出血", "待处理")] == 2
+    assert counts[(DAY1.date(), "脑出血检测", "协和医院", "放射科", "", "")] == 1
+    assert counts[(DAY2.date(), "脑出血检测", "协和医院", "", "脑出血", "已解决")] == 1
+    assert sum(counts.values()) == len(ROWS)
+
+
+def test_rollup_upsert_accumulates_on_duplicate_key():
+    sql = str(build_rollup_upsert(aggregate_rows(ROWS, USER_DIMS)).compile(dialect=mysql.dialect()))
+
+    assert "ON DUPLICATE KEY UPDATE" in sql
+    assert "record_count = (qc_daily_stats.record_count + VALUES(record_count))" in sql
+    with pytest.raises(ValueError):
+        build_rollup_upsert(aggregate_rows(ROWS, USER_DIMS), "oracle")
+
+
+async def _engine_with_users():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"id": 1, "username": "a", "email": "a@x", "password_hash": "-", "hospital": "协和医院",
+             "department": "放射科"},
+            {"id": 2, "username": "b", "email": "b@x", "password_hash": "-", "hospital": "协和医院",
+             "department": None},
+        ])
+    return engine
+
+
+def _snapshot(stats):
+    return {(str(s.stat_date), s.exam_type, s.hospital, s.department, s.issue_type, s.status): s.record_count
+            for s in stats if s.record_count}
+
+
+def test_status_change_moves_counts_like_a_rebuild():
+    async def main():
+        engine = await _engine_with_users()
+        async with async_sessionmaker(engine)() as db:
+            await db.execute(insert(HemorrhageRecord), ROWS)
+            await apply_daily_rollup(db, ROWS)
+            await db.commit()
+            pending = (await db.execute(
+                select(HemorrhageRecord.id).where(HemorrhageRecord.status == "待处理").order_by(HemorrhageRecord.id)
+            )).scalars().all()
+            changed = await change_issue_status(db, pending[:2], "已解决")
+            await db.commit()
+            incremental = _snapshot((await db.execute(select(QCDailyStat))).scalars().all())
+            await rebuild_daily_stats(db)
+            await db.commit()
+            rebuilt = _snapshot((await db.execute(select(QCDailyStat))).scalars().all())
+        await engine.dispose()
+        return changed, incremental, rebuilt
+
+    changed, incremental, rebuilt = asyncio.run(main())
+
+    assert changed == 2
+    assert incremental == rebuilt
+    assert rebuilt[("2026-03-01", "脑出血检测", "协和医院", "放射科", "脑出血", "已解决")] == 2
+
+
+def test_rebuild_matches_incremental_counts_and_feeds_summary():
+    async def main():
+        engine = await _engine_with_users()
+        async with engine.begin() as conn:
+            await conn.execute(insert(HemorrhageRecord), ROWS)
+        async with async_sessionmaker(engine)() as db:
+            await rebuild_daily_stats(db)
+            await db.commit()
+            stats = (await db.execute(select(QCDailyStat))).scalars().all()
+            summary = await fetch_summary_stats(db, date(2026, 3, 2))
+            scoped = await fetch_summary_stats(db, date(2026, 3, 2), department="放射科")
+            trend = await fetch_issue_trend(db, date(2026, 3, 3), 4)
+            distribution = await fetch_issue_distribution(db)
+        await engine.dispose()
+        return stats, summary, scoped, trend, distribution
+
+    stats, summary, scoped, trend, distribution = asyncio.run(main())
+
+    rebuilt = {(str(s.stat_date), s.exam_type, s.hospital, s.department, s.issue_type, s.status): s.record_count
+               for s in stats}
+    expected = {tuple(map(str, key[:1])) + key[1:]: count
+                for key, count in aggregate_rows(ROWS, USER_DIMS).items()}
+    assert rebuilt == expected
+    assert summary == {"totalIssues": 4, "todayIssues": 2, "pendingIssues": 3, "resolutionRate": 25.0,
+                       "avgResolutionTime": None}
+    assert scoped["totalIssues"] == 2 and scoped["todayIssues"] == 0
+    assert trend == {"dates": ["2/28", "3/1", "3/2", "3/3"], "counts": [0, 2, 2, 0], "solved": [0, 0, 1, 0]}
+    assert distribution == [{"value": 4, "name": "脑出血"}]
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.user_role import UserRole  # noqa: F401
+from app.models.user import User
+from app.services.token_cache import TokenCache, get_token_cache, get_user_by_token
+from app.utils.database import Base
+
+
+def test_lookup_is_cached_and_invalidated_on_rotation_and_disable():
+    queries = []
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        event.listen(engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: queries.append(statement))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+            await conn.execute(insert(User), [{"id": 1, "username": "a", "email": "a@x", "password_hash": "-",
+                                               "role_id": 2, "access_token": "old"}])
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        get_token_cache().clear()
+        queries.clear()
+
+        async with sessions() as db:
+            first = await get_user_by_token(db, "old")
+            second = await get_user_by_token(db, "old")
+        lookups = len(queries)
+
+        # 轮换令牌：提交后旧令牌立即失效
+        async with sessions() as db:
+            user = (await db.execute(select(User).where(User.id == 1))).scalars().one()
+            user.access_token = "new"
+            await db.commit()
+        async with sessions() as db:
+            rotated_old = await get_user_by_token(db, "old")
+            rotated_new = await get_user_by_token(db, "new")
+
+        # 禁用账号：缓存中的令牌同样失效
+        async with sessions() as db:
+            user = (await db.execute(select(User).where(User.id == 1))).scalars().one()
+            user.is_active = False
+            await db.commit()
+        async with sessions() as db:
+            disabled = await get_user_by_token(db, "new")
+        await engine.dispose()
+        return first, second, lookups, rotated_old, rotated_new, disabled
+
+    first, second, lookups, rotated_old, rotated_new, disabled = asyncio.run(main())
+
+    assert first is second and first.username == "a"
+    assert lookups == 1  # 第二次命中缓存，不访问数据库
+    assert rotated_old is None and rotated_new.id == 1
+    assert disabled is None
+
+
+def test_lru_and_ttl():
+    class FakeUser:
+        def __init__(self, id):
+            self.id = id
+
+    cache = TokenCache(name="test_token", max_entries=2, ttl_seconds=0.05)
+    cache.put("a", FakeUser(1))
+    cache.put("b", FakeUser(2))
+    cache.get("a")
+    cache.put("c", FakeUser(3))  # 淘汰最久未使用的 "b"
+
+    assert cache.get("b") is None and cache.get("a").id == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    cache.put("d", FakeUser(3))
+    cache.invalidate_user(3)
+    assert cache.get("c") is None and cache.get("d") is None
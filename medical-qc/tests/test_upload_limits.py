@@ -0,0 +1,53 @@
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from app.utils.upload_limits import BodySizeLimitMiddleware, UploadTooLargeError, read_upload_digest
+
+app = FastAPI()
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=4096)
+
+
+@app.post("/upload")
+async def upload(file: UploadFile = File(...)):
+    try:
+        _, digest, size = await read_upload_digest(file, max_bytes=1024, chunk_size=100)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return {"digest": digest, "size": size}
+
+
+@app.post("/raw")
+async def raw(request: Request):
+    return {"size": len(await request.body())}
+
+
+client = TestClient(app)
+
+
+def test_small_upload_is_hashed_in_chunks():
+    resp = client.post("/upload", files={"file": ("a.png", b"x" * 1000)})
+
+    assert resp.status_code == 200
+    assert resp.json()["size"] == 1000
+
+
+def test_file_over_limit_is_rejected():
+    resp = client.post("/upload", files={"file": ("a.png", b"x" * 2000)})
+
+    assert resp.status_code == 413
+
+
+def test_body_over_limit_is_rejected_before_parsing():
+    resp = client.post("/upload", files={"file": ("a.png", b"x" * 10000)})
+
+    assert resp.status_code == 413
+
+
+def test_chunked_body_over_limit_is_rejected():
+    def body():
+        for _ in range(10):
+            yield b"y" * 1000
+
+    resp = client.post("/raw", content=body())
+
+    assert resp.status_code == 413